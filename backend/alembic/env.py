@@ -7,7 +7,7 @@ from alembic import context
 
 
 from app.db.database import Base
-from app.models import scene, user, project, video, voiceover
+from app.models import scene, user, project, video, voiceover, render_span, render_cpu_usage
 target_metadata = Base.metadata
 
 # this is the Alembic Config object, which provides
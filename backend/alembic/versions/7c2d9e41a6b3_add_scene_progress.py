@@ -0,0 +1,26 @@
+"""Add scene render progress
+
+Revision ID: 7c2d9e41a6b3
+Revises: 454432b8ff59
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d9e41a6b3'
+down_revision: Union[str, None] = '454432b8ff59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('progress', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scenes', 'progress')
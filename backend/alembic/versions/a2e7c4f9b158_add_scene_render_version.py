@@ -0,0 +1,26 @@
+"""Add render version to scenes
+
+Revision ID: a2e7c4f9b158
+Revises: f6d2b8a4e913
+Create Date: 2026-10-19 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2e7c4f9b158'
+down_revision: Union[str, None] = 'f6d2b8a4e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('render_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('scenes', 'render_version')
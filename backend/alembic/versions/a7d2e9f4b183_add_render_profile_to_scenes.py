@@ -0,0 +1,28 @@
+"""Add render profile and renditions to scenes
+
+Revision ID: a7d2e9f4b183
+Revises: f1c3d8a4b627
+Create Date: 2026-10-19 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e9f4b183'
+down_revision: Union[str, None] = 'f1c3d8a4b627'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('renditions', sa.JSON(), nullable=True))
+    op.add_column('scenes', sa.Column('render_profile', sa.String(), server_default='standard', nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scenes', 'render_profile')
+    op.drop_column('scenes', 'renditions')
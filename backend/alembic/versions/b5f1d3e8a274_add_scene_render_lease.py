@@ -0,0 +1,32 @@
+"""Add render lease to scenes
+
+Revision ID: b5f1d3e8a274
+Revises: a2e7c4f9b158
+Create Date: 2026-10-20 01:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f1d3e8a274'
+down_revision: Union[str, None] = 'a2e7c4f9b158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('scenes', sa.Column('lease_expires_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('scenes', sa.Column('lost_renders', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_scenes_lease_expires_at'), 'scenes', ['lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scenes_lease_expires_at'), table_name='scenes')
+    op.drop_column('scenes', 'lost_renders')
+    op.drop_column('scenes', 'lease_expires_at')
+    op.drop_column('scenes', 'lease_owner')
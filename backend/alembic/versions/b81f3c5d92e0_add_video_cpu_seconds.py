@@ -0,0 +1,26 @@
+"""Add render CPU seconds to videos
+
+Revision ID: b81f3c5d92e0
+Revises: 7c2d9e41a6b3
+Create Date: 2026-10-19 12:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f3c5d92e0'
+down_revision: Union[str, None] = '7c2d9e41a6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('cpu_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'cpu_seconds')
@@ -0,0 +1,26 @@
+"""Add narration to scenes
+
+Revision ID: c3f8b6e2d415
+Revises: a7d2e9f4b183
+Create Date: 2026-10-19 17:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8b6e2d415'
+down_revision: Union[str, None] = 'a7d2e9f4b183'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('narration', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scenes', 'narration')
@@ -0,0 +1,44 @@
+"""Add render CPU usage
+
+Revision ID: c7a4e2f9d316
+Revises: b5f1d3e8a274
+Create Date: 2026-10-20 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a4e2f9d316'
+down_revision: Union[str, None] = 'b5f1d3e8a274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('render_cpu_usage',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('scene_id', sa.UUID(), nullable=True),
+    sa.Column('cpu_seconds', sa.Float(), nullable=True),
+    sa.Column('outcome', sa.String(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_render_cpu_usage_user_id_created_at', 'render_cpu_usage', ['user_id', 'created_at'], unique=False)
+    # Count the renders already in the window
+    op.execute(
+        "INSERT INTO render_cpu_usage (id, user_id, scene_id, cpu_seconds, outcome, created_at) "
+        "SELECT videos.id, projects.user_id, videos.scene_id, videos.cpu_seconds, 'completed', videos.created_at "
+        "FROM videos JOIN scenes ON scenes.id = videos.scene_id JOIN projects ON projects.id = scenes.project_id "
+        "WHERE videos.cpu_seconds IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_render_cpu_usage_user_id_created_at', table_name='render_cpu_usage')
+    op.drop_table('render_cpu_usage')
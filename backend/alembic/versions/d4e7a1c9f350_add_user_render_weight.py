@@ -0,0 +1,26 @@
+"""Add render weight to users
+
+Revision ID: d4e7a1c9f350
+Revises: b81f3c5d92e0
+Create Date: 2026-10-19 13:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e7a1c9f350'
+down_revision: Union[str, None] = 'b81f3c5d92e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('render_weight', sa.Float(), server_default='1', nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'render_weight')
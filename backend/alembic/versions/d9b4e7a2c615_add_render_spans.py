@@ -0,0 +1,40 @@
+"""Add render spans
+
+Revision ID: d9b4e7a2c615
+Revises: c3f8b6e2d415
+Create Date: 2026-10-19 19:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b4e7a2c615'
+down_revision: Union[str, None] = 'c3f8b6e2d415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('render_spans',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('scene_id', sa.UUID(), nullable=True),
+    sa.Column('attempt_id', sa.UUID(), nullable=True),
+    sa.Column('stage', sa.String(), nullable=True),
+    sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('duration', sa.Float(), nullable=True),
+    sa.Column('outcome', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['scene_id'], ['scenes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_render_spans_scene_id'), 'render_spans', ['scene_id'], unique=False)
+    op.create_index('ix_render_spans_stage_started_at', 'render_spans', ['stage', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_render_spans_stage_started_at', table_name='render_spans')
+    op.drop_index(op.f('ix_render_spans_scene_id'), table_name='render_spans')
+    op.drop_table('render_spans')
@@ -0,0 +1,26 @@
+"""Add HLS playlist URL to scenes
+
+Revision ID: e5a92b7c1d04
+Revises: d4e7a1c9f350
+Create Date: 2026-10-19 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a92b7c1d04'
+down_revision: Union[str, None] = 'd4e7a1c9f350'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('playlist_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scenes', 'playlist_url')
@@ -0,0 +1,26 @@
+"""Add profile URL to scenes
+
+Revision ID: e8c1a5f3d972
+Revises: d9b4e7a2c615
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c1a5f3d972'
+down_revision: Union[str, None] = 'd9b4e7a2c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('profile_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scenes', 'profile_url')
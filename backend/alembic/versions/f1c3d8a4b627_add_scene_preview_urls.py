@@ -0,0 +1,30 @@
+"""Add poster, thumbnail and sprite URLs to scenes
+
+Revision ID: f1c3d8a4b627
+Revises: e5a92b7c1d04
+Create Date: 2026-10-19 14:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3d8a4b627'
+down_revision: Union[str, None] = 'e5a92b7c1d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('scenes', sa.Column('poster_url', sa.String(), nullable=True))
+    op.add_column('scenes', sa.Column('thumbnail_url', sa.String(), nullable=True))
+    op.add_column('scenes', sa.Column('sprite_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('scenes', 'sprite_url')
+    op.drop_column('scenes', 'thumbnail_url')
+    op.drop_column('scenes', 'poster_url')
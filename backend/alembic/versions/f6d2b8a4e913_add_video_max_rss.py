@@ -0,0 +1,26 @@
+"""Add render peak RSS to videos
+
+Revision ID: f6d2b8a4e913
+Revises: e8c1a5f3d972
+Create Date: 2026-10-19 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6d2b8a4e913'
+down_revision: Union[str, None] = 'e8c1a5f3d972'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('max_rss_kb', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'max_rss_kb')
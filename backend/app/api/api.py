@@ -1,9 +1,11 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, projects, scenes, ai
+from app.api.endpoints import auth, projects, scenes, events, ai, admin
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(projects.router, prefix="/projects", tags=["Projects"])
 api_router.include_router(scenes.router, prefix="/projects", tags=["Scenes"])
-api_router.include_router(ai.router, prefix="/ai", tags=["ai"]) 
\ No newline at end of file
+api_router.include_router(events.router, prefix="/projects", tags=["Events"])
+api_router.include_router(ai.router, prefix="/ai", tags=["ai"]) 
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
@@ -0,0 +1,90 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.database import get_db
+from app.models.user import User
+from app.models.scene import Scene
+from app.models.render_span import RenderSpan
+from app.schemas.admin import RenderAttempt, SlowRender
+from app.core.security import get_current_admin
+from app.services.render_trace import utc_datetime
+from uuid import UUID
+
+router = APIRouter()
+
+@router.get("/scenes/{scene_id}/timeline", response_model=List[RenderAttempt])
+def get_scene_timeline(
+    scene_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Stage timelines of the scene's recent render attempts, newest first."""
+    if not db.query(Scene.id).filter(Scene.id == scene_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
+        )
+
+    spans = db.query(RenderSpan).filter(RenderSpan.scene_id == scene_id).order_by(RenderSpan.started_at).all()
+    attempts = defaultdict(list)
+    totals = {}
+    for span in spans:
+        if span.stage == "total":
+            totals[span.attempt_id] = span
+        else:
+            attempts[span.attempt_id].append(span)
+
+    return sorted(
+        (
+            RenderAttempt(
+                attempt_id=attempt_id,
+                started_at=total.started_at,
+                duration=total.duration,
+                outcome=total.outcome,
+                spans=attempts[attempt_id]
+            )
+            for attempt_id, total in totals.items()
+        ),
+        key=lambda attempt: attempt.started_at,
+        reverse=True
+    )
+
+@router.get("/renders/slowest", response_model=List[SlowRender])
+def get_slowest_renders(
+    hours: float = 24,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """The slowest render attempts queued in the last `hours`, with time per stage."""
+    since = utc_datetime(time.time()) - timedelta(hours=hours)
+    slowest = db.query(RenderSpan, Scene.project_id).join(Scene).filter(
+        RenderSpan.stage == "total",
+        RenderSpan.started_at >= since
+    ).order_by(RenderSpan.duration.desc()).limit(min(max(limit, 1), 100)).all()
+    if not slowest:
+        return []
+
+    stages = defaultdict(dict)
+    spans = db.query(RenderSpan.attempt_id, RenderSpan.stage, RenderSpan.duration).filter(
+        RenderSpan.attempt_id.in_([total.attempt_id for total, _ in slowest]),
+        RenderSpan.stage != "total"
+    ).all()
+    for attempt_id, stage, duration in spans:
+        stages[attempt_id][stage] = stages[attempt_id].get(stage, 0.0) + duration
+
+    return [
+        SlowRender(
+            scene_id=total.scene_id,
+            project_id=project_id,
+            attempt_id=total.attempt_id,
+            started_at=total.started_at,
+            duration=total.duration,
+            outcome=total.outcome,
+            stages=stages[total.attempt_id]
+        )
+        for total, project_id in slowest
+    ]
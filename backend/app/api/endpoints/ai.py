@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Body
 from pydantic import BaseModel
 from app.core.config import settings
+from app.core.metrics import observe_llm_request, record_llm_usage
 import httpx
 
 router = APIRouter()
@@ -38,7 +39,7 @@ def refine_prompt(data: RefinePromptRequest):
     5. Format the response as a single paragraph without any introductory text
     6. Do not include any explanations or commentary"""
 
-    api_url = "https://api.groq.com/openai/v1/chat/completions"
+    api_url = settings.GROQ_API_URL
     headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
     data_json = {
         "model": "meta-llama/llama-4-maverick-17b-128e-instruct",
@@ -50,9 +51,11 @@ def refine_prompt(data: RefinePromptRequest):
         "temperature": 0.7
     }
     try:
-        response = httpx.post(api_url, json=data_json, headers=headers, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        with observe_llm_request("refine_prompt"):
+            response = httpx.post(api_url, json=data_json, headers=headers, timeout=30)
+            response.raise_for_status()
+            result = response.json()
+        record_llm_usage("refine_prompt", result)
         refined_prompt = result["choices"][0]["message"]["content"].strip()
         return {"refined_prompt": refined_prompt}
     except Exception as e:
@@ -90,7 +93,7 @@ def generate_code(data: GenerateCodeRequest):
 19. Ensure all object creations are properly formatted with all parameters
 20. Double-check all syntax before returning the code"""
 
-    api_url = "https://api.groq.com/openai/v1/chat/completions"
+    api_url = settings.GROQ_API_URL
     headers = {"Authorization": f"Bearer {groq_api_key}", "Content-Type": "application/json"}
     data_json = {
         "model": "meta-llama/llama-4-maverick-17b-128e-instruct",
@@ -102,9 +105,11 @@ def generate_code(data: GenerateCodeRequest):
         "temperature": 0.2
     }
     try:
-        response = httpx.post(api_url, json=data_json, headers=headers, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        with observe_llm_request("generate_code"):
+            response = httpx.post(api_url, json=data_json, headers=headers, timeout=30)
+            response.raise_for_status()
+            result = response.json()
+        record_llm_usage("generate_code", result)
         code = result["choices"][0]["message"]["content"].strip()
         
         # Basic validation to ensure it's valid Python code with proper imports
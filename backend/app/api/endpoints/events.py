@@ -0,0 +1,67 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+from app.db.database import SessionLocal
+from app.models.project import Project
+from app.core.config import settings
+from app.core.security import get_user_from_token
+from app.services.events import scene_events
+
+router = APIRouter()
+
+def authorize_project_events(project_id: UUID, request: Request, token: str = None):
+    """
+    Check that the token's user owns the project.
+
+    EventSource cannot set an Authorization header, so the access token may
+    also be passed as the `token` query parameter. A sync dependency, so the
+    database lookups run in the threadpool rather than on the event loop.
+    """
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Authorize with a short-lived session so the stream does not hold a DB connection
+    db = SessionLocal()
+    try:
+        current_user = get_user_from_token(token, db)
+        project = db.query(Project.id).filter(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        ).first()
+    finally:
+        db.close()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+@router.get("/{project_id}/events", dependencies=[Depends(authorize_project_events)])
+async def project_events(project_id: UUID, request: Request):
+    """Server-sent event stream of scene status changes for a project."""
+
+    async def event_stream():
+        async with scene_events.subscribe(project_id) as queue:
+            yield f"retry: {settings.EVENTS_RECONNECT_DELAY * 1000:.0f}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: scene\ndata: {message}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.database import get_db
 from app.models.user import User
 from app.models.project import Project
 from app.schemas.project import ProjectCreate, ProjectResponse, ProjectDetail, ProjectUpdate
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_token_username, get_user_from_token, oauth2_scheme
+from app.core.cache import get_cached_response, set_cached_response, cached_json_response
+from app.services.media_gc import delete_scene_media
+from app.services.render_queue import render_scheduler
 from uuid import UUID
 
 router = APIRouter()
@@ -38,9 +41,17 @@ def get_projects(
 @router.get("/{project_id}", response_model=ProjectDetail)
 def get_project(
     project_id: UUID, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    username: str = Depends(get_token_username),
+    db: Session = Depends(get_db)
 ):
+    # Serve unchanged projects from the shared cache without querying the database
+    version, body = get_cached_response(project_id, "project", username)
+    if body is not None:
+        return cached_json_response(request, body, version)
+    
+    current_user = get_user_from_token(token, db)
     project = db.query(Project).filter(
         Project.id == project_id, 
         Project.user_id == current_user.id
@@ -50,7 +61,11 @@ def get_project(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
-    return project
+    
+    body = ProjectDetail.model_validate(project).model_dump_json().encode()
+    if version is not None:
+        set_cached_response(project_id, "project", version, username, body)
+    return cached_json_response(request, body, version)
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 def update_project(
@@ -93,6 +108,10 @@ def delete_project(
             detail="Project not found"
         )
     
+    scene_ids = [scene.id for scene in db_project.scenes]
+    video_urls = [scene.video_url for scene in db_project.scenes]
     db.delete(db_project)
     db.commit()
+    render_scheduler.cancel(scene_ids)
+    delete_scene_media(video_urls)
     return None 
\ No newline at end of file
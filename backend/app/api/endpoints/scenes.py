@@ -1,13 +1,29 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.database import get_db
 from app.models.user import User
 from app.models.project import Project
 from app.models.scene import Scene, SceneStatus
-from app.schemas.scene import SceneCreate, SceneResponse, SceneDetail, SceneUpdate
-from app.core.security import get_current_user
-from app.services.animation import generate_animation
+from app.schemas.scene import (
+    SceneCreate,
+    SceneResponse,
+    SceneDetail,
+    SceneUpdate,
+    SceneBatchCreate,
+    SceneBatchReorder,
+    SceneBatchRegenerate,
+    SceneSummary,
+    SceneQueuePosition
+)
+from app.core.config import settings
+from app.core.security import get_current_user, get_token_username, get_user_from_token, oauth2_scheme
+from app.core.cache import get_cached_response, set_cached_response, cached_json_response, mark_project_changed
+from app.services.admission import check_render_admission
+from app.services.media_gc import delete_scene_media
+from app.services.render_lease import lease_values, take_lease
+from app.services.render_queue import enqueue_renders, render_scheduler
 from uuid import UUID
 
 router = APIRouter()
@@ -16,7 +32,6 @@ router = APIRouter()
 def create_scene(
     project_id: UUID,
     scene: SceneCreate, 
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -31,22 +46,229 @@ def create_scene(
             detail="Project not found"
         )
     
+    # Refuse before enqueueing if the user is out of render capacity
+    check_render_admission(db, current_user)
+    
     # Create scene
     db_scene = Scene(
         project_id=project_id,
         prompt=scene.prompt,
+        narration=scene.narration,
         order=scene.order,
-        status=SceneStatus.PENDING
+        render_profile=scene.render_profile.value,
+        status=SceneStatus.PENDING,
+        **lease_values()
     )
     db.add(db_scene)
     db.commit()
     db.refresh(db_scene)
     
-    # Generate animation in the background
-    background_tasks.add_task(generate_animation, db_scene.id)
+    # Queue the render behind other users' work according to fair share
+    enqueue_renders(
+        current_user, project_id, {db_scene.id: db_scene.render_version},
+        profiled=[db_scene.id] if scene.profile_render else ()
+    )
     
     return db_scene
 
+@router.post("/{project_id}/scenes/batch", response_model=List[SceneSummary])
+def create_scenes_batch(
+    project_id: UUID,
+    batch: SceneBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if project exists and belongs to the user
+    project = db.query(Project).filter(
+        Project.id == project_id, 
+        Project.user_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    # Refuse before enqueueing if the user is out of render capacity
+    check_render_admission(db, current_user, jobs=len(batch.scenes))
+    
+    # Create all scenes in a single transaction
+    db_scenes = [
+        Scene(
+            project_id=project_id,
+            prompt=scene.prompt,
+            narration=scene.narration,
+            order=scene.order,
+            render_profile=scene.render_profile.value,
+            status=SceneStatus.PENDING,
+            **lease_values()
+        )
+        for scene in batch.scenes
+    ]
+    db.add_all(db_scenes)
+    db.flush()
+    # Read before the commit expires them, to avoid a reload per scene
+    scene_versions = {db_scene.id: db_scene.render_version for db_scene in db_scenes}
+    scene_ids = list(scene_versions)
+    profiled = [db_scene.id for db_scene, scene in zip(db_scenes, batch.scenes) if scene.profile_render]
+    db.commit()
+    
+    # Queue the renders; they are interleaved fairly with other users' work
+    enqueue_renders(current_user, project_id, scene_versions, profiled=profiled)
+    
+    return [
+        SceneSummary(id=scene_id, order=scene.order, status=SceneStatus.PENDING)
+        for scene_id, scene in zip(scene_ids, batch.scenes)
+    ]
+
+@router.post("/{project_id}/scenes/reorder", response_model=List[SceneSummary])
+def reorder_scenes(
+    project_id: UUID,
+    batch: SceneBatchReorder,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if project exists and belongs to the user
+    project = db.query(Project).filter(
+        Project.id == project_id, 
+        Project.user_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    new_orders = {item.id: item.order for item in batch.scenes}
+    if len(new_orders) != len(batch.scenes):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicate scene IDs in request"
+        )
+    
+    # Update every scene's order in one statement
+    result = db.execute(
+        update(Scene)
+        .where(Scene.project_id == project_id, Scene.id.in_(new_orders.keys()))
+        .values(order=case(new_orders, value=Scene.id))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(new_orders):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
+        )
+    mark_project_changed(db, project_id)
+    db.commit()
+    
+    scenes = db.query(Scene.id, Scene.order, Scene.status).filter(
+        Scene.project_id == project_id
+    ).order_by(Scene.order).all()
+    return [
+        SceneSummary(id=scene_id, order=order, status=scene_status)
+        for scene_id, order, scene_status in scenes
+    ]
+
+@router.post("/{project_id}/scenes/regenerate", response_model=List[SceneSummary])
+def regenerate_scenes(
+    project_id: UUID,
+    batch: SceneBatchRegenerate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if project exists and belongs to the user
+    project = db.query(Project).filter(
+        Project.id == project_id, 
+        Project.user_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    requested_ids = set(batch.scene_ids)
+    scenes = db.query(Scene.id, Scene.order, Scene.status).filter(
+        Scene.project_id == project_id,
+        Scene.id.in_(requested_ids)
+    ).order_by(Scene.order).all()
+    if len(scenes) != len(requested_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
+        )
+    
+    # Scenes that are already queued or rendering keep their current job
+    scene_ids = [
+        scene_id for scene_id, _, scene_status in scenes
+        if scene_status not in (SceneStatus.PENDING, SceneStatus.PROCESSING)
+    ]
+    if scene_ids:
+        # Refuse before enqueueing if the user is out of render capacity
+        check_render_admission(db, current_user, jobs=len(scene_ids))
+        
+        values = {"status": SceneStatus.PENDING, "render_version": Scene.render_version + 1, **lease_values()}
+        if batch.render_profile is not None:
+            values["render_profile"] = batch.render_profile.value
+        scene_versions = dict(db.execute(
+            update(Scene)
+            .where(Scene.id.in_(scene_ids))
+            .values(**values)
+            .returning(Scene.id, Scene.render_version)
+            .execution_options(synchronize_session=False)
+        ).all())
+        mark_project_changed(db, project_id)
+        db.commit()
+        
+        # Queue the renders; they are interleaved fairly with other users' work
+        enqueue_renders(current_user, project_id, scene_versions, profiled=scene_ids if batch.profile_render else ())
+    
+    queued = set(scene_ids)
+    return [
+        SceneSummary(
+            id=scene_id,
+            order=order,
+            status=SceneStatus.PENDING if scene_id in queued else scene_status
+        )
+        for scene_id, order, scene_status in scenes
+    ]
+
+def _queue_positions(scenes) -> List[SceneQueuePosition]:
+    positions = render_scheduler.queue_positions([scene.id for scene in scenes])
+    return [
+        SceneQueuePosition(
+            scene_id=scene.id,
+            status=scene.status,
+            position=positions[scene.id][0] if scene.id in positions else None,
+            estimated_start_seconds=round(positions[scene.id][1]) if scene.id in positions else None
+        )
+        for scene in scenes
+    ]
+
+@router.get("/{project_id}/scenes/queue", response_model=List[SceneQueuePosition])
+def get_queue_positions(
+    project_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if project exists and belongs to the user
+    project = db.query(Project).filter(
+        Project.id == project_id, 
+        Project.user_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    scenes = db.query(Scene.id, Scene.status).filter(
+        Scene.project_id == project_id,
+        Scene.status == SceneStatus.PENDING
+    ).order_by(Scene.order).all()
+    return _queue_positions(scenes)
+
 @router.get("/{project_id}/scenes", response_model=List[SceneResponse])
 def get_scenes(
     project_id: UUID,
@@ -71,10 +293,20 @@ def get_scenes(
 def get_scene(
     project_id: UUID,
     scene_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    username: str = Depends(get_token_username),
+    db: Session = Depends(get_db)
 ):
+    # Serve unchanged scenes from the shared cache without querying the database
+    resource = f"scene:{scene_id}"
+    version, body = get_cached_response(project_id, resource, username)
+    if body is not None:
+        return cached_json_response(request, body, version)
+    
     try:
+        current_user = get_user_from_token(token, db)
+        
         # Check if project exists and belongs to the user
         project = db.query(Project).filter(
             Project.id == project_id, 
@@ -95,20 +327,52 @@ def get_scene(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Scene not found"
             )
-        return scene
     except ValueError:
         # Handle invalid UUID format
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid ID format"
         )
+    
+    body = SceneDetail.model_validate(scene).model_dump_json().encode()
+    if version is not None:
+        set_cached_response(project_id, resource, version, username, body)
+    return cached_json_response(request, body, version)
+
+@router.get("/{project_id}/scenes/{scene_id}/queue", response_model=SceneQueuePosition)
+def get_queue_position(
+    project_id: UUID,
+    scene_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Check if project exists and belongs to the user
+    project = db.query(Project).filter(
+        Project.id == project_id, 
+        Project.user_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    scene = db.query(Scene.id, Scene.status).filter(
+        Scene.id == scene_id,
+        Scene.project_id == project_id
+    ).first()
+    if not scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
+        )
+    return _queue_positions([scene])[0]
 
 @router.put("/{project_id}/scenes/{scene_id}", response_model=SceneResponse)
 def update_scene(
     project_id: UUID,
     scene_id: UUID,
     scene_update: SceneUpdate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -144,22 +408,53 @@ def update_scene(
         if "prompt" in update_data and update_data["prompt"] != db_scene.prompt:
             regenerate = True
             
+        # Regenerate if the voice-over script changes
+        if "narration" in update_data and update_data["narration"] != db_scene.narration:
+            regenerate = True
+            
+        # Regenerate in another profile, e.g. for export
+        if "render_profile" in update_data:
+            if update_data["render_profile"] is None:
+                del update_data["render_profile"]
+            else:
+                update_data["render_profile"] = update_data["render_profile"].value
+                if update_data["render_profile"] != db_scene.render_profile:
+                    regenerate = True
+            
+        # Re-render under the profiler, while profiling is enabled
+        profile_render = bool(update_data.pop("profile_render", False)) and settings.PROFILING_ENABLED
+        if profile_render:
+            regenerate = True
+            
         # Regenerate if status is changed from FAILED to PENDING
         if ("status" in update_data and 
             update_data["status"] == SceneStatus.PENDING and 
             db_scene.status == SceneStatus.FAILED):
             regenerate = True
         
+        # Refuse before enqueueing if the user is out of render capacity;
+        # a render of this scene still queued or running is replaced, not added to
+        if regenerate:
+            check_render_admission(db, current_user, replacing=[db_scene.id])
+        
         # Apply updates
         for field, value in update_data.items():
             setattr(db_scene, field, value)
         
+        # A new render version supersedes a render still queued or running
         if regenerate:
             db_scene.status = SceneStatus.PENDING
-            background_tasks.add_task(generate_animation, db_scene.id)
+            db_scene.render_version = Scene.render_version + 1
+            take_lease(db_scene)
         
         db.commit()
         db.refresh(db_scene)
+        
+        if regenerate:
+            enqueue_renders(
+                current_user, project_id, {db_scene.id: db_scene.render_version},
+                profiled=[db_scene.id] if profile_render else ()
+            )
         return db_scene
     except ValueError:
         # Handle invalid UUID format
@@ -196,6 +491,10 @@ def delete_scene(
             detail="Scene not found"
         )
     
+    video_url = db_scene.video_url
     db.delete(db_scene)
     db.commit()
+    # Stop its render; one running in another worker finds the scene gone when it commits
+    render_scheduler.cancel([scene_id])
+    delete_scene_media([video_url])
     return None 
\ No newline at end of file
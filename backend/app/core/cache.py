@@ -0,0 +1,142 @@
+from itertools import chain
+import logging
+import time
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import redis
+from app.core.config import settings
+from app.models.project import Project
+from app.models.scene import Scene
+
+logger = logging.getLogger(__name__)
+
+# Per-project version counters and cached response bodies live in Redis so
+# every API process shares them. Without Redis, conditional GETs and the
+# response cache are simply disabled.
+redis_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.CACHE_REDIS_DB,
+    socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+)
+
+CHANGED_PROJECTS_KEY = "changed_projects"
+
+
+def _version_key(project_id) -> str:
+    return f"project_version:{project_id}"
+
+
+def _response_key(project_id, resource: str) -> str:
+    return f"project_response:{project_id}:{resource}"
+
+
+def _initial_version() -> int:
+    # Seed from the clock so a flushed Redis never reissues old ETags
+    return int(time.time() * 1000)
+
+
+def _seed_version(project_id) -> int:
+    key = _version_key(project_id)
+    redis_client.set(key, _initial_version(), nx=True)
+    return int(redis_client.get(key))
+
+
+def bump_project_versions(project_ids):
+    if not project_ids:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for project_id in project_ids:
+            pipe.set(_version_key(project_id), _initial_version(), nx=True)
+            pipe.incr(_version_key(project_id))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Project version bump failed: {e}")
+
+
+def make_etag(version: int) -> str:
+    return f'W/"{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" matches "x"
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates
+    )
+
+
+def get_cached_response(project_id, resource: str, username: str):
+    """
+    Look up the project's version and cached body in one round trip.
+
+    Returns (version, body). version is None when Redis is unavailable; body
+    is None unless a response for this version belonging to `username` is
+    cached.
+    """
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(_version_key(project_id))
+        pipe.hmget(_response_key(project_id, resource), "version", "owner", "body")
+        version, (cached_version, owner, body) = pipe.execute()
+        version = _seed_version(project_id) if version is None else int(version)
+    except Exception as e:
+        logger.warning(f"Response cache lookup failed: {e}")
+        return None, None
+    if cached_version is None or int(cached_version) != version:
+        return version, None
+    if owner is None or owner.decode() != username:
+        return version, None
+    return version, body
+
+
+def set_cached_response(project_id, resource: str, version: int, username: str, body: bytes):
+    key = _response_key(project_id, resource)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping={"version": version, "owner": username, "body": body})
+        pipe.expire(key, settings.RESPONSE_CACHE_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Response cache store failed: {e}")
+
+
+def cached_json_response(request: Request, body: bytes, version: int = None) -> Response:
+    """Build a JSON response, or a bare 304 if the client already has this version."""
+    if version is None:
+        return Response(content=body, media_type="application/json")
+    etag = make_etag(version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def mark_project_changed(session: Session, project_id):
+    """Record a change the ORM cannot see, such as a bulk UPDATE statement."""
+    session.info.setdefault(CHANGED_PROJECTS_KEY, set()).add(project_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_projects(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Project):
+            mark_project_changed(session, obj.id)
+        elif isinstance(obj, Scene) and obj.project_id is not None:
+            mark_project_changed(session, obj.project_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_changed_projects(session):
+    # Sessions commit off the event loop: in the threadpool, or on a RenderSession's thread
+    bump_project_versions(session.info.pop(CHANGED_PROJECTS_KEY, None))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_projects(session):
+    session.info.pop(CHANGED_PROJECTS_KEY, None)
@@ -0,0 +1,222 @@
+import gzip
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Optional encoders; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Only text-like bodies are worth compressing. Video, images, archives and
+# event streams (which must not be buffered) are passed through untouched.
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/html",
+    "text/plain",
+    "text/xml",
+)
+UNCOMPRESSED_STATUSES = {204, 206, 304}
+
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental encoder for responses sent in several body messages."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+            self._feed = self._compressor.process
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+            self._flush = lambda: self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self._finish = self._compressor.flush
+            self._feed = self._compressor.compress
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+            self._feed = self._compressor.compress
+
+    def feed(self, chunk: bytes, last: bool) -> bytes:
+        data = self._feed(chunk)
+        return data + (self._finish() if last else self._flush())
+
+
+class CompressedBodyCache:
+    """
+    LRU of compressed bodies keyed by a digest of the uncompressed bytes.
+
+    Responses that repeat byte for byte (the OpenAPI schema, project and
+    scene reads served from the response cache) are compressed once per
+    encoding. Bounded by the total size of the stored compressed bodies.
+    """
+
+    def __init__(self, max_bytes: int, max_body_size: int):
+        self.max_bytes = max_bytes
+        self.max_body_size = max_body_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, encoding: str, body: bytes) -> bytes:
+        if len(body) > self.max_body_size or not self.max_bytes:
+            return _compress(encoding, body)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                return compressed
+        compressed = _compress(encoding, body)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = compressed
+                self._size += len(compressed)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return compressed
+
+
+def available_encodings():
+    encodings = []
+    for encoding in settings.COMPRESSION_ENCODINGS:
+        if encoding == "br" and brotli is None or encoding == "zstd" and zstandard is None:
+            continue
+        encodings.append(encoding)
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings) -> str:
+    """Pick the first of `encodings` (server preference order) the client accepts."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in encodings:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Content-type aware response compression, replacing GZipMiddleware.
+
+    Negotiates Brotli, zstd or gzip (COMPRESSION_ENCODINGS, in server
+    preference order; missing optional packages are skipped) for text-like
+    responses of at least `minimum_size` bytes. Media paths bypass the
+    middleware entirely, and anything already encoded, non-text or partial is
+    passed through so Range and streaming responses keep working.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, skip_paths=("/media",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.skip_paths = tuple(skip_paths)
+        self.encodings = available_encodings()
+        self.cache = CompressedBodyCache(settings.COMPRESSION_CACHE_BYTES, settings.COMPRESSION_CACHE_MAX_BODY)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if self.start_message["status"] in UNCOMPRESSED_STATUSES or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if not self._should_compress(headers):
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding is None or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            headers["Content-Encoding"] = self.encoding
+            if not more_body:
+                # Whole body in one message: compress once, or reuse a cached copy
+                compressed = self.middleware.cache.get_or_compress(self.encoding, body)
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            del headers["Content-Length"]
+            self.compressor = _StreamCompressor(self.encoding)
+            await self._send(self.start_message)
+
+        await self._send({
+            "type": "http.response.body",
+            "body": self.compressor.feed(body, last=not more_body),
+            "more_body": more_body,
+        })
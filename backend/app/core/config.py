@@ -1,11 +1,14 @@
 import os
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from pathlib import Path
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Keys of voiceover.TTS_ENGINES; listed here so a bad TTS_ENGINE fails at startup
+TTS_ENGINE_NAMES = ("espeak", "piper", "tone")
+
 class Settings(BaseModel):
     # Application settings
     PROJECT_NAME: str = "Syntax Motion"
@@ -15,18 +18,41 @@ class Settings(BaseModel):
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 day
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_LIMIT: int = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+    ADMIN_USERNAMES: list = [name for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name]  # users allowed on /admin endpoints
     
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     
     # Groq API settings
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY")
+    GROQ_API_URL: str = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")  # any OpenAI-compatible chat completions URL
     
     # Redis settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     REDIS_URL: str = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
     
+    # Response cache settings
+    CACHE_REDIS_DB: int = int(os.getenv("CACHE_REDIS_DB", "2"))
+    CACHE_REDIS_TIMEOUT: float = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))  # seconds
+    RESPONSE_CACHE_TTL: int = int(os.getenv("RESPONSE_CACHE_TTL", "300"))  # seconds
+    
+    # Response compression (JSON and other text; media is never compressed)
+    COMPRESSION_ENCODINGS: list = os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip").split(",")  # server preference order
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))  # bytes
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_CACHE_BYTES: int = int(os.getenv("COMPRESSION_CACHE_BYTES", str(8 * 1024 * 1024)))  # compressed bodies kept for reuse
+    COMPRESSION_CACHE_MAX_BODY: int = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", str(1024 * 1024)))  # larger bodies are not cached
+    
+    # Scene event stream settings
+    EVENTS_KEEPALIVE_SECONDS: int = int(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+    EVENTS_RECONNECT_DELAY: float = float(os.getenv("EVENTS_RECONNECT_DELAY", "1.0"))
+    EVENTS_QUEUE_SIZE: int = 64
+    
     # Celery settings
     CELERY_BROKER_URL: str = REDIS_URL
     CELERY_RESULT_BACKEND: str = REDIS_URL
@@ -35,17 +61,108 @@ class Settings(BaseModel):
     MEDIA_ROOT: str = os.getenv("MEDIA_ROOT", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "media"))
     VIDEO_DIR: str = os.path.join(MEDIA_ROOT, "videos")
     AUDIO_DIR: str = f"{MEDIA_ROOT}/audio"
+    MEDIA_ACCEL_REDIRECT_PREFIX: str = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")  # e.g. /protected-media/ to let nginx serve files
+    MEDIA_FASTSTART: bool = os.getenv("MEDIA_FASTSTART", "true").lower() == "true"  # move the MP4 index to the front after rendering
+    HLS_ENABLED: bool = os.getenv("HLS_ENABLED", "false").lower() == "true"  # also package scenes as HLS (fragmented MP4 segments)
+    HLS_SEGMENT_SECONDS: int = int(os.getenv("HLS_SEGMENT_SECONDS", "2"))  # target length; segments are cut at keyframes
+    PREVIEW_THUMBNAIL_WIDTH: int = int(os.getenv("PREVIEW_THUMBNAIL_WIDTH", "320"))  # pixels
+    PREVIEW_SPRITE_WIDTH: int = int(os.getenv("PREVIEW_SPRITE_WIDTH", "160"))  # width of each seek-preview tile
+    PREVIEW_SPRITE_COLUMNS: int = int(os.getenv("PREVIEW_SPRITE_COLUMNS", "10"))
+    PREVIEW_SPRITE_FRAMES: int = int(os.getenv("PREVIEW_SPRITE_FRAMES", "100"))  # max tiles per sprite
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")  # "local" (MEDIA_ROOT) or "s3"
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")  # e.g. http://minio:9000; empty for AWS
+    S3_REGION: str = os.getenv("S3_REGION", "")
+    S3_ACCESS_KEY_ID: str = os.getenv("S3_ACCESS_KEY_ID", "")
+    S3_SECRET_ACCESS_KEY: str = os.getenv("S3_SECRET_ACCESS_KEY", "")
+    S3_PUBLIC_URL: str = os.getenv("S3_PUBLIC_URL", "")  # public bucket or CDN base URL; presigned URLs when empty
+    S3_PRESIGN_EXPIRES: int = int(os.getenv("S3_PRESIGN_EXPIRES", "3600"))  # seconds
+    S3_MULTIPART_CHUNK_MB: int = int(os.getenv("S3_MULTIPART_CHUNK_MB", "8"))  # upload part size
+    MEDIA_GC_INTERVAL: int = int(os.getenv("MEDIA_GC_INTERVAL", "3600"))  # seconds between collection passes; 0 disables
+    MEDIA_GC_GRACE_SECONDS: int = int(os.getenv("MEDIA_GC_GRACE_SECONDS", "3600"))  # unreferenced files younger than this are kept
+    MEDIA_GC_DELETE_RATE: float = float(os.getenv("MEDIA_GC_DELETE_RATE", "50"))  # files per second; 0 for no limit
+    MEDIA_GC_MAX_DELETES: int = int(os.getenv("MEDIA_GC_MAX_DELETES", "5000"))  # per pass
+    MEDIA_QUOTA_MB: int = int(os.getenv("MEDIA_QUOTA_MB", "0"))  # evict derived files above this; 0 for no quota
     
     # Animation settings
     ANIMATION_TIMEOUT: int = 60 * 5  # 5 minutes
+    RENDER_LOG_DIR: str = os.getenv("RENDER_LOG_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "render_logs"))
+    RENDER_LOG_TAIL_LINES: int = int(os.getenv("RENDER_LOG_TAIL_LINES", "200"))
+    RENDER_PROGRESS_INTERVAL: float = float(os.getenv("RENDER_PROGRESS_INTERVAL", "1.0"))  # seconds between progress updates
+    RENDER_DEFAULT_PROFILE: str = os.getenv("RENDER_DEFAULT_PROFILE", "standard")  # preview, standard or export
+    RENDER_TRACE_ATTEMPTS: int = int(os.getenv("RENDER_TRACE_ATTEMPTS", "10"))  # stage timelines kept per scene; 0 disables
+    
+    # Render sandbox: limits on the manim process and those it starts; 0 leaves a limit unset
+    RENDER_SANDBOX_ENABLED: bool = os.getenv("RENDER_SANDBOX_ENABLED", "true").lower() == "true"
+    RENDER_MAX_MEMORY_MB: int = int(os.getenv("RENDER_MAX_MEMORY_MB", "4096"))  # address space per process
+    RENDER_MAX_CPU_SECONDS: int = int(os.getenv("RENDER_MAX_CPU_SECONDS", "600"))  # CPU time per process
+    RENDER_MAX_OPEN_FILES: int = int(os.getenv("RENDER_MAX_OPEN_FILES", "1024"))
+    RENDER_MAX_PROCESSES: int = int(os.getenv("RENDER_MAX_PROCESSES", "1024"))  # counts every process and thread of the API's user
+    RENDER_NETWORK_ISOLATION: bool = os.getenv("RENDER_NETWORK_ISOLATION", "true").lower() == "true"  # needs unprivileged user namespaces
+    
+    # Voice-over (text to speech, generated while the scene renders)
+    TTS_ENGINE: str = os.getenv("TTS_ENGINE", "espeak")  # espeak, piper or tone (a test stand-in); empty disables narration
+    TTS_VOICE: str = os.getenv("TTS_VOICE", "en-us")  # espeak voice
+    TTS_PIPER_MODEL: str = os.getenv("TTS_PIPER_MODEL", "")  # path to a piper .onnx voice
+    TTS_WORDS_PER_MINUTE: int = int(os.getenv("TTS_WORDS_PER_MINUTE", "160"))
+    TTS_MAX_TEMPO: float = float(os.getenv("TTS_MAX_TEMPO", "1.25"))  # max speed-up to fit narration to the video
+    TTS_TIMEOUT: int = int(os.getenv("TTS_TIMEOUT", "120"))  # seconds
+    
+    # Render admission control (per user)
+    RENDER_MAX_OUTSTANDING_JOBS: int = int(os.getenv("RENDER_MAX_OUTSTANDING_JOBS", "10"))
+    RENDER_CPU_BUDGET: int = int(os.getenv("RENDER_CPU_BUDGET", "1800"))  # CPU seconds per window
+    RENDER_CPU_WINDOW: int = int(os.getenv("RENDER_CPU_WINDOW", "3600"))  # seconds
+    RENDER_ESTIMATED_CPU_SECONDS: float = float(os.getenv("RENDER_ESTIMATED_CPU_SECONDS", "60"))  # cost of a render with no history
+    RENDER_ESTIMATED_SECONDS: float = float(os.getenv("RENDER_ESTIMATED_SECONDS", "120"))  # typical wall time of a render
+    
+    # Render scheduling (weighted fair share across users or projects)
+    RENDER_CONCURRENCY: int = int(os.getenv("RENDER_CONCURRENCY", "2"))  # renders running at once per API process
+    RENDER_USER_CONCURRENCY: int = int(os.getenv("RENDER_USER_CONCURRENCY", "1"))  # renders running at once per user or project
+    RENDER_FAIR_SHARE_KEY: str = os.getenv("RENDER_FAIR_SHARE_KEY", "user")  # "user" or "project"
+    
+    # Render leases: a worker renews the lease of each render it holds; expired ones are requeued
+    RENDER_LEASE_SECONDS: int = int(os.getenv("RENDER_LEASE_SECONDS", "60"))
+    RENDER_HEARTBEAT_INTERVAL: float = float(os.getenv("RENDER_HEARTBEAT_INTERVAL", "15"))  # seconds between renewals and sweeps
+    RENDER_MAX_ATTEMPTS: int = int(os.getenv("RENDER_MAX_ATTEMPTS", "3"))  # expired leases in a row before the scene fails
+    
+    SCENE_BATCH_LIMIT: int = int(os.getenv("SCENE_BATCH_LIMIT", "100"))  # max scenes per batch request
 
     # Security settings
     CODE_EXECUTION_TIMEOUT: int = int(os.getenv("CODE_EXECUTION_TIMEOUT", "300"))  # 5 min timeout
     ALLOWED_MANIM_MODULES: list = ["manim", "numpy"]
     
+    # Monitoring
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # Prometheus /metrics; keep it off the public network
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"  # honour X-Profile: 1 from admins and profile_render on scenes
+    PROFILE_REQUEST_SAMPLE_RATE: float = float(os.getenv("PROFILE_REQUEST_SAMPLE_RATE", "0"))  # fraction of API requests profiled with cProfile
+    PROFILE_RENDER_SAMPLE_RATE: float = float(os.getenv("PROFILE_RENDER_SAMPLE_RATE", "0"))  # fraction of renders run under py-spy
+    PROFILE_RENDER_FORMAT: str = os.getenv("PROFILE_RENDER_FORMAT", "flamegraph")  # py-spy output: flamegraph (SVG), raw (collapsed stacks) or speedscope
+    PROFILE_RENDER_RATE: int = int(os.getenv("PROFILE_RENDER_RATE", "100"))  # py-spy samples per second
+    PROFILE_RETENTION_SECONDS: int = int(os.getenv("PROFILE_RETENTION_SECONDS", str(7 * 24 * 3600)))  # stored profiles are removed after this
+    
     # Rate limiting
     RATE_LIMIT_REQUESTS: int = int(os.getenv("RATE_LIMIT_REQUESTS", "10"))
     RATE_LIMIT_WINDOW: int = int(os.getenv("RATE_LIMIT_WINDOW", "60"))  # seconds
+    RATE_LIMIT_FALLBACK_BUCKETS: int = int(os.getenv("RATE_LIMIT_FALLBACK_BUCKETS", "10"))
+    RATE_LIMIT_FALLBACK_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_FALLBACK_MAX_KEYS", "100000"))
+    RATE_LIMIT_REDIS_TIMEOUT: float = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.25"))  # seconds
+    RATE_LIMIT_REDIS_COOLDOWN: float = float(os.getenv("RATE_LIMIT_REDIS_COOLDOWN", "5"))  # seconds Redis is skipped after a failure
+
+    @model_validator(mode="after")
+    def check_settings(self):
+        if self.TTS_ENGINE and self.TTS_ENGINE not in TTS_ENGINE_NAMES:
+            raise ValueError(f"TTS_ENGINE must be one of {', '.join(TTS_ENGINE_NAMES)} or empty, not {self.TTS_ENGINE!r}")
+        for name in ("RENDER_CONCURRENCY", "RENDER_USER_CONCURRENCY"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be at least 1, not {getattr(self, name)}")
+        # Leases would lapse between renewals and workers would take over each
+        # other's renders; an interval of 0 turns leases off
+        if 0 < self.RENDER_HEARTBEAT_INTERVAL and self.RENDER_LEASE_SECONDS <= self.RENDER_HEARTBEAT_INTERVAL:
+            raise ValueError(
+                f"RENDER_HEARTBEAT_INTERVAL ({self.RENDER_HEARTBEAT_INTERVAL}) must be shorter than "
+                f"RENDER_LEASE_SECONDS ({self.RENDER_LEASE_SECONDS})"
+            )
+        return self
 
     def __init__(self):
         # Ensure media directories exist
@@ -0,0 +1,158 @@
+import hashlib
+import mimetypes
+import os
+import re
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+from app.core.config import settings
+
+# {scene_id}.{content hash}.mp4, derived files such as {scene_id}.{content hash}.poster.jpg,
+# or a file inside hls/{scene_id}.{content hash}/ -- the URL changes whenever the bytes do
+HASHED_NAME_PATTERN = re.compile(r"\.[0-9a-f]{16}(\.[A-Za-z0-9.]+$|/)")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+CHUNK_SIZE = 256 * 1024
+
+# HLS types are missing from the default tables
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/iso.segment", ".m4s")
+
+
+def hashed_filename(path: str, stem: str) -> str:
+    """Return `{stem}.{first 16 hex digits of sha256}{ext}` for the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    extension = os.path.splitext(path)[1]
+    return f"{stem}.{digest.hexdigest()[:16]}{extension}"
+
+
+def parse_range(header: str, size: int):
+    """
+    Parse a single-range `Range` header into an inclusive (start, end).
+
+    Returns None when the header should be ignored (absent, malformed or
+    multiple ranges, in which case the whole file is sent) and raises
+    ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range starts past the end of the file")
+    return start, end
+
+
+class RangeFileResponse(FileResponse):
+    """
+    FileResponse that serves a single byte range with 206 Partial Content.
+
+    Uses the ASGI zero-copy send extension when the server offers it and
+    falls back to reading the file in chunks otherwise.
+    """
+
+    byte_range = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.headers["accept-ranges"] = "bytes"
+
+    def set_byte_range(self, start: int, end: int):
+        self.byte_range = (start, end)
+        self.status_code = 206
+        self.headers["content-range"] = f"bytes {start}-{end}/{self.stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        remaining = end - start + 1
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": start,
+                    "count": remaining,
+                    "more_body": False,
+                })
+            return
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(start)
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # The file shrank under us; end the body rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class MediaFiles(StaticFiles):
+    """
+    StaticFiles for rendered media.
+
+    Adds byte-range support so video seeking fetches only what is needed,
+    marks content-hashed files immutable so replays come from the browser
+    cache, and optionally hands the transfer to the front proxy with
+    X-Accel-Redirect (MEDIA_ACCEL_REDIRECT_PREFIX), which then serves it
+    with sendfile and its own range handling.
+    """
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        path = scope["path"]
+        cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_NAME_PATTERN.search(path) else REVALIDATE_CACHE_CONTROL
+
+        response = RangeFileResponse(
+            full_path, status_code=status_code, stat_result=stat_result, method=scope["method"]
+        )
+        if settings.MEDIA_ACCEL_REDIRECT_PREFIX and status_code == 200:
+            return Response(headers={
+                "X-Accel-Redirect": settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + path.lstrip("/"),
+                "Content-Type": response.media_type,
+                "Cache-Control": cache_control,
+            })
+        response.headers["cache-control"] = cache_control
+
+        if_range = request_headers.get("if-range")
+        if status_code == 200 and if_range in (None, response.headers["etag"], response.headers["last-modified"]):
+            try:
+                byte_range = parse_range(request_headers.get("range"), stat_result.st_size)
+            except ValueError:
+                return Response(status_code=416, headers={
+                    "Content-Range": f"bytes */{stat_result.st_size}",
+                    "Cache-Control": cache_control,
+                })
+            if byte_range is not None:
+                response.set_byte_range(*byte_range)
+                return response
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
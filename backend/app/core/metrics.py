@@ -0,0 +1,129 @@
+"""
+Prometheus metrics.
+
+Labels only take values from fixed sets (stage names, failure reasons,
+route templates, status classes), never IDs or raw paths, so the number
+of series stays bounded. Values are per process; with several workers,
+set PROMETHEUS_MULTIPROC_DIR to a shared empty directory to aggregate
+them across workers.
+"""
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+RENDER_STAGE_SECONDS = Histogram(
+    "render_stage_seconds",
+    "Time spent in each stage of a scene render",
+    ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600),
+)
+RENDERS_TOTAL = Counter(
+    "renders_total",
+    "Finished renders by outcome: completed, or the class of failure",
+    ["outcome"],
+)
+RENDER_QUEUE_WAIT_SECONDS = Histogram(
+    "render_queue_wait_seconds",
+    "Time from enqueueing a render to starting it",
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+RENDER_QUEUE_DEPTH = Gauge("render_queue_depth", "Renders waiting to start", multiprocess_mode="livesum")
+RENDERS_IN_FLIGHT = Gauge("renders_in_flight", "Renders running", multiprocess_mode="livesum")
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds",
+    "LLM API latency per caller",
+    ["endpoint", "result"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_TOKENS_TOTAL = Counter(
+    "llm_tokens_total",
+    "LLM tokens used per caller, as reported by the API",
+    ["endpoint", "kind"],
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Time until the response starts, per route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+@contextmanager
+def observe_llm_request(endpoint: str):
+    """Time an LLM call; it counts as an error if the block raises."""
+    start = time.perf_counter()
+    result = "error"
+    try:
+        yield
+        result = "ok"
+    finally:
+        LLM_REQUEST_SECONDS.labels(endpoint, result).observe(time.perf_counter() - start)
+
+
+def record_llm_usage(endpoint: str, response_data: dict):
+    usage = response_data.get("usage") or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            LLM_TOKENS_TOTAL.labels(endpoint, kind.removesuffix("_tokens")).inc(usage[kind])
+
+
+def metrics_response() -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+class HTTPMetricsMiddleware:
+    """
+    Observe request latency per route template (/api/v1/projects/{project_id}),
+    method and status class. The time is taken when the response starts, so
+    event streams count their time to first byte rather than their lifetime.
+    """
+
+    def __init__(self, app: ASGIApp, routes):
+        self.app = app
+        self.routes = routes
+
+    def route_template(self, scope: Scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # Matched up front: routing rewrites the scope's path for mounted apps
+        route = self.route_template(scope)
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                HTTP_REQUEST_SECONDS.labels(
+                    method, route, f"{message['status'] // 100}xx"
+                ).observe(time.perf_counter() - start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,172 @@
+import math
+import time
+import uuid
+from collections import OrderedDict
+import redis.asyncio as aioredis
+from app.core.config import settings
+
+# Exact sliding-window log, evaluated atomically in a single round trip.
+# Timestamps come from the Redis server clock so API nodes with skewed clocks
+# agree. Rejected requests are not recorded, so a client that keeps retrying
+# is admitted again as soon as its oldest counted request leaves the window.
+# Returns {allowed, count, reset_ms}.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local member = ARGV[3]
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', key, now, member)
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', key, window)
+
+local reset = now + window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window
+end
+return {allowed, count, reset}
+"""
+
+
+class RateLimitResult:
+    __slots__ = ("allowed", "count", "reset")
+
+    def __init__(self, allowed: bool, count: int, reset: float):
+        self.allowed = allowed
+        self.count = count
+        self.reset = reset  # unix time (seconds) when the oldest counted request expires
+
+
+class RedisRateLimiter:
+    """
+    Sliding-window rate limiter backed by an async Redis client.
+
+    A failed call opens a circuit breaker: `available()` is False for
+    `cooldown` seconds, so requests go straight to the fallback instead of
+    each waiting out the Redis timeout. After the cool-down a single request
+    probes Redis again; the breaker closes once a call succeeds.
+    """
+
+    def __init__(self, limit: int, window: int, cooldown: float = 0.0):
+        self.limit = limit
+        self.window_ms = window * 1000
+        self.cooldown = cooldown
+        # Monotonic time before which Redis is skipped; 0 while it is healthy
+        self._retry_at = 0.0
+        self.client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=1,  # Use a separate DB for rate limiting
+            socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+        )
+        self.script = self.client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def available(self, now: float = None) -> bool:
+        """Whether to call Redis for this request, or use the fallback."""
+        now = time.monotonic() if now is None else now
+        if now < self._retry_at:
+            return False
+        if self._retry_at:
+            # Half-open: this request probes Redis, the others keep using the
+            # fallback until it answers
+            self._retry_at = now + self.cooldown
+        return True
+
+    async def hit(self, key: str) -> RateLimitResult:
+        try:
+            # Unique member per request; timestamps alone would collapse bursts
+            allowed, count, reset = await self.script(
+                keys=[key],
+                args=[self.window_ms, self.limit, uuid.uuid4().hex]
+            )
+        except Exception:
+            self._retry_at = time.monotonic() + self.cooldown
+            raise
+        self._retry_at = 0.0
+        return RateLimitResult(bool(allowed), int(count), int(reset) / 1000)
+
+
+class InMemoryRateLimiter:
+    """
+    Fixed-memory sliding-window limiter used while Redis is unreachable.
+
+    Each key keeps a ring of `buckets + 1` counters. The count is the sum of
+    the buckets inside the window, with the oldest bucket weighted by the
+    share of it still inside the window, so each hit costs O(buckets)
+    regardless of traffic. Keys live in an LRU: idle keys are evicted as
+    they fall out of the window, and at most `max_keys` are ever tracked.
+    """
+
+    def __init__(self, limit: int, window: int, buckets: int, max_keys: int):
+        self.limit = limit
+        self.window = window
+        self.buckets = buckets
+        self.bucket_width = window / buckets
+        self.max_keys = max_keys
+        # key -> [current bucket number, count per ring slot...]
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, current_bucket: int):
+        # Drop keys with no hits inside the window; at most a couple per call
+        # keeps the cost per request constant.
+        for _ in range(2):
+            if not self._entries:
+                return
+            oldest = next(iter(self._entries.values()))
+            if current_bucket - oldest[0] <= self.buckets:
+                break
+            self._entries.popitem(last=False)
+        while len(self._entries) >= self.max_keys:
+            self._entries.popitem(last=False)
+
+    def hit(self, key: str, now: float = None) -> RateLimitResult:
+        now = time.time() if now is None else now
+        ring_size = self.buckets + 1
+        current_bucket = int(now // self.bucket_width)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._evict(current_bucket)
+            entry = [current_bucket] + [0] * ring_size
+            self._entries[key] = entry
+        else:
+            self._entries.move_to_end(key)
+            # Clear the slots of buckets that have rolled over since the last hit
+            elapsed = min(current_bucket - entry[0], ring_size)
+            for offset in range(1, elapsed + 1):
+                entry[1 + (entry[0] + offset) % ring_size] = 0
+            entry[0] = current_bucket
+
+        slot = current_bucket % ring_size
+        oldest_slot = (current_bucket + 1) % ring_size
+        oldest_weight = 1 - (now % self.bucket_width) / self.bucket_width
+        count = sum(entry[1:]) - entry[1 + oldest_slot] * (1 - oldest_weight)
+
+        allowed = count < self.limit
+        if allowed:
+            entry[1 + slot] += 1
+            count += 1
+
+        # The estimate drops once the oldest non-empty bucket leaves the window.
+        # Slot (current_bucket + offset) holds bucket current_bucket + offset - ring_size,
+        # which is fully outside the window from (current_bucket + offset) * width.
+        reset = (current_bucket + ring_size) * self.bucket_width
+        for offset in range(1, ring_size):
+            if entry[1 + (current_bucket + offset) % ring_size]:
+                reset = (current_bucket + offset) * self.bucket_width
+                break
+        return RateLimitResult(allowed, math.ceil(count), reset)
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -18,4 +20,52 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+class RenderSession:
+    """
+    A SessionLocal for coroutines, such as the render pipeline.
+
+    Mirrors the AsyncSession calls the pipeline makes (`await db.get(...)`,
+    `await db.commit()`, ...) but runs each one on the session's own
+    thread, off the event loop. One thread keeps the calls in order even
+    when a cancelled coroutine leaves one running, so closing the session
+    waits for it. Loaded attributes stay usable between commits.
+    """
+
+    def __init__(self):
+        self._session = SessionLocal(expire_on_commit=False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render-db")
+
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    def add(self, instance):
+        self._session.add(instance)
+
+    async def get(self, entity, ident):
+        return await self._run(self._session.get, entity, ident)
+
+    async def scalar(self, statement):
+        return await self._run(self._session.scalar, statement)
+
+    async def execute(self, statement):
+        return await self._run(self._session.execute, statement)
+
+    async def commit(self):
+        await self._run(self._session.commit)
+
+    async def rollback(self):
+        await self._run(self._session.rollback)
+
+    async def close(self):
+        try:
+            await self._run(self._session.close)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
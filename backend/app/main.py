@@ -1,13 +1,22 @@
 import os
 from fastapi import FastAPI, APIRouter, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.gzip import GZipMiddleware
 
 from app.api.api import api_router
 from app.core.config import settings
 from app.db.database import engine, Base
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import HTTPMetricsMiddleware, metrics_response
 from app.core.middleware import rate_limit_middleware
+from app.core.security import shutdown_hash_executor
+from app.services.media_gc import media_collector
+from app.services.profiling import RequestProfilerMiddleware, instrument_routes
+from app.services.render_lease import render_leases
+from app.services.render_queue import render_scheduler
+# The scheduler imports the render pipeline lazily; importing it here makes
+# a broken pipeline stop the app at startup instead of failing every render
+from app.services import animation  # noqa: F401
+from app.services.storage import storage
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -30,17 +39,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add GZip compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compress JSON and other text responses; media passes through untouched
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
 
 # Add rate limiting middleware
 app.middleware("http")(rate_limit_middleware)
 
-# Mount media directory for serving static files
+# Latency per route; outermost, so it covers the other middleware too
+app.add_middleware(HTTPMetricsMiddleware, routes=app.routes)
+
+# Serve stored media: files under MEDIA_ROOT, or redirects to the bucket
 try:
-    # Ensure the directory exists before mounting
-    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
-    app.mount("/media", StaticFiles(directory=settings.MEDIA_ROOT), name="media")
+    app.mount("/media", storage.media_app(), name="media")
 except Exception as e:
     print(f"Warning: Could not mount static files: {e}")
 
@@ -57,6 +67,18 @@ def root():
 def health_check():
     return {"status": "ok"}
 
+# Prometheus scrape endpoint
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return metrics_response()
+
+# Opt-in request profiling; nothing is installed while it is off. Outermost,
+# and after every route is registered, so all endpoints are instrumented
+if settings.PROFILING_ENABLED or settings.PROFILE_REQUEST_SAMPLE_RATE > 0:
+    instrument_routes(app.routes)
+    app.add_middleware(RequestProfilerMiddleware)
+
 @app.on_event("startup")
 async def startup_event():
     """Create needed directories and perform other startup tasks"""
@@ -70,6 +92,23 @@ async def startup_event():
         os.makedirs(settings.AUDIO_DIR, exist_ok=True)
     
     print(f"Media directories setup complete. Videos will be stored in: {settings.VIDEO_DIR}")
+    
+    # Start dispatching queued renders
+    render_scheduler.start()
+    
+    # Renew the leases of our renders; requeue renders lost by other or earlier workers
+    render_leases.start()
+    
+    # Remove orphaned media and enforce the quota periodically
+    media_collector.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools"""
+    await render_scheduler.stop()
+    await render_leases.stop()
+    await media_collector.stop()
+    shutdown_hash_executor()
 
 if __name__ == "__main__":
     import uvicorn
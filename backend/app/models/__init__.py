@@ -2,4 +2,6 @@ from app.models.user import User
 from app.models.project import Project
 from app.models.scene import Scene, SceneStatus
 from app.models.video import Video
-from app.models.voiceover import VoiceOver 
\ No newline at end of file
+from app.models.voiceover import VoiceOver 
+from app.models.render_span import RenderSpan
+from app.models.render_cpu_usage import RenderCpuUsage
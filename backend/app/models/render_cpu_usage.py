@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Float, String, TIMESTAMP, UUID, ForeignKey, Index
+from sqlalchemy.sql import func
+import uuid
+from app.db.database import Base
+
+class RenderCpuUsage(Base):
+    """CPU time of one render attempt, whatever its outcome; charged to the user's render budget."""
+    __tablename__ = "render_cpu_usage"
+    __table_args__ = (
+        Index("ix_render_cpu_usage_user_id_created_at", "user_id", "created_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    scene_id = Column(UUID(as_uuid=True))  # no foreign key: the usage outlives a deleted scene
+    cpu_seconds = Column(Float)
+    outcome = Column(String, nullable=True)  # completed or the failure reason, as in render_spans
+    created_at = Column(TIMESTAMP, server_default=func.now())
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Float, String, TIMESTAMP, UUID, ForeignKey, Index
+from sqlalchemy.orm import relationship
+import uuid
+from app.db.database import Base
+
+class RenderSpan(Base):
+    """One timed stage of a render attempt; the "total" span carries the attempt's outcome."""
+    __tablename__ = "render_spans"
+    __table_args__ = (
+        Index("ix_render_spans_stage_started_at", "stage", "started_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    scene_id = Column(UUID(as_uuid=True), ForeignKey("scenes.id", ondelete="CASCADE"), index=True)
+    attempt_id = Column(UUID(as_uuid=True))  # spans of the same render attempt share it
+    stage = Column(String)  # queue, llm, sanitize, render, ..., total
+    started_at = Column(TIMESTAMP)  # UTC
+    duration = Column(Float)  # seconds
+    outcome = Column(String, nullable=True)  # total span only: completed or the failure reason
+    
+    # Relationships
+    scene = relationship("Scene", back_populates="render_spans")
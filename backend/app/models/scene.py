@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, TIMESTAMP, UUID, ForeignKey, Integer, Enum
+from sqlalchemy import Column, String, Text, TIMESTAMP, UUID, ForeignKey, Integer, Enum, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -11,19 +11,39 @@ class SceneStatus(str, enum.Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class RenderProfile(str, enum.Enum):
+    PREVIEW = "preview"
+    STANDARD = "standard"
+    EXPORT = "export"
+
 class Scene(Base):
     __tablename__ = "scenes"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"))
     prompt = Column(Text)
+    narration = Column(Text, nullable=True)  # voice-over script, spoken over the animation
     code = Column(Text, nullable=True)
     video_url = Column(String, nullable=True)
+    playlist_url = Column(String, nullable=True)  # HLS playlist, when packaged
+    poster_url = Column(String, nullable=True)  # last frame, full size
+    thumbnail_url = Column(String, nullable=True)  # last frame, small
+    sprite_url = Column(String, nullable=True)  # WebVTT track of seek-preview tiles
+    profile_url = Column(String, nullable=True)  # py-spy profile of the last profiled render
+    renditions = Column(JSON, nullable=True)  # {"720p": url, "360p": url, ...}, largest first
+    render_profile = Column(String, default=RenderProfile.STANDARD.value, server_default=RenderProfile.STANDARD.value)
     order = Column(Integer, default=0)
     status = Column(Enum(SceneStatus), default=SceneStatus.PENDING)
+    progress = Column(Integer, default=0)  # render progress, 0-100
+    render_version = Column(Integer, default=0, server_default="0", nullable=False)  # bumped per queued render; older renders are discarded
+    # Lease of the worker holding the scene's render job, renewed while it is queued or running
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(TIMESTAMP, nullable=True, index=True)  # UTC
+    lost_renders = Column(Integer, default=0, server_default="0", nullable=False)  # renders lost to expired leases in a row
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     # Relationships
     project = relationship("Project", back_populates="scenes")
     video = relationship("Video", back_populates="scene", uselist=False, cascade="all, delete-orphan")
-    voice_over = relationship("VoiceOver", back_populates="scene", uselist=False, cascade="all, delete-orphan") 
\ No newline at end of file
+    voice_over = relationship("VoiceOver", back_populates="scene", uselist=False, cascade="all, delete-orphan")
+    render_spans = relationship("RenderSpan", back_populates="scene", cascade="all, delete-orphan", passive_deletes=True) 
\ No newline at end of file
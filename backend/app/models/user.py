@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, TIMESTAMP, UUID
+from sqlalchemy import Column, Float, String, TIMESTAMP, UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -11,6 +11,7 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     password_hash = Column(String)
+    render_weight = Column(Float, default=1.0, server_default="1")  # share of render time relative to other users
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     # Relationships
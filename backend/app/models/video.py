@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, TIMESTAMP, UUID, ForeignKey, Float
+from sqlalchemy import Column, String, TIMESTAMP, UUID, ForeignKey, Float, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -11,6 +11,8 @@ class Video(Base):
     scene_id = Column(UUID(as_uuid=True), ForeignKey("scenes.id", ondelete="CASCADE"))
     file_path = Column(String)
     duration = Column(Float, default=0.0)
+    cpu_seconds = Column(Float, nullable=True)  # CPU time spent rendering
+    max_rss_kb = Column(Integer, nullable=True)  # peak RSS of the largest render process
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     # Relationships
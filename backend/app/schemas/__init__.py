@@ -2,7 +2,19 @@
 from app.schemas.user import UserBase, UserCreate, UserLogin, UserResponse, Token, TokenData
 
 # Import scene schemas
-from app.schemas.scene import SceneBase, SceneCreate, SceneUpdate, SceneResponse, SceneDetail
+from app.schemas.scene import (
+    SceneBase,
+    SceneCreate,
+    SceneUpdate,
+    SceneResponse,
+    SceneDetail,
+    SceneBatchCreate,
+    SceneOrderUpdate,
+    SceneBatchReorder,
+    SceneBatchRegenerate,
+    SceneSummary,
+    SceneQueuePosition
+)
 
 # Import project schemas
 from app.schemas.project import (
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, UUID4
+from typing import Dict, List, Optional
+from datetime import datetime
+
+# One timed stage of a render attempt
+class RenderSpanResponse(BaseModel):
+    stage: str
+    started_at: datetime  # UTC
+    duration: float  # seconds
+
+    model_config = {
+        "from_attributes": True
+    }
+
+# A render attempt with its stages in the order they started
+class RenderAttempt(BaseModel):
+    attempt_id: UUID4
+    started_at: datetime  # UTC, when the render was queued
+    duration: float  # seconds, queue wait included
+    outcome: Optional[str] = None  # completed or the failure reason
+    spans: List[RenderSpanResponse]
+
+class SlowRender(BaseModel):
+    scene_id: UUID4
+    project_id: UUID4
+    attempt_id: UUID4
+    started_at: datetime
+    duration: float
+    outcome: Optional[str] = None
+    stages: Dict[str, float]  # seconds per stage
@@ -27,7 +27,12 @@ class SimpleSceneInfo(BaseModel):
     prompt: str
     order: int = 0
     status: str
+    progress: Optional[int] = 0
     video_url: Optional[str] = None
+    playlist_url: Optional[str] = None
+    poster_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    sprite_url: Optional[str] = None
     created_at: datetime
     
     model_config = {
@@ -1,25 +1,38 @@
-from pydantic import BaseModel, UUID4
-from typing import Optional, ForwardRef
+from pydantic import BaseModel, UUID4, Field
+from typing import Dict, List, Optional, ForwardRef
 from datetime import datetime
-from app.models.scene import SceneStatus
+from app.core.config import settings
+from app.models.scene import RenderProfile, SceneStatus
 
 class SceneBase(BaseModel):
     prompt: str
     order: int = 0
+    narration: Optional[str] = None
+    render_profile: RenderProfile = RenderProfile(settings.RENDER_DEFAULT_PROFILE)
 
 class SceneCreate(SceneBase):
-    pass
+    profile_render: bool = False  # run the render under the profiler (when profiling is enabled)
 
 class SceneUpdate(BaseModel):
     prompt: Optional[str] = None
+    narration: Optional[str] = None
     order: Optional[int] = None
     status: Optional[SceneStatus] = None
+    render_profile: Optional[RenderProfile] = None
+    profile_render: Optional[bool] = None  # true re-renders the scene under the profiler
 
 class SceneResponse(SceneBase):
     id: UUID4
     project_id: UUID4
     status: SceneStatus
+    progress: Optional[int] = 0
     video_url: Optional[str] = None
+    playlist_url: Optional[str] = None
+    poster_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    sprite_url: Optional[str] = None
+    renditions: Optional[Dict[str, str]] = None
+    profile_url: Optional[str] = None
     created_at: datetime
     
     model_config = {
@@ -27,4 +40,37 @@ class SceneResponse(SceneBase):
     }
 
 class SceneDetail(SceneResponse):
-    code: Optional[str] = None 
\ No newline at end of file
+    code: Optional[str] = None
+
+# Batch operations
+class SceneBatchCreate(BaseModel):
+    scenes: List[SceneCreate] = Field(..., min_length=1, max_length=settings.SCENE_BATCH_LIMIT)
+
+class SceneOrderUpdate(BaseModel):
+    id: UUID4
+    order: int
+
+class SceneBatchReorder(BaseModel):
+    scenes: List[SceneOrderUpdate] = Field(..., min_length=1, max_length=settings.SCENE_BATCH_LIMIT)
+
+class SceneBatchRegenerate(BaseModel):
+    scene_ids: List[UUID4] = Field(..., min_length=1, max_length=settings.SCENE_BATCH_LIMIT)
+    render_profile: Optional[RenderProfile] = None  # e.g. export; keeps each scene's profile when omitted
+    profile_render: bool = False
+
+# Compact scene representation returned by batch endpoints
+class SceneSummary(BaseModel):
+    id: UUID4
+    order: int
+    status: SceneStatus
+
+    model_config = {
+        "from_attributes": True
+    }
+
+# Place of a scene in the render queue
+class SceneQueuePosition(BaseModel):
+    scene_id: UUID4
+    status: SceneStatus
+    position: Optional[int] = None  # 1 = next to start; None once rendering or done
+    estimated_start_seconds: Optional[float] = None
@@ -0,0 +1,78 @@
+import math
+from datetime import timedelta
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.project import Project
+from app.models.render_cpu_usage import RenderCpuUsage
+from app.models.scene import Scene, SceneStatus
+from app.models.user import User
+
+
+def _reject(detail: str, retry_after: float):
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def check_render_admission(db: Session, user: User, jobs: int = 1, replacing=()):
+    """
+    Admit `jobs` new renders for the user or raise 429 with a Retry-After estimate.
+
+    Two limits apply: the number of the user's scenes that are queued or
+    rendering, and the CPU seconds their render attempts consumed over the
+    rolling RENDER_CPU_WINDOW, failed and stopped ones included, plus the
+    expected cost of everything outstanding. Call this before committing
+    scenes as PENDING and enqueueing them, in the same transaction: the
+    user's row stays locked until the commit, so concurrent requests of the
+    same user are admitted one after the other. `replacing` lists scenes
+    whose queued or running render the new ones supersede; they are not
+    counted as outstanding.
+    """
+    if jobs <= 0:
+        return
+
+    db.query(User.id).filter(User.id == user.id).with_for_update().one()
+
+    outstanding = db.query(func.count(Scene.id)).join(Project).filter(
+        Project.user_id == user.id,
+        Scene.status.in_([SceneStatus.PENDING, SceneStatus.PROCESSING]),
+        Scene.id.notin_(replacing)
+    ).scalar()
+    excess = outstanding + jobs - settings.RENDER_MAX_OUTSTANDING_JOBS
+    if excess > 0:
+        _reject(
+            f"Too many renders in progress ({outstanding} queued or running, "
+            f"limit {settings.RENDER_MAX_OUTSTANDING_JOBS}). Please wait for some to finish.",
+            excess * settings.RENDER_ESTIMATED_SECONDS,
+        )
+
+    # Use the database clock so timestamps compare against server_default=now()
+    db_now = db.scalar(select(func.now()))
+    window = timedelta(seconds=settings.RENDER_CPU_WINDOW)
+    usage = db.query(RenderCpuUsage.created_at, RenderCpuUsage.cpu_seconds).filter(
+        RenderCpuUsage.user_id == user.id,
+        RenderCpuUsage.created_at >= db_now - window
+    ).order_by(RenderCpuUsage.created_at).all()
+
+    used = sum(cpu_seconds for _, cpu_seconds in usage)
+    estimate = used / len(usage) if usage else settings.RENDER_ESTIMATED_CPU_SECONDS
+    projected = used + (outstanding + jobs) * estimate
+    if projected <= settings.RENDER_CPU_BUDGET:
+        return
+
+    # Wait until enough of the oldest usage has left the window
+    retry_after = settings.RENDER_CPU_WINDOW
+    for created_at, cpu_seconds in usage:
+        projected -= cpu_seconds
+        if projected <= settings.RENDER_CPU_BUDGET:
+            retry_after = (created_at + window - db_now).total_seconds()
+            break
+    _reject(
+        f"Render CPU budget exhausted ({used:.0f} of {settings.RENDER_CPU_BUDGET} CPU seconds "
+        f"used in the last {settings.RENDER_CPU_WINDOW // 60} minutes).",
+        retry_after,
+    )
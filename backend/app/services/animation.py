@@ -1,133 +1,330 @@
+import asyncio
 import os
 import tempfile
 import uuid
 import shutil
 from manim import *
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.database import async_session_maker
+from sqlalchemy import delete, select
+from app.db.database import RenderSession
+from app.models.project import Project
 from app.models.scene import Scene, SceneStatus
 from app.models.video import Video
+from app.models.voiceover import VoiceOver
 from app.core.config import settings
+from app.core.media import hashed_filename
+from app.core.metrics import observe_llm_request, record_llm_usage
+from app.services.events import scene_event, scene_events
+from app.services.packaging import encode_profile, make_faststart, make_hls, probe_duration
+from app.services.previews import make_previews
+from app.services.profiling import profile_storage_key, render_profile_extension, render_profiler, should_profile_render
+from app.services.render_output import RenderFailure, RenderSuperseded, count_animations, exceeded_limits, manim_command, run_manim
+from app.services.render_lease import release_lease
+from app.services.render_profiles import get_profile
+from app.services.render_trace import charge_render, record_outcome, render_stage, render_trace
+from app.services.storage import media_key, media_url, storage
+from app.services.voiceover import Narration, mux_audio
 import httpx
 import re
-import subprocess
 import traceback
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def generate_animation(scene_id: uuid.UUID):
-    """Generate an animation for a scene."""
-    async with async_session_maker() as db:
+async def check_render_version(db: RenderSession, scene_id: uuid.UUID, render_version: int):
+    """
+    Raise RenderSuperseded if the scene was deleted or queued for a newer
+    render. Locks the scene row until the commit, so an edit cannot slip in.
+    """
+    if render_version is None:
+        return
+    current = await db.scalar(select(Scene.render_version).where(Scene.id == scene_id).with_for_update())
+    if current != render_version:
+        await db.rollback()
+        raise RenderSuperseded(f"Render of scene {scene_id} (version {render_version}) was superseded")
+
+async def commit_scene(db: RenderSession, scene: Scene, render_version: int, progress: dict = None):
+    """Commit pending changes, unless the render was superseded, and push the scene's new state to subscribers."""
+    await check_render_version(db, scene.id, render_version)
+    event = scene_event(scene)
+    if progress:
+        event["progress_detail"] = progress
+    await db.commit()
+    await scene_events.publish(event)
+
+async def generate_animation(scene_id: uuid.UUID, queued_at: float = None, profile_render: bool = False, render_version: int = None):
+    """
+    Generate an animation for a scene and store the timeline of the attempt.
+
+    `queued_at` is the time.monotonic() at which the render was queued;
+    `profile_render` asks for the render to run under the profiler.
+    `render_version` is the scene's render_version the render was queued
+    for; once the scene has a newer one, the render stops without
+    committing anything.
+    """
+    with render_trace(scene_id, queued_at) as trace:
+        try:
+            await _generate_animation(scene_id, profile_render, render_version)
+        except RenderSuperseded as e:
+            record_outcome("superseded")
+            logger.info(str(e))
+        except asyncio.CancelledError:
+            # Cancelled by a newer render or a deletion (or at shutdown)
+            record_outcome("cancelled")
+            await trace.save()
+            raise
+        await trace.save()
+
+async def _generate_animation(scene_id: uuid.UUID, profile_render: bool, render_version: int):
+    async with RenderSession() as db:
         try:
             # Get scene from database
             scene = await db.get(Scene, scene_id)
             if not scene:
                 logger.error(f"Scene {scene_id} not found")
                 return
+            # Queued for an older version of the scene, e.g. by another worker
+            if render_version is not None and scene.render_version != render_version:
+                logger.info(f"Skipping render of scene {scene_id}: version {render_version} is stale")
+                return
+            # Look the owner up now: the scene may be deleted before the attempt is charged
+            charge_render(await db.scalar(select(Project.user_id).where(Project.id == scene.project_id)))
 
             scene.status = SceneStatus.PROCESSING
-            await db.commit()
+            scene.progress = 0
+            await commit_scene(db, scene, render_version)
 
+            # Speak the narration while the code is generated and rendered;
+            # without a working TTS engine the scene renders without audio
+            narration = None
+            if scene.narration and settings.TTS_ENGINE:
+                try:
+                    narration = Narration(scene.narration)
+                except Exception as e:
+                    logger.warning(f"Voice-over unavailable for scene {scene_id}, rendering without audio: {e}")
             try:
                 scene_code = await generate_manim_code(scene.prompt)
                 scene.code = scene_code
+                await check_render_version(db, scene.id, render_version)
                 await db.commit()
 
-                video_filename = f"{scene_id}.mp4"
-                video_path = os.path.join(settings.VIDEO_DIR, video_filename)
-                os.makedirs(settings.VIDEO_DIR, exist_ok=True)
-                
-                # Create a temporary file to write the scene class
+                # Create a temporary directory for the scene class and the render;
+                # finished artifacts are moved to storage from there
                 temp_dir = tempfile.mkdtemp()
                 try:
+                    output_dir = os.path.join(temp_dir, "videos")
+                    os.makedirs(output_dir)
+                    video_path = os.path.join(output_dir, f"{scene_id}.mp4")
                     temp_file_path = os.path.join(temp_dir, "scene.py")
                     with open(temp_file_path, "w") as f:
                         f.write(scene_code)
                     
                     # Make sure the generated code is safe to execute
-                    if not is_code_safe(scene_code):
-                        raise Exception("Generated code contains potentially unsafe operations")
+                    with render_stage("validate"):
+                        code_is_safe = is_code_safe(scene_code)
+                    if not code_is_safe:
+                        raise RenderFailure("unsafe_code", "Generated code contains potentially unsafe operations")
                     
-                    # Execute manim to generate the animation with a timeout
-                    command = [
-                        "timeout", 
-                        str(settings.ANIMATION_TIMEOUT),
-                        "manim", 
-                        temp_file_path, 
-                        "-o", 
-                        video_path,
-                        "--quality", 
-                        "m"  # Medium quality for faster rendering
-                    ]
+                    # Resolution, frame rate and encoding come from the scene's profile
+                    profile = get_profile(scene.render_profile)
+                    
+                    # Execute manim to generate the animation with a timeout,
+                    # under the sampling profiler if asked for or sampled
+                    profiler_output = None
+                    profiler = []
+                    if should_profile_render(profile_render):
+                        profiler_output = os.path.join(temp_dir, f"profile.{render_profile_extension()}")
+                        profiler = render_profiler(profiler_output)
+                    command = manim_command(temp_file_path, video_path, profile, profiler)
+                    
+                    async def report_progress(progress):
+                        scene.progress = progress.percent
+                        await commit_scene(db, scene, render_version, progress=progress.as_dict())
                     
                     # Run the command
-                    process = subprocess.run(
-                        command,
-                        capture_output=True,
-                        text=True,
-                        timeout=settings.ANIMATION_TIMEOUT
-                    )
+                    try:
+                        with render_stage("render"):
+                            returncode, output_tail, usage = await run_manim(
+                                command,
+                                count_animations(scene_code),
+                                os.path.join(settings.RENDER_LOG_DIR, f"{scene_id}.log.gz"),
+                                on_progress=report_progress
+                            )
+                    finally:
+                        # Keep the profile of failed and timed-out renders too; they are the slow ones
+                        if profiler and os.path.exists(profiler_output):
+                            profile_key = profile_storage_key(f"render-{scene_id}", render_profile_extension())
+                            try:
+                                await asyncio.to_thread(storage.save, profiler_output, profile_key)
+                                scene.profile_url = media_url(profile_key)
+                            except Exception as e:
+                                logger.warning(f"Could not store the render profile of scene {scene_id}: {e}")
                     
                     # Check if manim execution was successful
-                    if process.returncode != 0:
-                        error_message = f"Manim execution failed with code {process.returncode}:\n"
-                        error_message += process.stderr
-                        raise Exception(error_message)
+                    if returncode != 0:
+                        error_message = f"Manim execution failed with code {returncode}:\n"
+                        error_message += output_tail
+                        # 124 is timeout(1) giving up on manim
+                        if returncode == 124:
+                            reason = "timeout"
+                        elif exceeded_limits(returncode, output_tail):
+                            reason = "resource_limit"
+                        else:
+                            reason = "manim_error"
+                        raise RenderFailure(reason, error_message)
                     
                     # Check if the video file actually exists
                     if not os.path.exists(video_path):
-                        raise Exception("Video file was not created after rendering")
+                        raise RenderFailure("no_output", "Video file was not created after rendering")
                     
-                    # Update scene with video URL and status
-                    scene.video_url = f"/media/videos/{video_filename}"
-                    scene.status = SceneStatus.COMPLETED
+                    # Fit the narration to the video; the encode adds it as the audio track
+                    voiceover_path = None
+                    if narration:
+                        try:
+                            with render_stage("narration"):
+                                voiceover_path = await narration.track(video_path)
+                        except Exception as e:
+                            logger.warning(f"Voice-over failed for scene {scene_id}: {e}")
+                    
+                    # Encode with the profile's settings plus its lower resolutions, in one pass
+                    rungs = {}
+                    try:
+                        with render_stage("encode"):
+                            rungs = await encode_profile(video_path, profile, voiceover_path)
+                    except Exception as e:
+                        logger.warning(f"Encoding failed for scene {scene_id}, keeping the manim output: {e}")
+                        try:
+                            # Both streams are copied, index first
+                            if voiceover_path:
+                                await mux_audio(video_path, voiceover_path)
+                            # Put the index first so playback starts before the download finishes
+                            elif settings.MEDIA_FASTSTART:
+                                await make_faststart(video_path)
+                        except Exception as e:
+                            logger.warning(f"Remux failed for scene {scene_id}: {e}")
+                    
+                    # Name the file after its content so its URL can be cached forever;
+                    # renditions take the same name with their height
+                    video_filename = await asyncio.to_thread(hashed_filename, video_path, str(scene_id))
+                    hashed_path = os.path.join(output_dir, video_filename)
+                    os.replace(video_path, hashed_path)
+                    video_path = hashed_path
+                    hashed_stem = os.path.splitext(hashed_path)[0]
+                    for height, path in rungs.items():
+                        rungs[height] = f"{hashed_stem}.{height}p.mp4"
+                        os.replace(path, rungs[height])
+                    if voiceover_path:
+                        shutil.move(voiceover_path, f"{hashed_stem}.voiceover.m4a")
+                        voiceover_path = f"{hashed_stem}.voiceover.m4a"
+                    previous_url = scene.video_url
+                    
+                    playlist_path = None
+                    if settings.HLS_ENABLED:
+                        renditions = [(profile.width, profile.height, video_path)] + [
+                            (profile.rung_width(height), height, path) for height, path in rungs.items()
+                        ]
+                        try:
+                            with render_stage("hls"):
+                                playlist_path = await make_hls(video_path, renditions if rungs else None)
+                        except Exception as e:
+                            logger.warning(f"HLS packaging failed for scene {scene_id}: {e}")
                     
                     # Get video duration using ffprobe
                     duration = 0.0
                     try:
-                        duration_cmd = [
-                            "ffprobe", 
-                            "-v", "error", 
-                            "-show_entries", "format=duration", 
-                            "-of", "default=noprint_wrappers=1:nokey=1", 
-                            video_path
-                        ]
-                        duration_output = subprocess.run(
-                            duration_cmd, 
-                            capture_output=True, 
-                            text=True
-                        )
-                        if duration_output.returncode == 0:
-                            duration = float(duration_output.stdout.strip())
+                        with render_stage("probe"):
+                            duration = await probe_duration(video_path)
                     except Exception as e:
                         logger.error(f"Error getting video duration: {str(e)}")
                     
+                    # Poster, thumbnail and seek-preview sprite so listings need not load the video
+                    previews = {}
+                    if duration > 0:
+                        try:
+                            with render_stage("previews"):
+                                previews = await make_previews(video_path, duration)
+                        except Exception as e:
+                            logger.warning(f"Preview generation failed for scene {scene_id}: {e}")
+                    
+                    # Move every artifact to storage, keyed by its path under output_dir
+                    def artifact_key(path):
+                        return "videos/" + os.path.relpath(path, output_dir).replace(os.sep, "/")
+                    
+                    artifacts = [
+                        os.path.join(directory, name)
+                        for directory, _, names in os.walk(output_dir)
+                        for name in names
+                    ]
+                    with render_stage("upload"):
+                        for path in artifacts:
+                            await asyncio.to_thread(storage.save, path, artifact_key(path))
+                    
+                    # Update scene with the artifact URLs and status
+                    video_key = artifact_key(video_path)
+                    scene.video_url = media_url(video_key)
+                    scene.playlist_url = media_url(artifact_key(playlist_path)) if playlist_path else None
+                    scene.poster_url = media_url(artifact_key(previews["poster"])) if previews else None
+                    scene.thumbnail_url = media_url(artifact_key(previews["thumbnail"])) if previews else None
+                    scene.sprite_url = media_url(artifact_key(previews["sprite"])) if previews else None
+                    scene.renditions = {
+                        f"{height}p": media_url(artifact_key(path))
+                        for height, path in [(profile.height, video_path), *rungs.items()]
+                    } if rungs else None
+                    scene.status = SceneStatus.COMPLETED
+                    scene.progress = 100
+                    release_lease(scene)
+                    
                     # Create video entry
                     video = Video(
                         scene_id=scene.id,
-                        file_path=video_path,
-                        duration=duration
+                        file_path=storage.location(video_key),
+                        duration=duration,
+                        cpu_seconds=usage.cpu_seconds,
+                        max_rss_kb=usage.max_rss_kb
                     )
                     db.add(video)
-                    await db.commit()
+                    await db.execute(delete(VoiceOver).where(VoiceOver.scene_id == scene.id))
+                    if voiceover_path:
+                        db.add(VoiceOver(scene_id=scene.id, file_path=storage.location(artifact_key(voiceover_path))))
+                    with render_stage("commit"):
+                        await commit_scene(db, scene, render_version)
+                    record_outcome("completed")
+                    
+                    # The previous render and its derived files lived under a different name
+                    if previous_url and previous_url != scene.video_url:
+                        try:
+                            await asyncio.to_thread(storage.delete_render, media_key(previous_url))
+                        except Exception as e:
+                            logger.warning(f"Could not remove previous render of scene {scene_id}: {e}")
 
+                except RenderSuperseded:
+                    raise
                 except Exception as e:
+                    record_outcome(getattr(e, "reason", "error"))
                     scene.status = SceneStatus.FAILED
+                    release_lease(scene)
                     scene.code = f"{scene_code}\n\n# Error: {str(e)}"
-                    await db.commit()
+                    await commit_scene(db, scene, render_version)
                     logger.error(f"Animation generation failed: {e}")
                     traceback.print_exc()
                 finally:
                     # Clean up temporary directory
                     shutil.rmtree(temp_dir, ignore_errors=True)
                 
+            except RenderSuperseded:
+                raise
             except Exception as e:
+                record_outcome("code_generation")
                 scene.status = SceneStatus.FAILED
+                release_lease(scene)
                 scene.code = f"# Error during code generation: {str(e)}"
-                await db.commit()
+                await commit_scene(db, scene, render_version)
                 logger.error(f"Animation generation failed during preparation: {e}")
                 traceback.print_exc()
+            finally:
+                if narration:
+                    narration.close()
+        except RenderSuperseded:
+            raise
         except Exception as e:
             logger.error(f"Database operation failed: {e}")
             traceback.print_exc()
@@ -179,7 +376,7 @@ async def generate_manim_code(prompt: str) -> str:
     user_message = f"Create a Manim animation for the following: {prompt}. The animation should be visually appealing, professional, and render within 2 minutes. Use specific colors, positions, and timings."
     
     # Groq API endpoint
-    api_url = "https://api.groq.com/openai/v1/chat/completions"
+    api_url = settings.GROQ_API_URL
     
     # Generate the code using Groq
     headers = {
@@ -198,18 +395,21 @@ async def generate_manim_code(prompt: str) -> str:
     }
     
     # Make the API request
-    async with httpx.AsyncClient() as client:
-        response = await client.post(api_url, json=data, headers=headers, timeout=30)
-        response_data = response.json()
-    
-    # Extract the code from the response
-    code = response_data["choices"][0]["message"]["content"]
-    
-    # Clean up the code
-    code = clean_code(code)
+    with render_stage("llm"), observe_llm_request("scene_code"):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(api_url, json=data, headers=headers, timeout=30)
+            response_data = response.json()
+        
+        # Extract the code from the response
+        code = response_data["choices"][0]["message"]["content"]
+    record_llm_usage("scene_code", response_data)
     
-    # Add safety measures to the code
-    code = add_safety_measures(code)
+    with render_stage("sanitize"):
+        # Clean up the code
+        code = clean_code(code)
+        
+        # Add safety measures to the code
+        code = add_safety_measures(code)
     
     return code
 
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "scene_events:"
+
+
+def project_channel(project_id) -> str:
+    return f"{CHANNEL_PREFIX}{project_id}"
+
+
+def scene_event(scene) -> dict:
+    """Build the payload pushed to subscribers when a scene changes."""
+    return {
+        "scene_id": str(scene.id),
+        "project_id": str(scene.project_id),
+        "status": scene.status.value if hasattr(scene.status, "value") else scene.status,
+        "video_url": scene.video_url,
+        "playlist_url": scene.playlist_url,
+        "poster_url": scene.poster_url,
+        "thumbnail_url": scene.thumbnail_url,
+        "sprite_url": scene.sprite_url,
+        "renditions": scene.renditions,
+        "progress": scene.progress,
+    }
+
+
+class SceneEventBroker:
+    """
+    Fans scene status updates out to subscribers of a project.
+
+    Each process holds a single Redis pattern subscription and dispatches
+    messages to per-connection queues, so the number of Redis connections
+    does not grow with the number of open event streams. When Redis is
+    unavailable, events are delivered to subscribers in the publishing
+    process only.
+    """
+
+    def __init__(self):
+        self._redis = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True
+        )
+        self._subscribers = defaultdict(set)
+        self._listener = None
+
+    async def publish(self, event: dict):
+        channel = project_channel(event["project_id"])
+        message = json.dumps(event)
+        try:
+            await self._redis.publish(channel, message)
+        except Exception as e:
+            logger.warning(f"Redis publish failed, delivering locally: {e}")
+            self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: str):
+        for queue in list(self._subscribers.get(channel, ())):
+            if queue.full():
+                # Slow consumer: drop the oldest update, the newest state wins
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _listen(self):
+        while self._subscribers:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                while self._subscribers:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Scene event listener error, retrying: {e}")
+                await asyncio.sleep(settings.EVENTS_RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+        self._listener = None
+
+    @asynccontextmanager
+    async def subscribe(self, project_id):
+        """Yield a queue receiving JSON-encoded events for the project."""
+        channel = project_channel(project_id)
+        queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self._subscribers[channel].add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            yield queue
+        finally:
+            self._subscribers[channel].discard(queue)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+
+scene_events = SceneEventBroker()
@@ -0,0 +1,207 @@
+"""
+Media garbage collection and disk quota.
+
+Scenes reference their current render by video_url; everything else under
+videos/ is garbage once it is older than MEDIA_GC_GRACE_SECONDS (a render
+uploads its files before it commits the new URL): renders of deleted
+scenes, renders replaced while the old files could not be removed, and
+leftovers of failed renders. Video rows are kept as render history.
+
+When MEDIA_QUOTA_MB is set and stored media exceeds it, derived files
+(HLS packaging, lower resolutions, poster, thumbnail, sprite) of the
+least recently used renders are evicted and their scene URLs cleared,
+down to
+QUOTA_LOW_WATERMARK of the quota; the players fall back to the MP4, and
+the next render recreates them. Videos themselves are never evicted.
+
+Profiles under profiles/ are removed, and their links cleared, once they
+are older than PROFILE_RETENTION_SECONDS.
+
+Deletions are paced to MEDIA_GC_DELETE_RATE files per second and capped at
+MEDIA_GC_MAX_DELETES per pass; whatever is left is picked up by the next
+pass.
+
+    python -m app.services.media_gc --dry-run
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.scene import Scene
+from app.services.profiling import PROFILE_PREFIX
+from app.services.storage import media_key, media_url, storage
+
+logger = logging.getLogger(__name__)
+
+MEDIA_PREFIX = "videos"
+QUOTA_LOW_WATERMARK = 0.9
+# {stem}.mp4, {stem}.poster.jpg, ... and hls/{stem}/..., where the stem is
+# {scene_id}.{content hash} ({scene_id} for renders that predate hashing)
+RENDER_STEM = re.compile(r"^(?:hls/)?([^/.]+(?:\.[0-9a-f]{16})?)(?:[./]|$)")
+DERIVED_COLUMNS = ("playlist_url", "poster_url", "thumbnail_url", "sprite_url", "renditions")
+
+
+def render_video_key(key: str) -> str:
+    """Key of the video a stored file was derived from (its own key for a video)."""
+    match = RENDER_STEM.match(key[len(MEDIA_PREFIX) + 1:])
+    return f"{MEDIA_PREFIX}/{match.group(1)}.mp4" if match else key
+
+
+def delete_scene_media(video_urls):
+    """Remove the renders of deleted scenes; the collector catches any failures later."""
+    for url in video_urls:
+        if not url:
+            continue
+        try:
+            storage.delete_render(media_key(url))
+        except Exception as e:
+            logger.warning(f"Could not remove media {url}: {e}")
+
+
+class MediaCollector:
+    def __init__(self):
+        self._task = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        if settings.MEDIA_GC_INTERVAL <= 0:
+            return
+        self._stopping.clear()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # Let a pass in progress notice between delete batches
+        self._stopping.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(settings.MEDIA_GC_INTERVAL)
+            try:
+                report = await asyncio.to_thread(self.collect)
+                logger.info(f"Media GC: {report}")
+            except Exception as e:
+                logger.error(f"Media GC failed: {e}")
+
+    def collect(self, dry_run: bool = False) -> dict:
+        """Run one pass and return what it found and removed."""
+        now = time.time()
+        # List files before reading the scenes: a render committed in between
+        # is then seen as live rather than as an orphan
+        renders = defaultdict(list)
+        for entry in storage.scan(MEDIA_PREFIX):
+            renders[render_video_key(entry.key)].append(entry)
+        with SessionLocal() as db:
+            live = {
+                media_key(url): scene_id
+                for scene_id, url in db.query(Scene.id, Scene.video_url).filter(Scene.video_url.isnot(None))
+            }
+
+        report = {
+            "files": 0, "bytes": 0, "orphaned_files": 0, "orphaned_bytes": 0,
+            "evicted_files": 0, "evicted_bytes": 0, "expired_profiles": 0
+        }
+        for entries in renders.values():
+            report["files"] += len(entries)
+            report["bytes"] += sum(entry.size for entry in entries)
+
+        orphans = [
+            entry
+            for video_key, entries in renders.items()
+            if video_key not in live and max(entry.modified for entry in entries) < now - settings.MEDIA_GC_GRACE_SECONDS
+            for entry in entries
+        ]
+        budget = settings.MEDIA_GC_MAX_DELETES
+        orphans = orphans[:budget]
+        budget -= len(orphans)
+        report["orphaned_files"] = len(orphans)
+        report["orphaned_bytes"] = sum(entry.size for entry in orphans)
+        if not dry_run:
+            self._delete([entry.key for entry in orphans])
+
+        expired = [
+            entry.key for entry in storage.scan(PROFILE_PREFIX)
+            if entry.modified < now - settings.PROFILE_RETENTION_SECONDS
+        ][:budget]
+        budget -= len(expired)
+        report["expired_profiles"] = len(expired)
+        if expired and not dry_run:
+            with SessionLocal() as db:
+                db.query(Scene).filter(Scene.profile_url.in_([media_url(key) for key in expired])).update(
+                    {Scene.profile_url: None}, synchronize_session=False
+                )
+                db.commit()
+            self._delete(expired)
+
+        quota = settings.MEDIA_QUOTA_MB * 1024 * 1024
+        stored = report["bytes"] - report["orphaned_bytes"]
+        if quota and stored > quota:
+            evicted = self._evict(renders, live, stored - int(quota * QUOTA_LOW_WATERMARK), budget, dry_run)
+            report["evicted_files"] = sum(len(entries) for entries in evicted.values())
+            report["evicted_bytes"] = sum(entry.size for entries in evicted.values() for entry in entries)
+            if stored - report["evicted_bytes"] > quota:
+                logger.warning(f"Media is {stored - report['evicted_bytes']} bytes after eviction, over the {quota} byte quota")
+        return report
+
+    def _evict(self, renders, live, excess: int, budget: int, dry_run: bool) -> dict:
+        """Pick derived files of live renders, least recently used first, worth `excess` bytes."""
+        candidates = []
+        for video_key in live:
+            derived = [entry for entry in renders.get(video_key, []) if entry.key != video_key]
+            if derived:
+                last_used = max(entry.accessed for entry in renders[video_key])
+                candidates.append((last_used, video_key, derived))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        evicted = {}
+        for _, video_key, derived in candidates:
+            if excess <= 0 or len(derived) > budget:
+                break
+            evicted[video_key] = derived
+            excess -= sum(entry.size for entry in derived)
+            budget -= len(derived)
+        if dry_run or not evicted:
+            return evicted
+
+        # Clear the URLs first so no response hands out a file about to go
+        with SessionLocal() as db:
+            scenes = db.query(Scene).filter(Scene.id.in_([live[video_key] for video_key in evicted]))
+            for scene in scenes:
+                if media_key(scene.video_url or "") in evicted:
+                    for column in DERIVED_COLUMNS:
+                        setattr(scene, column, None)
+            db.commit()
+        self._delete([entry.key for derived in evicted.values() for entry in derived])
+        return evicted
+
+    def _delete(self, keys):
+        rate = settings.MEDIA_GC_DELETE_RATE
+        batch_size = max(1, int(rate)) if rate > 0 else len(keys) or 1
+        for start in range(0, len(keys), batch_size):
+            if self._stopping.is_set():
+                return
+            batch = keys[start:start + batch_size]
+            started = time.monotonic()
+            storage.delete(batch)
+            if rate > 0:
+                self._stopping.wait(max(0.0, len(batch) / rate - (time.monotonic() - started)))
+
+
+media_collector = MediaCollector()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Remove orphaned media and enforce the media quota.")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be removed")
+    args = parser.parse_args()
+    print(media_collector.collect(dry_run=args.dry_run))
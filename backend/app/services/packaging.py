@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import shutil
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+HLS_DIR = "hls"
+PLAYLIST_NAME = "index.m3u8"
+
+
+async def run_ffmpeg(*args: str):
+    """Run ffmpeg quietly, raising with its stderr tail if it fails."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace')[-1000:]}")
+
+
+async def probe_duration(path: str) -> float:
+    """Duration of a media file in seconds, from ffprobe."""
+    process = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffprobe exited with {process.returncode}: {stderr.decode(errors='replace')[-1000:]}")
+    return float(stdout.decode().strip())
+
+
+async def make_faststart(video_path: str):
+    """
+    Move the moov atom to the front of the file, in place.
+
+    A stream copy, so it costs one read and write of the file. Players can
+    start as soon as the first bytes arrive instead of fetching the index
+    from the end of the file first.
+    """
+    temp_path = f"{video_path}.faststart.mp4"
+    try:
+        await run_ffmpeg("-i", video_path, "-c", "copy", "-movflags", "+faststart", temp_path)
+        os.replace(temp_path, video_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+async def encode_profile(video_path: str, profile, audio_path: str = None) -> dict:
+    """
+    Re-encode a master render with a profile's settings, in place, and scale
+    it to each of the profile's ladder heights in the same ffmpeg run, so
+    the master is decoded once. With `audio_path` every output gets that
+    track (copied) instead of the render's own audio.
+
+    Keyframes fall every HLS_SEGMENT_SECONDS, so HLS segments are short and
+    line up across renditions. Outputs are written index first and need no
+    faststart pass. Returns {height: path} for the ladder renditions, which
+    are written beside the video as {video name}.{height}p.mp4.
+    """
+    stem = os.path.splitext(video_path)[0]
+    encoded_path = f"{stem}.encoded.mp4"
+    rungs = {height: f"{stem}.{height}p.mp4" for height in profile.ladder}
+    keyint = str(profile.fps * settings.HLS_SEGMENT_SECONDS)
+    codec = [
+        "-c:v", "libx264", "-preset", profile.preset, "-crf", str(profile.crf),
+        "-tune", "animation", "-pix_fmt", "yuv420p",
+        "-g", keyint, "-keyint_min", keyint, "-sc_threshold", "0",
+        "-c:a", "copy", "-movflags", "+faststart"
+    ]
+    filters = [f"[0:v]split={len(rungs) + 1}[master]" + "".join(f"[s{height}]" for height in rungs)]
+    filters += [f"[s{height}]scale=-2:{height}[v{height}]" for height in rungs]
+    inputs = ["-i", video_path]
+    audio = "0:a?"
+    if audio_path:
+        inputs += ["-i", audio_path]
+        audio = "1:a"
+    outputs = ["-map", "[master]", "-map", audio, *codec, encoded_path]
+    for height, path in rungs.items():
+        outputs += ["-map", f"[v{height}]", "-map", audio, *codec, path]
+    try:
+        await run_ffmpeg(*inputs, "-filter_complex", ";".join(filters), *outputs)
+        os.replace(encoded_path, video_path)
+    except Exception:
+        for path in [encoded_path, *rungs.values()]:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return rungs
+
+
+def playlist_bandwidth(playlist_path: str):
+    """Peak and average bits per second of a media playlist's segments."""
+    directory = os.path.dirname(playlist_path)
+    peak = total_bits = total_seconds = 0.0
+    duration = None
+    with open(playlist_path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                duration = float(line[len("#EXTINF:"):].split(",")[0])
+            elif line and not line.startswith("#") and duration:
+                bits = os.path.getsize(os.path.join(directory, line)) * 8
+                peak = max(peak, bits / duration)
+                total_bits += bits
+                total_seconds += duration
+                duration = None
+    return round(peak), round(total_bits / total_seconds) if total_seconds else 0
+
+
+async def _package_hls(video_path: str, output_dir: str):
+    await run_ffmpeg(
+        "-i", video_path,
+        "-c", "copy",
+        "-f", "hls",
+        "-hls_time", str(settings.HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", os.path.join(output_dir, "segment_%03d.m4s"),
+        os.path.join(output_dir, PLAYLIST_NAME)
+    )
+
+
+async def make_hls(video_path: str, renditions=None) -> str:
+    """
+    Package a video as an HLS playlist of fragmented MP4 segments.
+
+    Segments are cut at keyframes without re-encoding and written next to
+    the video under hls/{video name without extension}/, so a content-hashed
+    video name gives the playlist an immutable URL too. With `renditions`,
+    a list of (width, height, path) that includes the video itself, each one
+    is packaged under {height}p/ and the playlist is a multivariant playlist
+    over them for adaptive playback. Returns the playlist path.
+    """
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    output_dir = os.path.join(os.path.dirname(video_path), HLS_DIR, name)
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        if not renditions:
+            await _package_hls(video_path, output_dir)
+        else:
+            variant_dirs = [os.path.join(output_dir, f"{height}p") for _, height, _ in renditions]
+            for variant_dir in variant_dirs:
+                os.makedirs(variant_dir, exist_ok=True)
+            await asyncio.gather(*(
+                _package_hls(path, variant_dir)
+                for (_, _, path), variant_dir in zip(renditions, variant_dirs)
+            ))
+            lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+            for width, height, _ in renditions:
+                peak, average = playlist_bandwidth(os.path.join(output_dir, f"{height}p", PLAYLIST_NAME))
+                lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={peak},AVERAGE-BANDWIDTH={average},RESOLUTION={width}x{height}")
+                lines.append(f"{height}p/{PLAYLIST_NAME}")
+            with open(os.path.join(output_dir, PLAYLIST_NAME), "w") as f:
+                f.write("\n".join(lines) + "\n")
+    except Exception:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        raise
+    return os.path.join(output_dir, PLAYLIST_NAME)
@@ -0,0 +1,90 @@
+import math
+import os
+import struct
+from app.core.config import settings
+from app.services.packaging import run_ffmpeg
+
+
+def jpeg_size(path: str):
+    """Return (width, height) from a JPEG's start-of-frame marker."""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 2
+    while offset + 9 < len(data):
+        if data[offset] != 0xFF:
+            offset += 1
+            continue
+        marker = data[offset + 1]
+        length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        # SOF0-SOF15, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + length
+    raise ValueError(f"No frame header in {path}")
+
+
+def sprite_track(sprite_name: str, frames: int, interval: float, duration: float,
+                 columns: int, width: int, height: int) -> str:
+    """WebVTT thumbnails track mapping each time range to its tile in the sprite."""
+    def timestamp(seconds):
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+    cues = ["WEBVTT", ""]
+    for i in range(frames):
+        x, y = (i % columns) * width, (i // columns) * height
+        cues.append(f"{timestamp(i * interval)} --> {timestamp(min((i + 1) * interval, duration))}")
+        cues.append(f"{sprite_name}#xywh={x},{y},{width},{height}")
+        cues.append("")
+    return "\n".join(cues)
+
+
+async def make_previews(video_path: str, duration: float) -> dict:
+    """
+    Produce a poster, a thumbnail and a seek-preview sprite in one ffmpeg run.
+
+    The poster and thumbnail show the last frame, where a manim scene has
+    built up its final state; only the final second is decoded for them.
+    The sprite tiles one frame every `interval` seconds (at most
+    PREVIEW_SPRITE_FRAMES tiles) and comes with a WebVTT thumbnails track.
+    Files are written beside the video as {video name}.poster.jpg and so on.
+    Returns the paths keyed by poster, thumbnail and sprite (the track); the
+    sprite image itself is written beside the track.
+    """
+    stem = os.path.splitext(video_path)[0]
+    poster_path = f"{stem}.poster.jpg"
+    thumbnail_path = f"{stem}.thumb.jpg"
+    sprite_path = f"{stem}.sprite.jpg"
+    track_path = f"{stem}.sprite.vtt"
+
+    interval = max(1.0, duration / settings.PREVIEW_SPRITE_FRAMES)
+    frames = max(1, math.ceil(duration / interval))
+    columns = min(frames, settings.PREVIEW_SPRITE_COLUMNS)
+    rows = math.ceil(frames / columns)
+
+    await run_ffmpeg(
+        "-i", video_path,
+        "-sseof", "-1", "-i", video_path,
+        "-filter_complex",
+        f"[0:v]fps=1/{interval},scale={settings.PREVIEW_SPRITE_WIDTH}:-2,tile={columns}x{rows}[sprite];"
+        f"[1:v]split=2[poster][last];"
+        f"[last]scale={settings.PREVIEW_THUMBNAIL_WIDTH}:-2[thumbnail]",
+        # -update keeps overwriting one image, leaving the last frame
+        "-map", "[poster]", "-update", "1", "-q:v", "3", poster_path,
+        "-map", "[thumbnail]", "-update", "1", "-q:v", "5", thumbnail_path,
+        "-map", "[sprite]", "-frames:v", "1", "-q:v", "5", sprite_path
+    )
+
+    sprite_width, sprite_height = jpeg_size(sprite_path)
+    with open(track_path, "w") as f:
+        f.write(sprite_track(
+            os.path.basename(sprite_path), frames, interval, duration,
+            columns, sprite_width // columns, sprite_height // rows
+        ))
+    return {
+        "poster": poster_path,
+        "thumbnail": thumbnail_path,
+        "sprite": track_path,
+    }
@@ -0,0 +1,181 @@
+"""
+Opt-in profiling of renders and API requests.
+
+Renders run manim under py-spy, a sampling profiler, when the scene asks
+for it (`profile_render`, honoured while PROFILING_ENABLED) or when picked
+at PROFILE_RENDER_SAMPLE_RATE. The flame graph (or collapsed stacks, or a
+speedscope file, per PROFILE_RENDER_FORMAT) is stored under profiles/ and
+linked from the scene's profile_url, also when the render fails.
+
+API requests are profiled with cProfile when an admin (ADMIN_USERNAMES)
+sends `X-Profile: 1` (while PROFILING_ENABLED) or when they are picked at
+PROFILE_REQUEST_SAMPLE_RATE.
+The endpoint function and its dependencies are profiled in the threads
+they run in; the .prof file is stored under profiles/ and its URL returned
+in the X-Profile-URL response header. Only sync callables are profiled,
+as a coroutine shares its thread with every other request.
+
+With both switched off nothing is installed: no wrappers, no middleware.
+Profiles are removed by the media collector after PROFILE_RETENTION_SECONDS.
+"""
+import asyncio
+import contextvars
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.security import decode_token_username
+from app.services.storage import media_url, storage
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PREFIX = "profiles"
+# py-spy output format -> file extension
+RENDER_PROFILE_EXTENSIONS = {"flamegraph": "svg", "raw": "txt", "speedscope": "json"}
+
+_request_profile = contextvars.ContextVar("request_profile", default=None)
+_wrapped = set()
+
+
+def profile_storage_key(name: str, extension: str) -> str:
+    return f"{PROFILE_PREFIX}/{name}-{uuid.uuid4().hex[:8]}.{extension}"
+
+
+def should_profile_render(requested: bool) -> bool:
+    if requested and settings.PROFILING_ENABLED:
+        return True
+    return random.random() < settings.PROFILE_RENDER_SAMPLE_RATE
+
+
+def render_profiler(output_path: str) -> list:
+    """Command prefix that runs a render under py-spy; empty if py-spy is not installed."""
+    if not shutil.which("py-spy"):
+        logger.warning("Render profiling requested but py-spy is not installed")
+        return []
+    return [
+        "py-spy", "record",
+        "--rate", str(settings.PROFILE_RENDER_RATE),
+        "--format", settings.PROFILE_RENDER_FORMAT,
+        "--output", output_path,
+        "--subprocesses",
+        "--"
+    ]
+
+
+def render_profile_extension() -> str:
+    return RENDER_PROFILE_EXTENSIONS.get(settings.PROFILE_RENDER_FORMAT, "txt")
+
+
+def _profiled(call):
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        profile = _request_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        profile.enable()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profile.disable()
+
+    _wrapped.add(wrapper)
+    return wrapper
+
+
+def _instrument(dependant, wrappers: dict):
+    for sub_dependant in dependant.dependencies:
+        _instrument(sub_dependant, wrappers)
+    call = dependant.call
+    # Plain functions only: FastAPI inspects the callable for coroutines and
+    # generators on every request, and instances keep their own __call__
+    if (
+        inspect.isfunction(call)
+        and call not in _wrapped
+        and not inspect.iscoroutinefunction(call)
+        and not inspect.isgeneratorfunction(call)
+        and not inspect.isasyncgenfunction(call)
+    ):
+        # One wrapper per function, so dependency caching still sees one callable
+        if call not in wrappers:
+            wrappers[call] = _profiled(call)
+        dependant.call = wrappers[call]
+
+
+def instrument_routes(routes):
+    """Make the endpoints and dependencies of `routes` profile themselves in profiled requests."""
+    wrappers = {}
+    for route in routes:
+        if isinstance(route, APIRoute):
+            _instrument(route.dependant, wrappers)
+
+
+def _save_request_profile(profile: cProfile.Profile, key: str) -> bool:
+    if not profile.getstats():
+        return False
+    handle, path = tempfile.mkstemp(suffix=".prof")
+    os.close(handle)
+    try:
+        profile.dump_stats(path)
+        # mkstemp creates the file private; media is served to other users
+        os.chmod(path, 0o644)
+        storage.save(path, key)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    return True
+
+
+class RequestProfilerMiddleware:
+    """Profile requests that ask for it, or a sample of them, and link the result in a header."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def wanted(self, scope: Scope) -> bool:
+        if settings.PROFILING_ENABLED:
+            headers = dict(scope["headers"])
+            # Only admins may make the server profile a request and store the result
+            if headers.get(b"x-profile", b"").lower() in (b"1", b"true") and self.from_admin(headers):
+                return True
+        return random.random() < settings.PROFILE_REQUEST_SAMPLE_RATE
+
+    @staticmethod
+    def from_admin(headers: dict) -> bool:
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer":
+            return False
+        return decode_token_username(token.strip()) in settings.ADMIN_USERNAMES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = cProfile.Profile()
+        key = profile_storage_key(f"request-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}", "prof")
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                try:
+                    if await asyncio.to_thread(_save_request_profile, profile, key):
+                        MutableHeaders(scope=message).append("X-Profile-URL", media_url(key))
+                        logger.info(f"Profiled {scope['method']} {scope['path']}: {media_url(key)}")
+                except Exception as e:
+                    logger.warning(f"Could not store the profile of {scope['path']}: {e}")
+            await send(message)
+
+        token = _request_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_profile.reset(token)
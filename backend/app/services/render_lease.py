@@ -0,0 +1,198 @@
+"""
+Render leases: recovery of renders lost with a worker.
+
+Every RENDER_HEARTBEAT_INTERVAL each worker (API process) renews the
+lease of every scene it holds a render job for, queued or running: the
+scene's lease_owner is the worker and lease_expires_at lies
+RENDER_LEASE_SECONDS ahead. A render clears the lease when it commits
+its result.
+
+The endpoints lease a scene to their worker in the same commit that
+queues its render, so a live worker's jobs always hold a lease.
+
+A pending or processing scene whose lease expired was held by a worker
+that died or hung. On the same interval every worker sweeps for such
+scenes and requeues them under a new render version, so the lost job's
+results are discarded should it come back. After RENDER_MAX_ATTEMPTS lost
+renders in a row the scene fails instead. Scenes without a lease were
+queued by a previous run (or an older version): at startup they are
+requeued at once, later they are given one lease period to be claimed. On
+shutdown a worker expires its leases so they are picked up right away.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_, tuple_, update
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.project import Project
+from app.models.scene import Scene, SceneStatus
+from app.models.user import User
+from app.services.events import scene_event, scene_events
+from app.services.render_queue import enqueue_renders, render_scheduler
+from app.services.render_trace import record_outcome
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+ACTIVE_STATUSES = (SceneStatus.PENDING, SceneStatus.PROCESSING)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def lease_values() -> dict:
+    """
+    Scene values that lease a render this worker is queueing to it; set
+    them in the commit that marks the scene PENDING.
+    """
+    return {
+        "lease_owner": WORKER_ID,
+        "lease_expires_at": utcnow() + timedelta(seconds=settings.RENDER_LEASE_SECONDS),
+        # A render asked for anew starts a new count
+        "lost_renders": 0,
+    }
+
+
+def take_lease(scene: Scene):
+    """Lease a scene whose render this worker is queueing, before committing it as PENDING."""
+    for column, value in lease_values().items():
+        setattr(scene, column, value)
+
+
+def release_lease(scene: Scene):
+    """Clear the lease of a scene whose render finished, before committing the result."""
+    scene.lease_owner = None
+    scene.lease_expires_at = None
+    scene.lost_renders = 0
+
+
+class RenderLeases:
+    def __init__(self):
+        self._task = None
+
+    def start(self):
+        if settings.RENDER_HEARTBEAT_INTERVAL <= 0:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await asyncio.to_thread(self.release)
+        except Exception as e:
+            logger.warning(f"Could not release render leases: {e}")
+
+    async def _loop(self):
+        reconcile = True
+        while True:
+            try:
+                await asyncio.to_thread(self.renew)
+                events = await asyncio.to_thread(self.sweep, reconcile)
+                reconcile = False
+                for event in events:
+                    await scene_events.publish(event)
+            except Exception as e:
+                logger.error(f"Render lease sweep failed: {e}")
+            await asyncio.sleep(settings.RENDER_HEARTBEAT_INTERVAL)
+
+    def renew(self):
+        """Extend the leases of this worker's render jobs."""
+        scene_versions = render_scheduler.jobs()
+        if not scene_versions:
+            return
+        with SessionLocal() as db:
+            # Not for a newer version, which another worker may have requeued
+            db.execute(
+                update(Scene)
+                .where(
+                    tuple_(Scene.id, Scene.render_version).in_(list(scene_versions.items())),
+                    Scene.status.in_(ACTIVE_STATUSES)
+                )
+                .values(lease_owner=WORKER_ID, lease_expires_at=utcnow() + timedelta(seconds=settings.RENDER_LEASE_SECONDS))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def release(self):
+        """Expire this worker's leases, e.g. on shutdown, so other workers requeue its renders."""
+        with SessionLocal() as db:
+            db.execute(
+                update(Scene)
+                .where(Scene.lease_owner == WORKER_ID, Scene.status.in_(ACTIVE_STATUSES))
+                .values(lease_expires_at=utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def sweep(self, reconcile: bool = False) -> list:
+        """
+        Requeue, or fail, the renders whose lease expired and return the
+        scene events to publish. With `reconcile` (at startup) scenes
+        without a lease, left by a previous run, are taken too.
+        """
+        now = utcnow()
+        lease = timedelta(seconds=settings.RENDER_LEASE_SECONDS)
+        own = render_scheduler.jobs()
+        lost = Scene.lease_expires_at < now
+        if reconcile:
+            lost = or_(lost, Scene.lease_expires_at.is_(None))
+        events = []
+        requeued = {}  # project_id -> {scene_id: render_version}
+        with SessionLocal() as db:
+            if not reconcile:
+                # Scenes queued without a lease, e.g. by a worker still on an
+                # older version, get one lease to be claimed
+                db.execute(
+                    update(Scene)
+                    .where(Scene.status.in_(ACTIVE_STATUSES), Scene.lease_expires_at.is_(None))
+                    .values(lease_expires_at=now + lease)
+                    .execution_options(synchronize_session=False)
+                )
+            # Workers sweep concurrently; each scene goes to the one that locks it
+            scenes = db.query(Scene).filter(
+                Scene.status.in_(ACTIVE_STATUSES), lost
+            ).with_for_update(skip_locked=True).all()
+            for scene in scenes:
+                if own.get(scene.id) == scene.render_version:
+                    continue
+                record_outcome("lost")
+                scene.lost_renders += 1
+                if scene.lost_renders >= settings.RENDER_MAX_ATTEMPTS:
+                    logger.warning(f"Render of scene {scene.id} was lost {scene.lost_renders} times, failing it")
+                    error = f"# Error: the render was lost {scene.lost_renders} times in a row"
+                    scene.code = f"{scene.code}\n\n{error}" if scene.code else error
+                    scene.status = SceneStatus.FAILED
+                    scene.lease_owner = None
+                    scene.lease_expires_at = None
+                else:
+                    logger.warning(f"Requeueing render of scene {scene.id}, lost by {scene.lease_owner or 'an unknown worker'}")
+                    scene.status = SceneStatus.PENDING
+                    scene.progress = 0
+                    scene.render_version += 1
+                    scene.lease_owner = WORKER_ID
+                    scene.lease_expires_at = now + lease
+                    requeued.setdefault(scene.project_id, {})[scene.id] = scene.render_version
+                events.append(scene_event(scene))
+            db.commit()
+
+            # Queue under the projects' owners, like the endpoints do
+            for project_id, user in db.query(Project.id, User).join(User, Project.user_id == User.id).filter(
+                Project.id.in_(requeued.keys())
+            ):
+                enqueue_renders(user, project_id, requeued[project_id])
+        if events:
+            count = sum(len(scene_versions) for scene_versions in requeued.values())
+            logger.info(f"Render lease sweep: {count} requeued, {len(events) - count} failed")
+        return events
+
+
+render_leases = RenderLeases()
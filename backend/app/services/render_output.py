@@ -0,0 +1,281 @@
+import asyncio
+import codecs
+import gzip
+import logging
+import os
+import re
+import resource
+import signal
+import sys
+import tempfile
+import time
+from collections import deque
+from app.core.config import settings
+from app.services.render_sandbox import SANDBOX_SCRIPT, RenderUsage, read_usage
+from app.services.render_trace import record_cpu
+
+logger = logging.getLogger(__name__)
+
+# Manim's tqdm bars look like
+#   "Animation 3: Create(Circle):  40%|####      | 12/30 [00:00<00:00, 58.1it/s]"
+#   "Waiting 4:  100%|##########| 30/30 [00:00<00:00, 120.5it/s]"
+PROGRESS_PATTERN = re.compile(
+    r"(?:Animation|Waiting)\s+(\d+).*?\|\s*(\d+)/(\d+)"
+)
+LINE_SEPARATOR = re.compile(r"[\r\n]+")
+MAX_LINE_LENGTH = 64 * 1024
+
+
+def count_animations(code: str) -> int:
+    """Estimate how many progress bars Manim will emit for a scene."""
+    return max(1, len(re.findall(r"self\.(?:play|wait)\(", code)))
+
+
+class RenderProgress:
+    """Tracks render progress from Manim's per-animation progress bars."""
+
+    def __init__(self, expected_animations: int):
+        self.expected_animations = max(1, expected_animations)
+        self.animation = 0
+        self.frame = 0
+        self.frames = 0
+
+    def feed(self, line: str) -> bool:
+        """Update from an output line. Returns True if the line carried progress."""
+        match = PROGRESS_PATTERN.search(line)
+        if not match:
+            return False
+        self.animation = int(match.group(1))
+        self.frame = int(match.group(2))
+        self.frames = int(match.group(3))
+        # Loops can produce more animations than the static estimate
+        self.expected_animations = max(self.expected_animations, self.animation + 1)
+        return True
+
+    @property
+    def percent(self) -> int:
+        fraction = self.frame / self.frames if self.frames else 0.0
+        done = (self.animation + fraction) / self.expected_animations
+        # 100 is reserved for a finished render
+        return min(99, int(done * 100))
+
+    def as_dict(self) -> dict:
+        return {
+            "animation": self.animation + 1,
+            "animations": self.expected_animations,
+            "frame": self.frame,
+            "frames": self.frames,
+            "percent": self.percent,
+        }
+
+
+class RenderLog:
+    """
+    Captures render output with bounded memory.
+
+    Only the last `tail_lines` lines are kept in memory for error reporting,
+    leaving out progress bar updates; the complete log is streamed to a gzip
+    file on disk.
+    """
+
+    def __init__(self, path: str, tail_lines: int):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._tail = deque(maxlen=tail_lines)
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._pending = ""
+
+    def feed(self, chunk: str):
+        """Add raw output and return the complete lines it finished."""
+        parts = LINE_SEPARATOR.split(self._pending + chunk)
+        self._pending = parts.pop()
+        if len(self._pending) > MAX_LINE_LENGTH:
+            # Never buffer an unterminated line without bound
+            parts.append(self._pending)
+            self._pending = ""
+        lines = [line for line in parts if line.strip()]
+        for line in lines:
+            self._write(line)
+        return lines
+
+    def _write(self, line: str):
+        self._file.write(line + "\n")
+        if not PROGRESS_PATTERN.search(line):
+            self._tail.append(line)
+
+    def close(self):
+        if self._pending.strip():
+            self._write(self._pending)
+        self._pending = ""
+        self._file.close()
+
+    @property
+    def tail(self) -> str:
+        return "\n".join(self._tail)
+
+
+class RenderFailure(Exception):
+    """A render failure of a known class; `reason` is recorded as the render's outcome."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class RenderSuperseded(Exception):
+    """The scene was deleted, or queued for a newer render, while this one ran."""
+
+
+def manim_command(script_path: str, video_path: str, profile, profiler=()) -> list:
+    """
+    The manim invocation for a scene script, bounded by ANIMATION_TIMEOUT;
+    `profiler` is a command prefix to run manim under, such as py-spy's.
+    timeout stays in the render's process group, so stopping the group
+    reaches every process of the render.
+    """
+    return [
+        "timeout",
+        "--foreground",
+        str(settings.ANIMATION_TIMEOUT),
+        *profiler,
+        "manim",
+        script_path,
+        "-o",
+        video_path,
+        *profile.manim_args()
+    ]
+
+
+def sandbox_command(command: list, usage_path: str) -> list:
+    """`command` run under the render sandbox's limits, with its resource usage written to `usage_path`."""
+    sandbox = [
+        sys.executable, SANDBOX_SCRIPT,
+        "--usage", usage_path,
+        "--memory-mb", str(settings.RENDER_MAX_MEMORY_MB),
+        "--cpu-seconds", str(settings.RENDER_MAX_CPU_SECONDS),
+        "--open-files", str(settings.RENDER_MAX_OPEN_FILES),
+        "--processes", str(settings.RENDER_MAX_PROCESSES),
+    ]
+    if settings.RENDER_NETWORK_ISOLATION:
+        sandbox.append("--isolate-network")
+    return sandbox + ["--", *command]
+
+
+def exceeded_limits(returncode: int, output_tail: str) -> bool:
+    """Whether a failed render ran out of memory or into the CPU limit."""
+    if "MemoryError" in output_tail or "std::bad_alloc" in output_tail:
+        return True
+    # Killed by the kernel: SIGXCPU and SIGKILL at the soft and hard CPU
+    # limits, SIGKILL from the OOM killer (128 + signal, as shells report it)
+    return returncode in (128 + signal.SIGKILL, 128 + signal.SIGXCPU)
+
+
+_warned_network = False
+
+
+def _warn_network(usage: RenderUsage):
+    global _warned_network
+    if settings.RENDER_NETWORK_ISOLATION and not usage.network_isolated and not _warned_network:
+        _warned_network = True
+        logger.warning("Renders are running with network access: user namespaces are not available")
+
+
+def _signal_render(process, signum):
+    # The render runs in its own session: signal manim and ffmpeg too, not
+    # just the sandbox or timeout in front of them
+    try:
+        os.killpg(process.pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+async def _stop(process):
+    """Stop the render's processes, giving them a moment to exit and the sandbox to record usage."""
+    if process.returncode is not None:
+        return
+    _signal_render(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=5)
+    except asyncio.TimeoutError:
+        _signal_render(process, signal.SIGKILL)
+        await process.wait()
+
+
+async def run_manim(command: list, expected_animations: int, log_path: str, on_progress=None):
+    """
+    Run manim, streaming its output instead of buffering it.
+
+    Progress bars are parsed and passed to `on_progress` (awaited at most
+    every RENDER_PROGRESS_INTERVAL seconds), the full output is written to
+    a gzip log at `log_path` and only a bounded tail is kept in memory.
+    With RENDER_SANDBOX_ENABLED the render runs under the sandbox's limits.
+    Returns the exit code, the log tail and the render's RenderUsage; its
+    CPU time is recorded on the current render trace however it ends.
+    """
+    progress = RenderProgress(expected_animations)
+    log = RenderLog(log_path, settings.RENDER_LOG_TAIL_LINES)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    usage_path = None
+    if settings.RENDER_SANDBOX_ENABLED:
+        handle, usage_path = tempfile.mkstemp(suffix=".json", prefix="render-usage-")
+        os.close(handle)
+        command = sandbox_command(command, usage_path)
+    # Without the sandbox, child CPU time is only available in aggregate, so
+    # renders that finish concurrently in this process are attributed to each other
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        start_new_session=True
+    )
+
+    async def consume_output():
+        last_update = 0.0
+        while True:
+            chunk = await process.stdout.read(4096)
+            if not chunk:
+                break
+            for line in log.feed(decoder.decode(chunk)):
+                if not progress.feed(line):
+                    continue
+                now = time.monotonic()
+                if on_progress and now - last_update >= settings.RENDER_PROGRESS_INTERVAL:
+                    last_update = now
+                    await on_progress(progress)
+        return await process.wait()
+
+    def measure() -> RenderUsage:
+        if usage_path:
+            try:
+                usage = read_usage(usage_path)
+                _warn_network(usage)
+                return usage
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not read the render's resource usage: {e}")
+        usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return RenderUsage(
+            usage_after.ru_utime - usage_before.ru_utime
+            + usage_after.ru_stime - usage_before.ru_stime
+        )
+
+    try:
+        try:
+            returncode = await asyncio.wait_for(consume_output(), timeout=settings.ANIMATION_TIMEOUT)
+        except asyncio.TimeoutError:
+            await _stop(process)
+            raise RenderFailure("timeout", f"Manim render timed out after {settings.ANIMATION_TIMEOUT} seconds:\n{log.tail}")
+        except BaseException:
+            # Cancelled (the render was superseded) or on_progress failed:
+            # do not leave the render running
+            await asyncio.shield(_stop(process))
+            raise
+        finally:
+            log.close()
+            # Charge the CPU time of renders that fail or are stopped too
+            usage = measure()
+            record_cpu(usage.cpu_seconds)
+        return returncode, log.tail, usage
+    finally:
+        if usage_path and os.path.exists(usage_path):
+            os.remove(usage_path)
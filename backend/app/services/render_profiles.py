@@ -0,0 +1,44 @@
+from app.core.config import settings
+from app.models.scene import RenderProfile
+
+
+class Profile:
+    """
+    Output settings for one render profile.
+
+    Manim renders the master at width x height and fps; it is then encoded
+    once with libx264 at `preset`/`crf`, and the lower `ladder` heights are
+    scaled from the same decode in the same ffmpeg run.
+    """
+    __slots__ = ("width", "height", "fps", "preset", "crf", "ladder")
+
+    def __init__(self, width: int, height: int, fps: int, preset: str, crf: int, ladder=()):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.preset = preset
+        self.crf = crf
+        self.ladder = tuple(ladder)
+
+    def manim_args(self) -> list:
+        return ["--resolution", f"{self.width},{self.height}", "--frame_rate", str(self.fps)]
+
+    def rung_width(self, height: int) -> int:
+        """Width ffmpeg's scale=-2:{height} gives the master."""
+        return round(height * self.width / (self.height * 2)) * 2
+
+
+RENDER_PROFILES = {
+    # Quick look while iterating on a prompt
+    RenderProfile.PREVIEW: Profile(854, 480, 15, "veryfast", 28),
+    RenderProfile.STANDARD: Profile(1280, 720, 30, "veryfast", 23, ladder=(360,)),
+    # Final output, with a ladder for adaptive streaming and downloads
+    RenderProfile.EXPORT: Profile(1920, 1080, 60, "faster", 21, ladder=(720, 360)),
+}
+
+
+def get_profile(name) -> Profile:
+    try:
+        return RENDER_PROFILES[RenderProfile(name)]
+    except ValueError:
+        return RENDER_PROFILES[RenderProfile(settings.RENDER_DEFAULT_PROFILE)]
@@ -0,0 +1,318 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from app.core.config import settings
+from app.core.metrics import RENDER_QUEUE_DEPTH, RENDER_QUEUE_WAIT_SECONDS, RENDERS_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+
+class RenderJob:
+    __slots__ = ("scene_id", "render_version", "key", "weight", "cost", "profiled", "queued_at", "started_at", "task")
+
+    def __init__(self, scene_id, key, weight: float = 1.0, cost: float = None, profiled: bool = False, render_version: int = 0):
+        self.scene_id = scene_id
+        self.render_version = render_version  # the scene's render_version this job renders
+        self.key = key  # the user (or project) the job is scheduled under
+        self.weight = weight
+        self.cost = settings.RENDER_ESTIMATED_SECONDS if cost is None else cost
+        self.profiled = profiled  # render under the profiler
+        self.queued_at = time.monotonic()
+        self.started_at = None
+        self.task = None  # set when the job starts
+
+
+class _Tenant:
+    __slots__ = ("key", "weight", "queue", "running", "virtual_time")
+
+    def __init__(self, key, weight: float, virtual_time: float):
+        self.key = key
+        self.weight = weight
+        self.queue = deque()
+        self.running = 0
+        self.virtual_time = virtual_time  # service received so far, divided by weight
+
+
+class FairShareQueue:
+    """
+    Weighted fair queue of render jobs across tenants.
+
+    Each tenant (a user, or a project) has its own FIFO and a virtual time
+    that advances by the cost of each job divided by the tenant's weight. The
+    next job always comes from the eligible tenant with the lowest virtual
+    time, so a tenant with weight 2 gets twice the render time of one with
+    weight 1 and a tenant with 100 queued scenes cannot delay a tenant with
+    one. Tenants that go idle are forgotten and rejoin at the current virtual
+    time, so they cannot bank credit. Jobs are charged their estimated cost
+    when they start and corrected to the actual duration when they finish.
+
+    Not thread-safe; RenderScheduler serializes access.
+    """
+
+    def __init__(self, concurrency: int, per_tenant_limit: int):
+        self.concurrency = concurrency
+        self.per_tenant_limit = per_tenant_limit
+        # Jobs that started and have not finished; a superseded job of a
+        # scene can still be stopping while the scene's next job runs
+        self.running = set()
+        self._tenants = {}
+        self._virtual_time = 0.0
+        self._queued = 0
+
+    def __len__(self):
+        return self._queued
+
+    def push(self, job: RenderJob):
+        tenant = self._tenants.get(job.key)
+        if tenant is None:
+            tenant = _Tenant(job.key, job.weight, self._virtual_time)
+            self._tenants[job.key] = tenant
+        tenant.weight = job.weight
+        tenant.queue.append(job)
+        self._queued += 1
+
+    def remove(self, job: RenderJob) -> bool:
+        """Drop a job that has not started; False if it is not queued."""
+        tenant = self._tenants.get(job.key)
+        if tenant is None or job not in tenant.queue:
+            return False
+        tenant.queue.remove(job)
+        self._queued -= 1
+        if not tenant.queue and not tenant.running:
+            del self._tenants[job.key]
+        return True
+
+    def _eligible(self, tenant: _Tenant) -> bool:
+        return bool(tenant.queue) and tenant.running < self.per_tenant_limit
+
+    def pop(self, now: float):
+        """Start and return the next job, or None if nothing may start now."""
+        if len(self.running) >= self.concurrency:
+            return None
+        tenant = min(
+            (tenant for tenant in self._tenants.values() if self._eligible(tenant)),
+            key=lambda tenant: tenant.virtual_time,
+            default=None
+        )
+        if tenant is None:
+            return None
+        job = tenant.queue.popleft()
+        self._queued -= 1
+        tenant.running += 1
+        self._virtual_time = max(self._virtual_time, tenant.virtual_time)
+        tenant.virtual_time += job.cost / tenant.weight
+        job.started_at = now
+        self.running.add(job)
+        return job
+
+    def finish(self, job: RenderJob, now: float):
+        self.running.discard(job)
+        tenant = self._tenants.get(job.key)
+        if tenant is None:
+            return
+        tenant.running -= 1
+        tenant.virtual_time += ((now - job.started_at) - job.cost) / tenant.weight
+        if not tenant.queue and not tenant.running:
+            del self._tenants[job.key]
+
+    def forecast(self, now: float) -> dict:
+        """
+        Predict when each queued job will start.
+
+        Replays the scheduling policy on a copy of the state, assuming every
+        job takes its estimated cost. Returns {scene_id: (position, seconds
+        until start)} where position 1 is the next job to start.
+        """
+        counter = itertools.count()
+        # Times at which a global render slot frees up
+        slots = [max(0.0, job.started_at + job.cost - now) for job in self.running]
+        slots += [0.0] * (self.concurrency - len(slots))
+        heapq.heapify(slots)
+        tenants = []
+        for tenant in self._tenants.values():
+            if not tenant.queue:
+                continue
+            # Times at which each of the tenant's own slots frees up
+            own = [
+                max(0.0, job.started_at + job.cost - now)
+                for job in self.running if job.key == tenant.key
+            ]
+            own += [0.0] * max(0, self.per_tenant_limit - len(own))
+            heapq.heapify(own)
+            tenants.append([tenant.virtual_time, next(counter), tenant, own, 0])
+
+        forecast = {}
+        position = 0
+        while tenants and slots:
+            free_at = heapq.heappop(slots)
+            ready = [entry for entry in tenants if entry[3][0] <= free_at]
+            if not ready:
+                # Every waiting tenant is at its concurrency limit; the slot
+                # idles until the first of them finishes a render.
+                free_at = min(entry[3][0] for entry in tenants)
+                ready = [entry for entry in tenants if entry[3][0] <= free_at]
+            entry = min(ready)
+            virtual_time, _, tenant, own, index = entry
+            job = tenant.queue[index]
+            position += 1
+            forecast[job.scene_id] = (position, free_at)
+            heapq.heapreplace(own, free_at + job.cost)
+            heapq.heappush(slots, free_at + job.cost)
+            entry[0] = virtual_time + job.cost / tenant.weight
+            entry[4] = index + 1
+            if entry[4] == len(tenant.queue):
+                tenants.remove(entry)
+        return forecast
+
+
+class RenderScheduler:
+    """
+    Runs queued renders on the event loop, RENDER_CONCURRENCY at a time,
+    in fair-share order.
+
+    `submit` may be called from any thread (sync endpoints run in the
+    threadpool). The queue lives in this process only; with several API
+    workers each one schedules the jobs it accepted.
+
+    A scene has at most one current job. Submitting it again, or
+    cancelling it, drops its queued job or cancels its running one, which
+    stops the render's processes. Renders also check the scene's
+    render_version before committing, which covers jobs of other workers.
+    """
+
+    def __init__(self, render, concurrency: int, per_tenant_limit: int):
+        self._render = render
+        self._queue = FairShareQueue(concurrency, per_tenant_limit)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._dispatcher = None
+        self._tasks = set()
+        self._jobs = {}  # scene_id -> the scene's current job, queued or running
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = self._loop.create_task(self._dispatch())
+
+    async def stop(self):
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(self._dispatcher, *self._tasks, return_exceptions=True)
+        self._dispatcher = None
+
+    def submit(self, scene_versions: dict, key, weight: float = 1.0, profiled=()):
+        """
+        Queue renders of {scene_id: render_version}, scheduled fairly under
+        `key` and replacing the scenes' earlier jobs; those in `profiled` are
+        profiled.
+        """
+        if self._loop is None:
+            raise RuntimeError("Render scheduler has not been started")
+        profiled = set(profiled)
+        with self._lock:
+            for scene_id, render_version in scene_versions.items():
+                self._supersede(scene_id)
+                job = RenderJob(scene_id, key, weight, profiled=scene_id in profiled, render_version=render_version)
+                self._queue.push(job)
+                self._jobs[scene_id] = job
+            self._update_gauges()
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def cancel(self, scene_ids):
+        """Drop the queued jobs and cancel the running ones of `scene_ids`, e.g. of deleted scenes."""
+        if self._loop is None:
+            return
+        with self._lock:
+            for scene_id in scene_ids:
+                self._supersede(scene_id)
+            self._update_gauges()
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _supersede(self, scene_id):
+        job = self._jobs.pop(scene_id, None)
+        if job is None:
+            return
+        if job.task is None:
+            self._queue.remove(job)
+        else:
+            logger.info(f"Cancelling render of scene {scene_id} (version {job.render_version})")
+            self._loop.call_soon_threadsafe(job.task.cancel)
+
+    def jobs(self) -> dict:
+        """{scene_id: render_version} of the jobs this scheduler holds, queued or running."""
+        with self._lock:
+            return {scene_id: job.render_version for scene_id, job in self._jobs.items()}
+
+    def _update_gauges(self):
+        RENDER_QUEUE_DEPTH.set(len(self._queue))
+        RENDERS_IN_FLIGHT.set(len(self._queue.running))
+
+    def queue_positions(self, scene_ids) -> dict:
+        """
+        Return {scene_id: (position, estimated seconds until start)} for the
+        given scenes that are still waiting to start.
+        """
+        with self._lock:
+            if not len(self._queue):
+                return {}
+            forecast = self._queue.forecast(time.monotonic())
+        return {scene_id: forecast[scene_id] for scene_id in scene_ids if scene_id in forecast}
+
+    async def _dispatch(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                with self._lock:
+                    job = self._queue.pop(time.monotonic())
+                    self._update_gauges()
+                    if job is None:
+                        break
+                    # Under the lock, so a job that is not queued always has its task
+                    job.task = asyncio.create_task(self._run(job))
+                RENDER_QUEUE_WAIT_SECONDS.observe(job.started_at - job.queued_at)
+                self._tasks.add(job.task)
+                job.task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: RenderJob):
+        try:
+            await self._render(job.scene_id, job.queued_at, job.profiled, job.render_version)
+        except Exception as e:
+            logger.error(f"Render of scene {job.scene_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._queue.finish(job, time.monotonic())
+                if self._jobs.get(job.scene_id) is job:
+                    del self._jobs[job.scene_id]
+                self._update_gauges()
+            self._wakeup.set()
+
+
+def _render_scene(scene_id, queued_at, profiled, render_version):
+    # Imported lazily so the queue policy can be used without manim installed
+    from app.services.animation import generate_animation
+    return generate_animation(scene_id, queued_at, profiled, render_version)
+
+
+render_scheduler = RenderScheduler(
+    _render_scene,
+    concurrency=settings.RENDER_CONCURRENCY,
+    per_tenant_limit=settings.RENDER_USER_CONCURRENCY
+)
+
+
+def enqueue_renders(user, project_id, scene_versions: dict, profiled=()):
+    """
+    Queue renders of {scene_id: render_version} for scenes of the user's
+    project, shared fairly per user or per project.
+    """
+    key = project_id if settings.RENDER_FAIR_SHARE_KEY == "project" else user.id
+    render_scheduler.submit(scene_versions, key, user.render_weight or 1.0, profiled)
@@ -0,0 +1,144 @@
+"""
+Resource limits and accounting for render processes.
+
+Manim runs generated code, so renders are started through this file run
+as a script (see render_output.sandbox_command). Before starting the
+render it caps its own address space, CPU time, open files and process
+count, which the render inherits, and moves into new user and network
+namespaces so the render has no network access. It then waits for the
+render with wait4() and writes the render's resource usage - CPU seconds
+and the peak RSS of the largest process - to a JSON file.
+
+Limits are applied here rather than in a preexec_fn, which is not safe in
+the threaded API process, and usage is measured here because the API's
+RUSAGE_CHILDREN mixes up renders that finish at the same time.
+
+Only the standard library is used: the script runs without the app on
+its path.
+"""
+import argparse
+import ctypes
+import json
+import os
+import resource
+import signal
+import subprocess
+import sys
+from typing import NamedTuple
+
+SANDBOX_SCRIPT = os.path.abspath(__file__)
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+
+class RenderUsage(NamedTuple):
+    cpu_seconds: float
+    max_rss_kb: int = None  # None when the render ran without the sandbox
+    network_isolated: bool = False
+
+
+def read_usage(path: str) -> RenderUsage:
+    with open(path) as f:
+        usage = json.load(f)
+    return RenderUsage(usage["cpu_seconds"], usage["max_rss_kb"], usage["network_isolated"])
+
+
+def apply_limits(memory_mb: int, cpu_seconds: int, open_files: int, processes: int):
+    """Lower the soft and hard limits; 0 leaves a limit as it is."""
+    limits = [
+        (resource.RLIMIT_AS, memory_mb * 1024 * 1024),
+        (resource.RLIMIT_CPU, cpu_seconds),
+        (resource.RLIMIT_NOFILE, open_files),
+        (resource.RLIMIT_NPROC, processes),
+    ]
+    for limit, value in limits:
+        if value <= 0:
+            continue
+        _, hard = resource.getrlimit(limit)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(limit, (value, value))
+
+
+def _write(path: str, content: str):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def isolate_network():
+    """Move into new user and network namespaces: only an unconfigured loopback remains."""
+    uid, gid = os.getuid(), os.getgid()
+    flags = CLONE_NEWUSER | CLONE_NEWNET
+    if hasattr(os, "unshare"):
+        os.unshare(flags)
+    else:
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.unshare(flags) != 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+    # Keep our own ids inside the namespace, or files could not be created
+    _write("/proc/self/setgroups", "deny")
+    _write("/proc/self/uid_map", f"{uid} {uid} 1")
+    _write("/proc/self/gid_map", f"{gid} {gid} 1")
+
+
+def main(args) -> int:
+    network_isolated = False
+    if args.isolate_network:
+        try:
+            isolate_network()
+            network_isolated = True
+        except OSError as e:
+            # Unprivileged user namespaces can be disabled, e.g. by a container's seccomp profile
+            print(f"Render sandbox: network isolation unavailable: {e}", file=sys.stderr, flush=True)
+    apply_limits(args.memory_mb, args.cpu_seconds, args.open_files, args.processes)
+
+    # Pass termination on, so stopping the sandbox stops the render. Not
+    # through Popen, which could reap the child before wait4 does. The
+    # handlers go in first: a signal that arrives while the render is
+    # starting is held and passed on once it has started
+    child = None
+    held = []
+
+    def forward(signum, frame):
+        if child is None:
+            held.append(signum)
+        else:
+            os.kill(child.pid, signum)
+
+    forwarded = (signal.SIGTERM, signal.SIGINT)
+    for signum in forwarded:
+        signal.signal(signum, forward)
+    child = subprocess.Popen(args.command)
+    for signum in held:
+        os.kill(child.pid, signum)
+    _, status, usage = os.wait4(child.pid, 0)
+    for signum in forwarded:
+        signal.signal(signum, signal.SIG_DFL)
+    returncode = os.waitstatus_to_exitcode(status)
+
+    # Both include the processes the render waited for, e.g. ffmpeg;
+    # ru_maxrss is in kilobytes on Linux
+    _write(args.usage, json.dumps({
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "max_rss_kb": usage.ru_maxrss,
+        "network_isolated": network_isolated,
+    }))
+    # Exit like a shell does for a render killed by a signal (e.g. SIGKILL at the CPU limit)
+    return returncode if returncode >= 0 else 128 - returncode
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a render with resource limits and report its usage")
+    parser.add_argument("--usage", required=True, help="JSON file to write the render's resource usage to")
+    parser.add_argument("--memory-mb", type=int, default=0, help="address space per process")
+    parser.add_argument("--cpu-seconds", type=int, default=0, help="CPU time per process")
+    parser.add_argument("--open-files", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=0, help="processes and threads of the user")
+    parser.add_argument("--isolate-network", action="store_true")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    if args.command[:1] == ["--"]:
+        args.command = args.command[1:]
+    sys.exit(main(args))
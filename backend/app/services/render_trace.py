@@ -0,0 +1,168 @@
+"""
+Per-render stage timelines.
+
+Each render attempt records a span per stage (queue wait, LLM call,
+sanitize, render, encode, upload, commit, ...) plus a "total" span with
+the outcome, and stores them in render_spans when the attempt ends. The
+same stage timings feed the render_stage_seconds metric; the spans keep
+them per scene so one slow render can be explained after the fact.
+The attempt's CPU time is stored in render_cpu_usage, failed attempts
+included, for the render admission budget.
+"""
+import asyncio
+import contextvars
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, select
+from app.core.config import settings
+from app.core.metrics import RENDER_STAGE_SECONDS, RENDERS_TOTAL
+from app.db.database import SessionLocal
+from app.models.render_cpu_usage import RenderCpuUsage
+from app.models.render_span import RenderSpan
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar("render_trace", default=None)
+
+
+def utc_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+class RenderTrace:
+    """Spans of one render attempt, timed on the monotonic clock."""
+
+    def __init__(self, scene_id, queued_at: float = None):
+        self.scene_id = scene_id
+        self.attempt_id = uuid.uuid4()
+        self.started_at = time.monotonic() if queued_at is None else queued_at
+        self.outcome = None
+        self.user_id = None  # whose render budget the attempt's CPU time is charged to
+        self.cpu_seconds = None
+        self.spans = []  # (stage, start, end)
+        # Wall-clock time of monotonic zero, to timestamp the spans
+        self._epoch = time.time() - time.monotonic()
+        if queued_at is not None:
+            self.add("queue", queued_at, time.monotonic())
+
+    def add(self, stage: str, start: float, end: float):
+        self.spans.append((stage, start, end))
+
+    def rows(self) -> list:
+        end = max([time.monotonic()] + [span_end for _, _, span_end in self.spans])
+        spans = self.spans + [("total", self.started_at, end)]
+        return [
+            RenderSpan(
+                scene_id=self.scene_id,
+                attempt_id=self.attempt_id,
+                stage=stage,
+                started_at=utc_datetime(self._epoch + start),
+                duration=end - start,
+                outcome=self.outcome if stage == "total" else None
+            )
+            for stage, start, end in spans
+        ]
+
+    async def save(self):
+        """
+        Store the spans and drop the scene's attempts beyond RENDER_TRACE_ATTEMPTS,
+        and charge the attempt's CPU time to the user.
+        """
+        if self.user_id is not None and self.cpu_seconds is not None:
+            try:
+                await asyncio.to_thread(self._save_usage)
+            except Exception as e:
+                logger.warning(f"Could not store the render CPU usage of scene {self.scene_id}: {e}")
+        if self.outcome is None or settings.RENDER_TRACE_ATTEMPTS <= 0:
+            return
+        try:
+            await asyncio.to_thread(self._save, self.rows())
+        except Exception as e:
+            # The scene may have been deleted while it rendered
+            logger.warning(f"Could not store the render timeline of scene {self.scene_id}: {e}")
+
+    def _save_usage(self):
+        db = SessionLocal()
+        try:
+            db.add(RenderCpuUsage(
+                user_id=self.user_id,
+                scene_id=self.scene_id,
+                cpu_seconds=self.cpu_seconds,
+                outcome=self.outcome
+            ))
+            # Usage that has left the admission window is not needed any more
+            db_now = db.scalar(select(func.now()))
+            db.execute(delete(RenderCpuUsage).where(
+                RenderCpuUsage.user_id == self.user_id,
+                RenderCpuUsage.created_at < db_now - timedelta(seconds=settings.RENDER_CPU_WINDOW)
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def _save(self, rows: list):
+        db = SessionLocal()
+        try:
+            db.add_all(rows)
+            db.flush()
+            expired = db.scalars(
+                select(RenderSpan.attempt_id).where(
+                    RenderSpan.scene_id == self.scene_id,
+                    RenderSpan.stage == "total"
+                ).order_by(RenderSpan.started_at.desc()).offset(settings.RENDER_TRACE_ATTEMPTS)
+            ).all()
+            if expired:
+                db.execute(delete(RenderSpan).where(RenderSpan.attempt_id.in_(expired)))
+            db.commit()
+        finally:
+            db.close()
+
+
+@contextmanager
+def render_trace(scene_id, queued_at: float = None):
+    """Trace the render of `scene_id` in this context; save the result with `save`."""
+    trace = RenderTrace(scene_id, queued_at)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def render_stage(stage: str):
+    """Time a render stage for the metrics and, inside a render_trace, the timeline."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        end = time.monotonic()
+        RENDER_STAGE_SECONDS.labels(stage).observe(end - start)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(stage, start, end)
+
+
+def record_cpu(cpu_seconds: float):
+    """Add CPU time spent on the current render attempt, e.g. by manim."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.cpu_seconds = (trace.cpu_seconds or 0.0) + cpu_seconds
+
+
+def charge_render(user_id):
+    """Charge the current render attempt's CPU time to `user_id`'s render budget."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.user_id = user_id
+
+
+def record_outcome(outcome: str):
+    """Count the finished render by outcome and mark the current trace with it."""
+    RENDERS_TOTAL.labels(outcome).inc()
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.outcome = outcome
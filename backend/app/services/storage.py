@@ -0,0 +1,218 @@
+import mimetypes
+import os
+import shutil
+from typing import NamedTuple
+from starlette.responses import RedirectResponse, Response
+from starlette.types import Receive, Scope, Send
+from app.core.config import settings
+from app.core.media import HASHED_NAME_PATTERN, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, MediaFiles
+
+# Optional dependency, only needed for the S3 backend
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+except ImportError:
+    boto3 = None
+
+
+class StoredFile(NamedTuple):
+    key: str
+    size: int
+    modified: float  # Unix time
+    accessed: float  # Unix time; the modification time where access is not tracked
+
+
+def media_url(key: str) -> str:
+    """Public URL of a stored artifact; the same for every backend."""
+    return f"/media/{key}"
+
+
+def media_key(url: str) -> str:
+    return url.removeprefix("/media/")
+
+
+def render_keys(video_key: str, keys):
+    """
+    Select, from `keys`, a rendered video and everything derived from it:
+    {video name}.* beside it and its hls/{video name}/ directory.
+    """
+    directory, filename = os.path.split(video_key)
+    if not HASHED_NAME_PATTERN.search(filename):
+        # Unhashed names predate derived files, and {scene_id}.* would match
+        # the scene's current render
+        return [key for key in keys if key == video_key]
+    stem = os.path.splitext(filename)[0]
+    prefixes = (f"{directory}/{stem}.", f"{directory}/hls/{stem}/")
+    return [key for key in keys if key == video_key or key.startswith(prefixes)]
+
+
+class LocalStorage:
+    """Artifacts live under MEDIA_ROOT and are served by MediaFiles."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def location(self, key: str) -> str:
+        return self.path(key)
+
+    def save(self, local_path: str, key: str):
+        """Move a finished local file into storage under `key`."""
+        destination = self.path(key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.move(local_path, destination)
+
+    def scan(self, prefix: str):
+        """StoredFile entries for all files under the directory `prefix`."""
+        base = self.path(prefix)
+        for directory, _, names in os.walk(base):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                yield StoredFile(key, stat.st_size, stat.st_mtime, max(stat.st_atime, stat.st_mtime))
+
+    def list(self, prefix: str):
+        """Keys of all files under the directory `prefix`."""
+        return (entry.key for entry in self.scan(prefix))
+
+    def delete(self, keys):
+        for key in keys:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+            # Drop directories left empty, such as an HLS segment directory,
+            # below the top-level one (videos/)
+            top = self.path(key.split("/")[0])
+            directory = os.path.dirname(self.path(key))
+            while directory.startswith(top) and directory != top:
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+
+    def delete_render(self, video_key: str):
+        directory = os.path.dirname(video_key)
+        self.delete(render_keys(video_key, self.list(directory)))
+
+    def media_app(self):
+        os.makedirs(self.root, exist_ok=True)
+        return MediaFiles(directory=self.root)
+
+
+class S3Storage:
+    """
+    Artifacts live in an S3-compatible bucket (AWS, MinIO, ...).
+
+    Uploads stream from disk in S3_MULTIPART_CHUNK_MB parts. /media URLs
+    redirect to S3_PUBLIC_URL when set (a public bucket or CDN), otherwise
+    to a presigned URL, so the bytes never pass through the API. HLS
+    playlists and sprite tracks refer to their segments and tiles by
+    relative URL, which a presigned redirect does not cover; use
+    S3_PUBLIC_URL when HLS is enabled.
+    """
+
+    def __init__(self):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package")
+        self.bucket = settings.S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+        )
+        chunk_size = settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024
+        self.transfer_config = TransferConfig(multipart_threshold=chunk_size, multipart_chunksize=chunk_size)
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def save(self, local_path: str, key: str):
+        """Upload a finished local file under `key` and remove the local copy."""
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_NAME_PATTERN.search(key) else REVALIDATE_CACHE_CONTROL
+        self.client.upload_file(
+            local_path, self.bucket, key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": cache_control},
+            Config=self.transfer_config
+        )
+        os.remove(local_path)
+
+    def _objects(self, prefix: str):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                modified = item["LastModified"].timestamp()
+                yield StoredFile(item["Key"], item["Size"], modified, modified)
+
+    def _keys(self, prefix: str):
+        return (entry.key for entry in self._objects(prefix))
+
+    def scan(self, prefix: str):
+        return self._objects(prefix.rstrip("/") + "/")
+
+    def list(self, prefix: str):
+        return self._keys(prefix.rstrip("/") + "/")
+
+    def delete(self, keys):
+        keys = list(keys)
+        # DeleteObjects accepts up to 1000 keys per call
+        for start in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[start:start + 1000]], "Quiet": True}
+            )
+
+    def delete_render(self, video_key: str):
+        directory, filename = os.path.split(video_key)
+        stem = os.path.splitext(filename)[0]
+        candidates = list(self._keys(f"{directory}/{stem}")) + list(self.list(f"{directory}/hls/{stem}"))
+        self.delete(render_keys(video_key, candidates))
+
+    def url_for(self, key: str) -> str:
+        if settings.S3_PUBLIC_URL:
+            return f"{settings.S3_PUBLIC_URL.rstrip('/')}/{key}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=settings.S3_PRESIGN_EXPIRES
+        )
+
+    def media_app(self):
+        return S3MediaRedirect(self)
+
+
+class S3MediaRedirect:
+    """Serve /media/{key} by redirecting to the object in the bucket."""
+
+    def __init__(self, storage: S3Storage):
+        self.storage = storage
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = scope["path"].lstrip("/")
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or not key or ".." in key.split("/"):
+            response = Response(status_code=404)
+        else:
+            response = RedirectResponse(self.storage.url_for(key), status_code=307)
+            # Presigned URLs expire, so only let clients reuse the redirect for part of that time
+            max_age = settings.S3_PRESIGN_EXPIRES // 2 if not settings.S3_PUBLIC_URL else 86400
+            response.headers["Cache-Control"] = f"private, max-age={max_age}"
+        await response(scope, receive, send)
+
+
+def _create_storage():
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    return LocalStorage(settings.MEDIA_ROOT)
+
+
+storage = _create_storage()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from app.core.config import settings
+from app.services.packaging import probe_duration, run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_tts(command: list, text: str):
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(text.encode()), timeout=settings.TTS_TIMEOUT)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise RuntimeError(f"{command[0]} exited with {process.returncode}: {stderr.decode(errors='replace')[-1000:]}")
+
+
+class EspeakEngine:
+    """espeak-ng: small, offline, robotic."""
+
+    async def synthesize(self, text: str, path: str):
+        await _run_tts([
+            "espeak-ng", "-v", settings.TTS_VOICE, "-s", str(settings.TTS_WORDS_PER_MINUTE),
+            "-w", path, "--stdin"
+        ], text)
+
+
+class PiperEngine:
+    """Piper neural TTS, offline; TTS_PIPER_MODEL is the path to a voice model."""
+
+    async def synthesize(self, text: str, path: str):
+        await _run_tts(["piper", "--model", settings.TTS_PIPER_MODEL, "--output_file", path], text)
+
+
+class ToneEngine:
+    """Stand-in for development and tests: a quiet tone as long as reading the text would take."""
+
+    async def synthesize(self, text: str, path: str):
+        seconds = max(1.0, len(text.split()) * 60 / settings.TTS_WORDS_PER_MINUTE)
+        await run_ffmpeg("-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds:.2f}", "-af", "volume=0.1", path)
+
+
+TTS_ENGINES = {
+    "espeak": EspeakEngine,
+    "piper": PiperEngine,
+    "tone": ToneEngine,
+}
+
+
+async def fit_narration(speech_path: str, duration: float, output_path: str):
+    """
+    Encode speech as an AAC track exactly `duration` seconds long.
+
+    Shorter speech is padded with silence. Longer speech is sped up by at
+    most TTS_MAX_TEMPO and whatever still runs past the end is cut.
+    """
+    speech_duration = await probe_duration(speech_path)
+    filters = []
+    if speech_duration > duration:
+        tempo = speech_duration / duration
+        if tempo > settings.TTS_MAX_TEMPO:
+            logger.warning(f"Narration is {speech_duration:.1f}s for {duration:.1f}s of video; the end is cut")
+        filters.append(f"atempo={min(tempo, settings.TTS_MAX_TEMPO):.4f}")
+    filters += ["apad", f"atrim=0:{duration:.3f}"]
+    await run_ffmpeg("-i", speech_path, "-af", ",".join(filters), "-c:a", "aac", "-b:a", "128k", output_path)
+
+
+async def mux_audio(video_path: str, audio_path: str):
+    """
+    Replace the video's audio with `audio_path`, in place; both streams are
+    copied. Only for a video that is not re-encoded: encode_profile takes
+    the track as its input instead.
+    """
+    temp_path = f"{video_path}.mux.mp4"
+    try:
+        await run_ffmpeg(
+            "-i", video_path, "-i", audio_path,
+            "-map", "0:v", "-map", "1:a", "-c", "copy",
+            "-movflags", "+faststart", temp_path
+        )
+        os.replace(temp_path, video_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class Narration:
+    """
+    Voice-over for one render.
+
+    Speech synthesis starts on construction and runs alongside code
+    generation and the manim render; `track` waits for it and fits it to
+    the rendered video, ready to be encoded with it. Always `close` it.
+    """
+
+    def __init__(self, text: str):
+        engine = TTS_ENGINES[settings.TTS_ENGINE]()
+        self.directory = tempfile.mkdtemp(prefix="narration-")
+        self.speech_path = os.path.join(self.directory, "speech.wav")
+        self.task = asyncio.create_task(engine.synthesize(text, self.speech_path))
+
+    async def track(self, video_path: str) -> str:
+        """The path of the narration fitted to the video as an AAC track."""
+        await self.task
+        track_path = os.path.join(self.directory, "voiceover.m4a")
+        await fit_narration(self.speech_path, await probe_duration(video_path), track_path)
+        return track_path
+
+    def close(self):
+        if self.task.done() and not self.task.cancelled():
+            self.task.exception()  # retrieve it, so an unused failure is not reported as unhandled
+        else:
+            self.task.cancel()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,143 @@
+"""
+Response compression CPU benchmark.
+
+Serves the same traffic through the previous setup (StaticFiles behind
+GZipMiddleware) and the current one (MediaFiles behind CompressionMiddleware)
+and reports CPU seconds spent per GB of response body served, split into
+video and JSON, along with the bytes sent on the wire. The JSON payload is a
+project listing like the one the dashboard loads; repeated requests for the
+same body hit the compressed-body cache unless --unique-json is given.
+
+    python benchmarks/compression_cpu.py --video-mb 20 --video-requests 20 --json-requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_video(directory, size):
+    # Encoded video is effectively incompressible; random bytes model that
+    path = os.path.join(directory, "videos", "scene.0123456789abcdef.mp4")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    return "/media/videos/scene.0123456789abcdef.mp4"
+
+
+def make_payload(projects):
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Linear algebra lecture {i}",
+            "description": "Eigenvectors, eigenvalues and the geometry of linear maps",
+            "created_at": "2026-10-19T12:00:00",
+            "updated_at": "2026-10-19T12:30:00",
+            "scenes": [
+                {
+                    "id": str(uuid.uuid4()),
+                    "order": j,
+                    "status": "completed",
+                    "progress": 100,
+                    "video_url": f"/media/videos/{uuid.uuid4()}.0123456789abcdef.mp4",
+                }
+                for j in range(8)
+            ],
+        }
+        for i in range(projects)
+    ]
+
+
+def build_app(media_root, payload, legacy, unique_json=False):
+    from fastapi import FastAPI
+    from fastapi.responses import Response
+
+    app = FastAPI()
+    body = json.dumps(payload).encode()
+    counter = iter(range(10 ** 9))
+
+    @app.get("/api/v1/projects/")
+    def list_projects():
+        if unique_json:
+            # A different body every time, as for data that keeps changing
+            return Response(body[:-1] + b', {"request": %d}]' % next(counter), media_type="application/json")
+        return Response(body, media_type="application/json")
+
+    if legacy:
+        from fastapi.middleware.gzip import GZipMiddleware
+        from fastapi.staticfiles import StaticFiles
+
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        app.mount("/media", StaticFiles(directory=media_root))
+    else:
+        from app.core.compression import CompressionMiddleware
+        from app.core.media import MediaFiles
+
+        app.add_middleware(CompressionMiddleware, minimum_size=1000)
+        app.mount("/media", MediaFiles(directory=media_root))
+    return app
+
+
+async def measure(app, path, requests, accept_encoding):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Accept-Encoding": accept_encoding}
+    wire = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path, headers=headers)  # warm up
+        start = time.process_time()
+        for _ in range(requests):
+            response = await client.get(path, headers=headers)
+            wire += response.num_bytes_downloaded
+        cpu = time.process_time() - start
+    return cpu, wire
+
+
+async def run(args):
+    media_root = tempfile.mkdtemp(prefix="compression-bench-")
+    video_path = make_video(media_root, args.video_mb * 1024 * 1024)
+    payload = make_payload(args.projects)
+    json_size = len(json.dumps(payload).encode())
+    print(f"video {args.video_mb} MB x {args.video_requests}, JSON {json_size / 1024:.0f} KB x {args.json_requests}, "
+          f"Accept-Encoding: {args.accept_encoding}\n")
+
+    # Raw (identity) transfer cost, subtracted so only compression work is compared
+    baseline = build_app(media_root, payload, legacy=False, unique_json=args.unique_json)
+    video_base, _ = await measure(baseline, video_path, args.video_requests, "identity")
+    json_base, _ = await measure(baseline, "/api/v1/projects/", args.json_requests, "identity")
+
+    video_gb = args.video_mb * args.video_requests / 1024
+    json_gb = json_size * args.json_requests / 1024 ** 3
+    print(f"{'setup':32s} {'video CPU s/GB':>15s} {'JSON CPU s/GB':>14s} {'JSON on wire':>13s}")
+    results = {}
+    for label, legacy in (("GZipMiddleware + StaticFiles", True), ("CompressionMiddleware + MediaFiles", False)):
+        app = build_app(media_root, payload, legacy, args.unique_json)
+        video_cpu, _ = await measure(app, video_path, args.video_requests, args.accept_encoding)
+        json_cpu, json_wire = await measure(app, "/api/v1/projects/", args.json_requests, args.accept_encoding)
+        video_per_gb = max(0.0, video_cpu - video_base) / video_gb
+        json_per_gb = max(0.0, json_cpu - json_base) / json_gb
+        results[legacy] = (video_per_gb, json_per_gb)
+        print(f"{label:32s} {video_per_gb:15.2f} {json_per_gb:14.2f} "
+              f"{json_wire / args.json_requests / 1024:10.1f} KB")
+
+    saved_video = results[True][0] - results[False][0]
+    saved_json = results[True][1] - results[False][1]
+    print(f"\nCPU saved: {saved_video:.2f} s per GB of video, {saved_json:.2f} s per GB of JSON")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video-mb", type=int, default=20)
+    parser.add_argument("--video-requests", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=50, help="projects in the JSON listing")
+    parser.add_argument("--json-requests", type=int, default=2000)
+    parser.add_argument("--accept-encoding", default="gzip, deflate, br, zstd")
+    parser.add_argument("--unique-json", action="store_true", help="make every JSON body different")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""
+Encode time and output size for each render profile.
+
+For every profile a master clip is made at the profile's resolution and
+frame rate, standing in for manim's output (a generated test pattern, or a
+rendered scene scaled to fit), and then encoded the way the render
+pipeline does: one ffmpeg run producing the profile's encode and its
+ladder. Reports wall time, speed relative to real time and the size and
+bitrate of every output next to the master's.
+
+    python benchmarks/encode_profiles.py --duration 20
+    python benchmarks/encode_profiles.py media/videos/<scene>.mp4
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_master(path, profile, duration, source=None):
+    """Encode like manim does by default: libx264, CRF 23, yuv420p."""
+    if source:
+        inputs = ["-i", source, "-vf", f"scale={profile.width}:{profile.height},fps={profile.fps}", "-t", str(duration)]
+    else:
+        inputs = ["-f", "lavfi", "-i", f"testsrc2=size={profile.width}x{profile.height}:rate={profile.fps}", "-t", str(duration)]
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *inputs,
+        "-an", "-c:v", "libx264", "-crf", "23", "-pix_fmt", "yuv420p", path
+    ], check=True)
+
+
+def describe(path, duration):
+    size = os.path.getsize(path)
+    return f"{size / 2**20:6.2f} MB {size * 8 / duration / 1000:7.0f} kbit/s"
+
+
+async def run(args):
+    from app.models.scene import RenderProfile
+    from app.services.packaging import encode_profile
+    from app.services.render_profiles import RENDER_PROFILES
+
+    names = args.profiles or [profile.value for profile in RenderProfile]
+    workdir = tempfile.mkdtemp(prefix="encode-bench-")
+    try:
+        for name in names:
+            profile = RENDER_PROFILES[RenderProfile(name)]
+            video_path = os.path.join(workdir, f"{name}.mp4")
+            make_master(video_path, profile, args.duration, args.video)
+            master = describe(video_path, args.duration)
+
+            started = time.perf_counter()
+            rungs = await encode_profile(video_path, profile)
+            elapsed = time.perf_counter() - started
+
+            print(f"{name}: {profile.width}x{profile.height}@{profile.fps} preset={profile.preset} crf={profile.crf}")
+            print(f"  encode   {elapsed:6.2f} s  {args.duration / elapsed:5.1f}x real time")
+            print(f"  master   {master}")
+            print(f"  {profile.height}p".ljust(11) + describe(video_path, args.duration))
+            for height, path in rungs.items():
+                print(f"  {height}p".ljust(11) + describe(path, args.duration))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="rendered scene to use as the master; a test pattern by default")
+    parser.add_argument("--duration", type=int, default=20, help="seconds of video to encode")
+    parser.add_argument("--profiles", nargs="*", help="profiles to run; all by default")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,143 @@
+"""
+Render queue fairness simulation.
+
+Replays a synthetic workload against the fair-share render queue and a plain
+FIFO on a simulated clock: one heavy user floods the queue with a large batch
+at t=0 while light users trickle in one to three scenes each. Prints wait
+time percentiles (submit to render start) per class of user, and how long
+the heavy user's batch takes to drain. Fair share is work-conserving, so the
+heavy batch still finishes when the machine runs out of work; a per-user
+limit below the concurrency trades that for headroom and leaves slots idle
+once only the heavy user is left.
+
+    python benchmarks/fair_queue_sim.py --heavy-scenes 100 --light-users 30 --concurrency 4
+"""
+import argparse
+import heapq
+import os
+import random
+import statistics
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.render_queue import FairShareQueue, RenderJob
+
+
+class FifoQueue:
+    """The previous behaviour: renders start in submission order."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.running = {}
+        self._queue = deque()
+
+    def push(self, job):
+        self._queue.append(job)
+
+    def pop(self, now):
+        if len(self.running) >= self.concurrency or not self._queue:
+            return None
+        job = self._queue.popleft()
+        job.started_at = now
+        self.running[job.scene_id] = job
+        return job
+
+    def finish(self, job, now):
+        self.running.pop(job.scene_id, None)
+
+
+def build_workload(args, rng):
+    """Return [(submit time, tenant, weight, [render durations])] sorted by time."""
+    def duration():
+        return rng.lognormvariate(0, 0.5) * args.mean_render
+
+    submissions = [(0.0, "heavy", 1.0, [duration() for _ in range(args.heavy_scenes)])]
+    for i in range(args.light_users):
+        submissions.append((
+            rng.uniform(0, args.arrival_window),
+            f"light-{i}",
+            args.light_weight,
+            [duration() for _ in range(rng.randint(1, 3))]
+        ))
+    return sorted(submissions, key=lambda submission: submission[0])
+
+
+def simulate(queue, workload, mean_render):
+    """Run the workload to completion; return {tenant: [waits]} and the heavy user's finish time."""
+    events = []  # (time, sequence, kind, payload)
+    sequence = 0
+    for submitted_at, tenant, weight, durations in workload:
+        events.append((submitted_at, sequence, "submit", (tenant, weight, durations)))
+        sequence += 1
+    heapq.heapify(events)
+
+    submitted, durations_by_job, waits = {}, {}, {}
+    heavy_done = 0.0
+    job_ids = iter(range(10 ** 9))
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        if kind == "submit":
+            tenant, weight, durations = payload
+            for duration in durations:
+                job = RenderJob(next(job_ids), tenant, weight, cost=mean_render)
+                submitted[job.scene_id] = now
+                durations_by_job[job.scene_id] = duration
+                queue.push(job)
+        else:
+            queue.finish(payload, now)
+            if payload.key == "heavy":
+                heavy_done = max(heavy_done, now)
+        while (job := queue.pop(now)) is not None:
+            waits.setdefault(job.key, []).append(now - submitted[job.scene_id])
+            heapq.heappush(events, (now + durations_by_job[job.scene_id], sequence, "finish", job))
+            sequence += 1
+    return waits, heavy_done
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def report(label, waits, heavy_done):
+    light = [wait for tenant, tenant_waits in waits.items() if tenant != "heavy" for wait in tenant_waits]
+    heavy = waits["heavy"]
+    print(f"{label}")
+    print(f"  light users  p50 {percentile(light, 50) / 60:6.1f} min   p95 {percentile(light, 95) / 60:6.1f} min"
+          f"   max {max(light) / 60:6.1f} min")
+    print(f"  heavy user   p50 {percentile(heavy, 50) / 60:6.1f} min   p95 {percentile(heavy, 95) / 60:6.1f} min"
+          f"   batch drained after {heavy_done / 60:.1f} min")
+    return percentile(light, 95)
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    workload = build_workload(args, rng)
+    total = sum(len(durations) for _, _, _, durations in workload)
+    mean = statistics.mean(d for _, _, _, durations in workload for d in durations)
+    print(f"{total} renders ({args.heavy_scenes} from the heavy user), mean render {mean:.0f}s, "
+          f"concurrency {args.concurrency}, per-user limit {args.per_user_limit}\n")
+
+    fifo_p95 = report("FIFO", *simulate(FifoQueue(args.concurrency), workload, args.mean_render))
+    fair_p95 = report(
+        "Weighted fair share",
+        *simulate(FairShareQueue(args.concurrency, args.per_user_limit), workload, args.mean_render)
+    )
+    print(f"\nlight-user p95 wait: {fifo_p95 / 60:.1f} min -> {fair_p95 / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--heavy-scenes", type=int, default=100)
+    parser.add_argument("--light-users", type=int, default=30)
+    parser.add_argument("--light-weight", type=float, default=1.0,
+                        help="priority weight of light users relative to the heavy user")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--per-user-limit", type=int, default=4)
+    parser.add_argument("--mean-render", type=float, default=120.0, help="typical render time in seconds")
+    parser.add_argument("--arrival-window", type=float, default=3600.0,
+                        help="light users arrive uniformly over this many seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+"""
+Login storm benchmark.
+
+Fires a burst of concurrent logins at a running API while a separate client
+keeps issuing authenticated CRUD requests, then reports login throughput and
+CRUD latency percentiles. Run it against a server started with `uvicorn
+app.main:app` and compare runs with different PASSWORD_HASH_WORKERS values.
+Raise RATE_LIMIT_REQUESTS on the server first, otherwise most logins are
+answered by the rate limiter instead of bcrypt.
+
+    python benchmarks/login_storm.py --base-url http://localhost:8000 --logins 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def register_and_login(client, username, password):
+    await client.post("/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": password,
+    })
+    response = await client.post("/auth/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def login_storm(client, username, password, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    outcomes = {"ok": 0, "rejected": 0, "failed": 0}
+
+    async def one_login():
+        async with semaphore:
+            response = await client.post("/auth/token", data={"username": username, "password": password})
+            if response.status_code == 200:
+                outcomes["ok"] += 1
+            elif response.status_code in (429, 503):
+                outcomes["rejected"] += 1
+            else:
+                outcomes["failed"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(total)))
+    return outcomes, time.perf_counter() - start
+
+
+async def crud_probe(client, token, stop_event, latencies):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        await client.get("/projects/", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main(args):
+    username = f"bench_{uuid.uuid4().hex[:8]}"
+    password = "bench-password"
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=f"{args.base_url}/api/v1", timeout=60, limits=limits) as client:
+        token = await register_and_login(client, username, password)
+
+        idle_latencies = []
+        stop_event = asyncio.Event()
+        probe = asyncio.create_task(crud_probe(client, token, stop_event, idle_latencies))
+        await asyncio.sleep(2)
+        stop_event.set()
+        await probe
+
+        storm_latencies = []
+        stop_event = asyncio.Event()
+        probe = asyncio.create_task(crud_probe(client, token, stop_event, storm_latencies))
+        outcomes, elapsed = await login_storm(client, username, password, args.logins, args.concurrency)
+        stop_event.set()
+        await probe
+
+    print(f"logins: {args.logins} in {elapsed:.2f}s "
+          f"({outcomes['ok'] / elapsed:.1f} successful/s, "
+          f"{outcomes['rejected']} rejected, {outcomes['failed']} failed)")
+    for label, latencies in (("idle", idle_latencies), ("storm", storm_latencies)):
+        print(f"CRUD latency ({label}, n={len(latencies)}): "
+              f"p50={percentile(latencies, 50):.1f}ms "
+              f"p95={percentile(latencies, 95):.1f}ms "
+              f"p99={percentile(latencies, 99):.1f}ms "
+              f"mean={statistics.fmean(latencies) if latencies else 0:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,171 @@
+"""
+Time-to-first-frame estimate for progressive, faststart and HLS delivery.
+
+Takes a rendered scene (or generates a test clip with ffmpeg), packages it
+the way the render pipeline does and reads the MP4 box layout of each
+variant to work out which bytes a browser must fetch, in how many round
+trips, before it can decode the first frame:
+
+- progressive, index at the end: request the file, find mdat, jump to the
+  moov at the end with a range request, then fetch the first sample
+- faststart: one request; moov and the first sample arrive in order
+- HLS (fragmented MP4): playlist, init segment, then the whole first segment
+
+The estimate is round trips x RTT + bytes / bandwidth for a few network
+profiles. It ignores TCP slow start and decode time, which affect all
+variants alike.
+
+    python benchmarks/playback_start.py --generate --duration 300
+    python benchmarks/playback_start.py media/videos/<scene>.mp4
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# name, round trip time (s), bandwidth (bytes/s)
+NETWORKS = [
+    ("broadband 20ms 50Mbit", 0.020, 50e6 / 8),
+    ("4G 60ms 10Mbit", 0.060, 10e6 / 8),
+    ("3G 150ms 1.5Mbit", 0.150, 1.5e6 / 8),
+]
+
+
+def read_boxes(f, start, end):
+    """Yield (type, offset, header size, total size) for the boxes in [start, end)."""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            break
+        yield box_type, offset, header, size
+        offset += size
+
+
+def find_box(f, start, end, path):
+    for box_type, offset, header, size in read_boxes(f, start, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return offset, header, size
+            found = find_box(f, offset + header, offset + size, path[1:])
+            if found:
+                return found
+    return None
+
+
+def first_video_sample(f, moov_offset, moov_header, moov_size):
+    """Return (offset, size) of the first sample of the first video track."""
+    for box_type, offset, header, size in read_boxes(f, moov_offset + moov_header, moov_offset + moov_size):
+        if box_type != b"trak":
+            continue
+        hdlr = find_box(f, offset + header, offset + size, [b"mdia", b"hdlr"])
+        f.seek(hdlr[0] + hdlr[1] + 8)
+        if f.read(4) != b"vide":
+            continue
+        stbl = find_box(f, offset + header, offset + size, [b"mdia", b"minf", b"stbl"])
+        stbl_start, stbl_end = stbl[0] + stbl[1], stbl[0] + stbl[2]
+        chunk_box = find_box(f, stbl_start, stbl_end, [b"stco"])
+        wide = chunk_box is None
+        if wide:
+            chunk_box = find_box(f, stbl_start, stbl_end, [b"co64"])
+        f.seek(chunk_box[0] + chunk_box[1] + 8)  # skip version, flags and entry count
+        sample_offset = struct.unpack(">Q" if wide else ">I", f.read(8 if wide else 4))[0]
+        stsz = find_box(f, stbl_start, stbl_end, [b"stsz"])
+        f.seek(stsz[0] + stsz[1] + 4)
+        sample_size, _ = struct.unpack(">II", f.read(8))
+        if sample_size == 0:
+            sample_size = struct.unpack(">I", f.read(4))[0]
+        return sample_offset, sample_size
+    raise ValueError("no video track")
+
+
+def progressive_cost(path):
+    """Return [(round trips, bytes)] for one MP4 file."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        boxes = {box_type: (offset, header, box_size) for box_type, offset, header, box_size in read_boxes(f, 0, size)}
+        moov_offset, moov_header, moov_size = boxes[b"moov"]
+        sample_offset, sample_size = first_video_sample(f, moov_offset, moov_header, moov_size)
+    if moov_offset < boxes[b"mdat"][0]:
+        # Everything up to the end of the first sample arrives in one response
+        return [(1, sample_offset + sample_size)]
+    # Initial request up to the mdat header, a range request for the moov,
+    # then one for the first sample
+    return [(1, boxes[b"mdat"][0] + 16), (1, moov_size), (1, sample_size)]
+
+
+def hls_cost(playlist_path):
+    directory = os.path.dirname(playlist_path)
+    with open(playlist_path) as f:
+        first_segment = next(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return [
+        (1, os.path.getsize(playlist_path)),
+        (1, os.path.getsize(os.path.join(directory, "init.mp4"))),
+        (1, os.path.getsize(os.path.join(directory, first_segment))),
+    ]
+
+
+def estimate(cost, rtt, bandwidth):
+    return sum(trips * rtt + size / bandwidth for trips, size in cost)
+
+
+def generate_clip(path, duration):
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", "testsrc2=size=854x480:rate=30",
+        "-t", str(duration), "-c:v", "libx264", "-pix_fmt", "yuv420p", path
+    ], check=True)
+
+
+async def run(args):
+    from app.services.packaging import make_faststart, make_hls
+
+    workdir = tempfile.mkdtemp(prefix="playback-bench-")
+    try:
+        source = os.path.join(workdir, "scene.mp4")
+        if args.video:
+            shutil.copy(args.video, source)
+        else:
+            generate_clip(source, args.duration)
+        faststart = os.path.join(workdir, "scene.faststart.mp4")
+        shutil.copy(source, faststart)
+        await make_faststart(faststart)
+        playlist = await make_hls(faststart)
+
+        variants = [
+            ("progressive (as rendered)", progressive_cost(source)),
+            ("faststart MP4", progressive_cost(faststart)),
+            ("HLS fMP4", hls_cost(playlist)),
+        ]
+        print(f"source {os.path.getsize(source) / 2**20:.1f} MB\n")
+        print(f"{'variant':28s} {'requests':>8s} {'bytes':>10s}" + "".join(f" {name:>22s}" for name, _, _ in NETWORKS))
+        for label, cost in variants:
+            row = f"{label:28s} {sum(t for t, _ in cost):8d} {sum(b for _, b in cost) / 1024:8.0f}KB"
+            row += "".join(f" {estimate(cost, rtt, bw) * 1000:20.0f}ms" for _, rtt, bw in NETWORKS)
+            print(row)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="rendered MP4 to test; omit with --generate")
+    parser.add_argument("--generate", action="store_true", help="generate a test clip with ffmpeg")
+    parser.add_argument("--duration", type=int, default=60, help="length of the generated clip in seconds")
+    args = parser.parse_args()
+    if not args.video and not args.generate:
+        parser.error("pass a video or --generate")
+    asyncio.run(run(args))
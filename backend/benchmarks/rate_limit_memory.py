@@ -0,0 +1,77 @@
+"""
+In-memory rate limiter stress check.
+
+Fires hits from a million distinct clients (plus a few hot clients that keep
+coming back) at the fallback limiter used while Redis is down, and checks
+that the number of tracked keys never exceeds the cap, that memory stays
+flat, and that the cost per hit does not grow with the number of clients
+seen. Exits non-zero if any bound is violated.
+
+    python benchmarks/rate_limit_memory.py --clients 1000000 --max-keys 100000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rate_limit import InMemoryRateLimiter
+
+
+def main(args):
+    limiter = InMemoryRateLimiter(
+        limit=10, window=60, buckets=args.buckets, max_keys=args.max_keys
+    )
+    hot_clients = [f"rate_limit:10.0.0.{i}:/api/v1/projects/" for i in range(5)]
+
+    tracemalloc.start()
+    now = 1_700_000_000.0
+    checkpoints = []
+    peak_keys = 0
+    start = time.perf_counter()
+    batch_start = start
+    for i in range(args.clients):
+        # ~2000 new clients per simulated second, so old keys go idle too
+        now += 0.0005
+        limiter.hit(f"rate_limit:{i >> 16}.{(i >> 8) & 255}.{i & 255}.1:/api/v1/auth/token", now)
+        if i % 100 == 0:
+            limiter.hit(hot_clients[i % len(hot_clients)], now)
+        peak_keys = max(peak_keys, len(limiter))
+        if (i + 1) % (args.clients // 10) == 0:
+            elapsed = time.perf_counter() - batch_start
+            current, _ = tracemalloc.get_traced_memory()
+            checkpoints.append((i + 1, len(limiter), current, elapsed / (args.clients // 10) * 1e6))
+            batch_start = time.perf_counter()
+    total = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{'clients':>10} {'tracked':>8} {'memory':>10} {'us/hit':>8}")
+    for clients, tracked, memory, per_hit in checkpoints:
+        print(f"{clients:>10} {tracked:>8} {memory / 2**20:>8.1f}MB {per_hit:>8.2f}")
+    print(f"total {total:.1f}s, peak tracked keys {peak_keys}, peak memory {peak_memory / 2**20:.1f}MB")
+
+    failures = []
+    if peak_keys > args.max_keys:
+        failures.append(f"tracked {peak_keys} keys, cap is {args.max_keys}")
+    memory_growth = checkpoints[-1][2] / checkpoints[len(checkpoints) // 2][2]
+    if memory_growth > 1.2:
+        failures.append(f"memory kept growing after the cap was reached ({memory_growth:.2f}x)")
+    cost_growth = checkpoints[-1][3] / checkpoints[0][3]
+    if cost_growth > 2.0:
+        failures.append(f"cost per hit grew {cost_growth:.2f}x with traffic")
+    if not limiter.hit(hot_clients[0], now).count:
+        failures.append("hot client was not tracked")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--buckets", type=int, default=10)
+    main(parser.parse_args())
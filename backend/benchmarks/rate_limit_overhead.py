@@ -0,0 +1,141 @@
+"""
+Rate limiter overhead benchmark.
+
+Measures the per-request cost of the rate limiting middleware against a
+local Redis by calling a minimal ASGI app directly (no network between client
+and app). The previous implementation, four sequential calls on a sync
+client, is measured alongside for comparison.
+
+On loopback a Redis round trip is cheaper than the asyncio client's own
+bookkeeping, so use --redis-latency-ms to put a delaying TCP proxy in front of
+Redis and model a Redis on another host, where the blocking round trips of
+the sync client stall the whole event loop.
+
+    python benchmarks/rate_limit_overhead.py --requests 5000 --concurrency 50
+    python benchmarks/rate_limit_overhead.py --redis-latency-ms 0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def start_latency_proxy(target_host, target_port, latency):
+    """Forward TCP to Redis, delaying each direction by half the round trip."""
+    loop = asyncio.new_event_loop()
+
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(latency / 2)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(target_host, target_port)
+        await asyncio.gather(
+            pipe(client_reader, upstream_writer),
+            pipe(upstream_reader, client_writer),
+            return_exceptions=True,
+        )
+
+    server = loop.run_until_complete(asyncio.start_server(handle, "127.0.0.1", 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def build_app(rate_limiter=None):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    if rate_limiter is not None:
+        app.middleware("http")(rate_limiter)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def build_legacy_middleware(settings):
+    import redis
+
+    client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=1, decode_responses=True)
+
+    async def legacy_rate_limit_middleware(request, call_next):
+        key = f"rate_limit_legacy:{request.client.host}:{request.url.path}"
+        current_time = int(time.time())
+        client.zadd(key, {str(current_time): current_time})
+        client.zremrangebyscore(key, 0, current_time - settings.RATE_LIMIT_WINDOW)
+        client.expire(key, settings.RATE_LIMIT_WINDOW * 2)
+        client.zcard(key)
+        return await call_next(request)
+
+    return legacy_rate_limit_middleware
+
+
+async def drive(app, total, concurrency):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                await client.get("/ping")
+
+        await asyncio.gather(*(one() for _ in range(min(100, total))))  # warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - start
+
+
+async def run(args):
+    from app.core.config import settings
+    from app.core import middleware
+
+    # Never reject during the benchmark; we are measuring bookkeeping cost
+    settings.RATE_LIMIT_REQUESTS = args.requests * 10
+    middleware.redis_limiter.limit = settings.RATE_LIMIT_REQUESTS
+
+    variants = [
+        ("no rate limiting", build_app()),
+        ("legacy sync, 4 round trips", build_app(build_legacy_middleware(settings))),
+        ("async Lua, 1 round trip", build_app(middleware.rate_limit_middleware)),
+    ]
+    baseline = None
+    for label, app in variants:
+        elapsed = await drive(app, args.requests, args.concurrency)
+        per_request = elapsed / args.requests * 1e6
+        if baseline is None:
+            baseline = per_request
+        print(f"{label:28s} {args.requests / elapsed:9.0f} req/s "
+              f"{per_request:8.1f} us/req  (+{per_request - baseline:.1f} us overhead)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--redis-latency-ms", type=float, default=0.0,
+                        help="simulated Redis round-trip time added by a local proxy")
+    args = parser.parse_args()
+
+    if args.redis_latency_ms > 0:
+        # Must happen before app.core.config reads the Redis address
+        port = start_latency_proxy(
+            os.getenv("REDIS_HOST", "localhost"),
+            int(os.getenv("REDIS_PORT", "6379")),
+            args.redis_latency_ms / 1000,
+        )
+        os.environ["REDIS_HOST"] = "127.0.0.1"
+        os.environ["REDIS_PORT"] = str(port)
+
+    asyncio.run(run(args))
@@ -0,0 +1,230 @@
+"""
+Render benchmark over the sample scenes in examples/.
+
+Renders every example at every render profile through the render
+pipeline's own steps: the same manim command and output handling
+(run_manim), then the profile's encode and ladder, HLS packaging when
+HLS_ENABLED is set, probing and previews. No database or LLM is involved.
+Each render runs in a fresh worker process, so peak RSS is per render:
+the largest of the worker and the manim and ffmpeg processes it started.
+
+Recorded per example and profile (the median over --repeat runs):
+
+- wall_seconds: the whole pipeline; render_seconds and encode_seconds are
+  its two largest parts
+- cpu_seconds: user + system time of the worker and its children
+- peak_rss_mb
+- output_bytes: every artifact the render leaves for upload
+- frames, and fps = frames rendered per wall-clock second
+
+Results are written as JSON. Given a baseline (an earlier results file),
+every metric that got worse by more than its threshold is reported and
+the exit status is 1, so a change to warm pools, caches or encode presets
+can be checked against the previous numbers on the same machine:
+
+    python benchmarks/render_examples.py --output baseline.json
+    python benchmarks/render_examples.py --baseline baseline.json --output after.json
+    python benchmarks/render_examples.py --examples basic_shapes --profiles preview --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES_DIR = os.path.join(BACKEND_DIR, "examples")
+sys.path.insert(0, BACKEND_DIR)
+
+# Percent a metric may get worse than the baseline before it counts as a
+# regression (grow, or for fps drop)
+DEFAULT_THRESHOLDS = {
+    "wall_seconds": 10.0,
+    "render_seconds": 10.0,
+    "encode_seconds": 10.0,
+    "cpu_seconds": 10.0,
+    "peak_rss_mb": 15.0,
+    "output_bytes": 5.0,
+    "fps": 10.0,
+}
+# Metrics where lower is better; fps is compared inversely
+LOWER_IS_BETTER = ("wall_seconds", "render_seconds", "encode_seconds", "cpu_seconds", "peak_rss_mb", "output_bytes")
+
+
+def list_examples():
+    return sorted(name[:-3] for name in os.listdir(EXAMPLES_DIR) if name.endswith(".py"))
+
+
+def directory_size(path) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path)
+        for name in names
+    )
+
+
+async def render_example(example, profile_name, workdir) -> dict:
+    """Render one example the way generate_animation does after code generation."""
+    from app.core.config import settings
+    from app.services.packaging import encode_profile, make_hls, probe_duration
+    from app.services.previews import make_previews
+    from app.services.render_output import count_animations, manim_command, run_manim
+    from app.services.render_profiles import get_profile
+
+    profile = get_profile(profile_name)
+    with open(os.path.join(EXAMPLES_DIR, f"{example}.py")) as f:
+        code = f.read()
+    script_path = os.path.join(workdir, "scene.py")
+    with open(script_path, "w") as f:
+        f.write(code)
+    output_dir = os.path.join(workdir, "videos")
+    os.makedirs(output_dir)
+    video_path = os.path.join(output_dir, f"{example}.mp4")
+
+    started = time.perf_counter()
+    returncode, output_tail, _ = await run_manim(
+        manim_command(script_path, video_path, profile),
+        count_animations(code),
+        os.path.join(workdir, "render.log.gz")
+    )
+    if returncode != 0 or not os.path.exists(video_path):
+        raise RuntimeError(f"manim exited with {returncode}:\n{output_tail}")
+    rendered = time.perf_counter()
+
+    rungs = await encode_profile(video_path, profile)
+    encoded = time.perf_counter()
+    if settings.HLS_ENABLED:
+        renditions = [(profile.width, profile.height, video_path)] + [
+            (profile.rung_width(height), height, path) for height, path in rungs.items()
+        ]
+        await make_hls(video_path, renditions if rungs else None)
+    duration = await probe_duration(video_path)
+    await make_previews(video_path, duration)
+    finished = time.perf_counter()
+
+    return {
+        "wall_seconds": finished - started,
+        "render_seconds": rendered - started,
+        "encode_seconds": encoded - rendered,
+        "output_bytes": directory_size(output_dir),
+        # Manim renders at a constant frame rate
+        "frames": round(duration * profile.fps),
+    }
+
+
+def worker(example, profile_name):
+    """Render once and print the measurements as JSON; runs in its own process."""
+    workdir = tempfile.mkdtemp(prefix="render-bench-")
+    try:
+        result = asyncio.run(render_example(example, profile_name, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    result["cpu_seconds"] = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    # ru_maxrss is in kilobytes on Linux
+    result["peak_rss_mb"] = max(own.ru_maxrss, children.ru_maxrss) / 1024
+    result["fps"] = result["frames"] / result["wall_seconds"]
+    print(json.dumps(result))
+
+
+def run_once(example, profile_name) -> dict:
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", example, profile_name],
+        capture_output=True, text=True, cwd=BACKEND_DIR
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"{example}/{profile_name} failed:\n{process.stderr[-2000:]}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, thresholds) -> list:
+    """Return a line per metric that regressed beyond its threshold."""
+    regressions = []
+    for key, metrics in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, threshold in thresholds.items():
+            old, new = previous.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            if metric not in LOWER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g} ({change:+.1f}%, threshold {threshold:.0f}%)")
+    return regressions
+
+
+def parse_thresholds(values) -> dict:
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for value in values or []:
+        metric, _, percent = value.partition("=")
+        thresholds[metric] = float(percent)
+    return thresholds
+
+
+def main(args):
+    from app.models.scene import RenderProfile
+
+    examples = args.examples or list_examples()
+    profiles = args.profiles or [profile.value for profile in RenderProfile]
+    results = {}
+    for example in examples:
+        for profile_name in profiles:
+            runs = [run_once(example, profile_name) for _ in range(args.repeat)]
+            metrics = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+            results[f"{example}/{profile_name}"] = metrics
+            print(
+                f"{example}/{profile_name}: {metrics['wall_seconds']:.2f} s wall "
+                f"(render {metrics['render_seconds']:.2f}, encode {metrics['encode_seconds']:.2f}), "
+                f"{metrics['cpu_seconds']:.2f} s CPU, {metrics['peak_rss_mb']:.0f} MB peak RSS, "
+                f"{metrics['output_bytes'] / 2**20:.2f} MB out, {metrics['fps']:.1f} frames/s"
+            )
+
+    report = {
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count(), "python": platform.python_version()},
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], parse_thresholds(args.threshold))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", nargs="*", help=f"examples to render; all by default ({', '.join(list_examples())})")
+    parser.add_argument("--profiles", nargs="*", help="render profiles; all by default")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per example and profile; the median is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="results file to compare against; exits 1 on a regression")
+    parser.add_argument(
+        "--threshold", action="append", metavar="METRIC=PERCENT",
+        help="allowed growth over the baseline, e.g. wall_seconds=20; "
+             + ", ".join(f"{metric}={percent:.0f}" for metric, percent in DEFAULT_THRESHOLDS.items()) + " by default"
+    )
+    parser.add_argument("--worker", nargs=2, metavar=("EXAMPLE", "PROFILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(*args.worker)
+    else:
+        main(args)
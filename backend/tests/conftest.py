@@ -0,0 +1,31 @@
+import os
+
+# Settings are read at import; the tests bring their own database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest
+from sqlalchemy import UUID, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from app.db.database import Base
+import app.models  # noqa: F401  (registers the tables)
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    # The models use Postgres UUIDs; SQLite stores them as hex strings
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def db():
+    """A session on a fresh in-memory SQLite database."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,55 @@
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.models import Project, Scene, SceneStatus, User
+from app.services.admission import check_render_admission
+
+
+@pytest.fixture
+def user(db):
+    user = User(username="u", email="u@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def scenes(db, user, monkeypatch):
+    """Two scenes of the user's, already rendering, with the outstanding limit at 2."""
+    monkeypatch.setattr(settings, "RENDER_MAX_OUTSTANDING_JOBS", 2)
+    monkeypatch.setattr(settings, "RENDER_CPU_BUDGET", 10 ** 6)
+    project = Project(user_id=user.id, title="p")
+    db.add(project)
+    db.flush()
+    scenes = [
+        Scene(project_id=project.id, prompt="a", status=SceneStatus.PROCESSING),
+        Scene(project_id=project.id, prompt="b", status=SceneStatus.PENDING),
+    ]
+    db.add_all(scenes)
+    db.commit()
+    return scenes
+
+
+def test_new_render_over_the_limit_is_refused(db, user, scenes):
+    with pytest.raises(HTTPException) as raised:
+        check_render_admission(db, user)
+    assert raised.value.status_code == 429
+    assert "Retry-After" in raised.value.headers
+
+
+def test_replacing_a_render_in_flight_is_admitted(db, user, scenes):
+    # An edit supersedes the scene's render; it does not add one
+    check_render_admission(db, user, replacing=[scenes[0].id])
+
+
+def test_replacing_does_not_free_other_slots(db, user, scenes):
+    with pytest.raises(HTTPException):
+        check_render_admission(db, user, jobs=2, replacing=[scenes[0].id])
+
+
+def test_finished_scene_counts_as_a_new_render(db, user, scenes):
+    done = Scene(project_id=scenes[0].project_id, prompt="c", status=SceneStatus.COMPLETED)
+    db.add(done)
+    db.commit()
+    with pytest.raises(HTTPException):
+        check_render_admission(db, user, replacing=[done.id])
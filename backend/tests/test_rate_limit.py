@@ -0,0 +1,109 @@
+import asyncio
+import time
+import pytest
+from app.core.rate_limit import InMemoryRateLimiter, RedisRateLimiter
+
+NOW = 1_700_000_000.0
+
+
+def test_million_clients_stay_under_the_key_cap():
+    limiter = InMemoryRateLimiter(limit=10, window=60, buckets=10, max_keys=10_000)
+    hot_client = "rate_limit:10.0.0.1:/api/v1/projects/"
+    now = NOW
+    peak = 0
+    hot_allowed = 0
+    for i in range(1_000_000):
+        # ~2000 new clients per simulated second, so old keys go idle too
+        now += 0.0005
+        limiter.hit(f"rate_limit:{i >> 16}.{(i >> 8) & 255}.{i & 255}.1:/api/v1/auth/token", now)
+        peak = max(peak, len(limiter))
+        # The hot client keeps coming back and is held to its limit throughout
+        if i % 100 == 0:
+            hot_allowed += limiter.hit(hot_client, now).allowed
+    assert peak <= 10_000
+    # 20 hits a second for ~500 s, 10 allowed per 60 s window: were the hot
+    # client evicted by the churn, it would start over and get more
+    assert 10 * (500 // 60) <= hot_allowed <= 10 * (500 // 60 + 1)
+    assert not limiter.hit(hot_client, now).allowed
+
+
+def test_least_recently_used_key_is_evicted_at_the_cap():
+    limiter = InMemoryRateLimiter(limit=10, window=60, buckets=10, max_keys=3)
+    for key in ("a", "b", "c"):
+        limiter.hit(key, NOW)
+    limiter.hit("a", NOW + 1)
+    limiter.hit("d", NOW + 2)
+    assert len(limiter) == 3
+    # b was the least recently used and starts over; a kept its count
+    assert limiter.hit("b", NOW + 3).count == 1
+    assert limiter.hit("a", NOW + 3).count == 3
+    # Adding b back evicted c, the next least recently used
+    assert limiter.hit("c", NOW + 4).count == 1
+
+
+def test_idle_keys_are_evicted_before_the_cap():
+    limiter = InMemoryRateLimiter(limit=10, window=60, buckets=10, max_keys=100)
+    limiter.hit("idle", NOW)
+    limiter.hit("active", NOW + 30)
+    # Once "idle" has no hits left in the window, the next new key evicts it
+    limiter.hit("new", NOW + 70)
+    assert len(limiter) == 2
+    assert limiter.hit("active", NOW + 71).count == 2
+
+
+def test_per_key_limit_trips():
+    limiter = InMemoryRateLimiter(limit=3, window=60, buckets=10, max_keys=100)
+    results = [limiter.hit("a", NOW + i) for i in range(4)]
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert results[-1].count == 3
+    assert results[-1].reset > NOW + 3
+    # Other keys have their own limit
+    assert limiter.hit("b", NOW + 4).allowed
+    # Admitted again once the first hits have left the window
+    assert limiter.hit("a", NOW + 80).allowed
+
+
+def test_redis_is_skipped_after_a_failure():
+    limiter = RedisRateLimiter(limit=10, window=60, cooldown=5.0)
+    calls = []
+
+    async def failing_script(keys, args):
+        calls.append(keys[0])
+        raise ConnectionError("Redis is down")
+
+    limiter.script = failing_script
+    assert limiter.available()
+    with pytest.raises(ConnectionError):
+        asyncio.run(limiter.hit("a"))
+    # Requests during the cool-down do not reach Redis
+    now = time.monotonic()
+    assert not limiter.available(now)
+    assert not limiter.available(now + 4)
+    # After it, one request probes Redis while the others keep using the fallback
+    assert limiter.available(now + 6)
+    assert not limiter.available(now + 6)
+    with pytest.raises(ConnectionError):
+        asyncio.run(limiter.hit("b"))
+    assert not limiter.available()
+    assert calls == ["a", "b"]
+
+
+def test_redis_is_used_again_once_it_answers():
+    limiter = RedisRateLimiter(limit=10, window=60, cooldown=5.0)
+
+    async def failing_script(keys, args):
+        raise ConnectionError("Redis is down")
+
+    async def script(keys, args):
+        return [1, 1, 1_700_000_060_000]
+
+    limiter.script = failing_script
+    with pytest.raises(ConnectionError):
+        asyncio.run(limiter.hit("a"))
+    limiter.script = script
+    assert limiter.available(time.monotonic() + 6)
+    result = asyncio.run(limiter.hit("a"))
+    assert result.allowed and result.count == 1 and result.reset == 1_700_000_060
+    # The breaker is closed: every request goes to Redis again
+    assert limiter.available()
+    assert limiter.available()
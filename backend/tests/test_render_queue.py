@@ -0,0 +1,162 @@
+import pytest
+from app.core.config import settings
+from app.services.render_queue import FairShareQueue, RenderJob
+
+
+def make_jobs(key, count, weight=1.0, cost=10.0):
+    return [RenderJob(f"{key}{i}", key, weight=weight, cost=cost) for i in range(1, count + 1)]
+
+
+def drain(queue, durations=None, limit=None):
+    """
+    Run up to `limit` jobs of the queue one at a time, each taking its cost
+    (or `durations[scene_id]`), and return the order they started in.
+    """
+    now = 0.0
+    order = []
+    while limit is None or len(order) < limit:
+        job = queue.pop(now)
+        if job is None:
+            return order
+        order.append(job.scene_id)
+        now += (durations or {}).get(job.scene_id, job.cost)
+        queue.finish(job, now)
+    return order
+
+
+def test_tenants_take_turns():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    for job in make_jobs("a", 3) + make_jobs("b", 1):
+        queue.push(job)
+    assert len(queue) == 4
+    # b's single scene does not wait behind all of a's
+    assert drain(queue) == ["a1", "b1", "a2", "a3"]
+    assert len(queue) == 0
+
+
+def test_weight_sets_share_of_render_time():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    for job in make_jobs("a", 8, weight=2.0) + make_jobs("b", 8):
+        queue.push(job)
+    first = drain(queue)[:9]
+    assert sum(scene_id.startswith("a") for scene_id in first) == 6
+
+
+def test_actual_duration_is_charged():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    for job in make_jobs("a", 2) + make_jobs("b", 3):
+        queue.push(job)
+    # a1 runs three times its estimate, so b catches up with three renders
+    assert drain(queue, durations={"a1": 30.0}) == ["a1", "b1", "b2", "b3", "a2"]
+
+
+def test_idle_tenant_does_not_bank_credit():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    queue.push(RenderJob("a1", "a", cost=10.0))
+    assert drain(queue) == ["a1"]
+    for job in make_jobs("b", 6):
+        queue.push(job)
+    assert drain(queue, limit=3) == ["b1", "b2", "b3"]
+    # a rejoins at the current virtual time instead of catching up on the time it was idle
+    for job in [RenderJob(f"a{i}", "a", cost=10.0) for i in (2, 3, 4)]:
+        queue.push(job)
+    assert drain(queue) == ["a2", "b4", "a3", "b5", "a4", "b6"]
+
+
+def test_concurrency_limits():
+    queue = FairShareQueue(concurrency=2, per_tenant_limit=1)
+    a1, a2 = make_jobs("a", 2)
+    b1, c1 = RenderJob("b1", "b", cost=10.0), RenderJob("c1", "c", cost=10.0)
+    for job in (a1, a2, b1, c1):
+        queue.push(job)
+    assert queue.pop(0.0) is a1
+    # a is at its own limit; b may still start
+    assert queue.pop(0.0) is b1
+    # Every render slot is taken
+    assert queue.pop(0.0) is None
+    assert queue.running == {a1, b1}
+    queue.finish(a1, 10.0)
+    assert queue.pop(10.0) is c1
+    assert queue.pop(10.0) is None
+    queue.finish(b1, 10.0)
+    assert queue.pop(10.0) is a2
+
+
+def test_remove():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    a1, a2 = make_jobs("a", 2)
+    b1 = RenderJob("b1", "b", cost=10.0)
+    for job in (a1, a2, b1):
+        queue.push(job)
+    assert queue.remove(b1)
+    assert not queue.remove(b1)
+    assert len(queue) == 2
+    assert queue.pop(0.0) is a1
+    # Running jobs are not in the queue
+    assert not queue.remove(a1)
+    assert queue.remove(a2)
+    assert len(queue) == 0
+    assert queue.pop(0.0) is None
+    queue.finish(a1, 10.0)
+    assert queue.running == set()
+    assert queue.pop(10.0) is None
+
+
+def test_finish_of_a_forgotten_tenant():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    a1 = RenderJob("a1", "a", cost=10.0)
+    queue.push(a1)
+    assert queue.pop(0.0) is a1
+    queue.finish(a1, 10.0)
+    # A job finishing twice (e.g. cancelled while stopping) changes nothing
+    queue.finish(a1, 12.0)
+    assert queue.running == set()
+    assert drain(queue) == []
+
+
+def test_forecast_matches_dispatch_order():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    for job in make_jobs("a", 3, weight=2.0) + make_jobs("b", 2) + make_jobs("c", 1, cost=5.0):
+        queue.push(job)
+    forecast = queue.forecast(0.0)
+    order = sorted(forecast, key=lambda scene_id: forecast[scene_id][0])
+    assert [forecast[scene_id][0] for scene_id in order] == list(range(1, 7))
+    assert order == drain(queue)
+    # Starts follow each other by the jobs' costs
+    costs = {"c1": 5.0}
+    expected = 0.0
+    for scene_id in order:
+        assert forecast[scene_id][1] == pytest.approx(expected)
+        expected += costs.get(scene_id, 10.0)
+
+
+def test_forecast_counts_running_jobs():
+    queue = FairShareQueue(concurrency=1, per_tenant_limit=1)
+    a1, a2 = make_jobs("a", 2)
+    b1 = RenderJob("b1", "b", cost=10.0)
+    for job in (a1, a2, b1):
+        queue.push(job)
+    assert queue.pop(0.0) is a1
+    # a1 is 4 seconds in; b has had no render time yet
+    assert queue.forecast(4.0) == {"b1": (1, 6.0), "a2": (2, 16.0)}
+    # Overdue renders are expected to finish now
+    assert queue.forecast(25.0) == {"b1": (1, 0.0), "a2": (2, 10.0)}
+
+
+def test_forecast_waits_for_tenant_slot():
+    queue = FairShareQueue(concurrency=2, per_tenant_limit=1)
+    for job in make_jobs("a", 2):
+        queue.push(job)
+    # The second render slot is free, but a may only run one render at a time
+    assert queue.forecast(0.0) == {"a1": (1, 0.0), "a2": (2, 10.0)}
+
+
+def test_forecast_of_empty_queue():
+    queue = FairShareQueue(concurrency=2, per_tenant_limit=1)
+    assert queue.forecast(0.0) == {}
+
+
+@pytest.mark.parametrize("name", ["RENDER_CONCURRENCY", "RENDER_USER_CONCURRENCY"])
+def test_concurrency_settings_must_be_positive(name):
+    with pytest.raises(ValueError, match=name):
+        settings.model_copy(update={name: 0}).check_settings()
@@ -7,6 +7,7 @@ import type {
   RegisterRequest, 
   Scene, 
   SceneDetail, 
+  SceneEvent, 
   User 
 } from '../types/index';
 
@@ -107,6 +108,31 @@ class ApiService {
     await this.api.delete(`/projects/${projectId}/scenes/${sceneId}`);
   }
   
+  // Scene status push channel. Returns a function that closes the stream.
+  subscribeToProjectEvents(
+    projectId: string,
+    onEvent: (event: SceneEvent) => void,
+    onClosed?: () => void
+  ): () => void {
+    const token = localStorage.getItem('token') || '';
+    const source = new EventSource(
+      `${API_URL}/projects/${projectId}/events?token=${encodeURIComponent(token)}`
+    );
+    
+    source.addEventListener('scene', (message) => {
+      onEvent(JSON.parse((message as MessageEvent).data) as SceneEvent);
+    });
+    
+    source.onerror = () => {
+      // The browser retries on its own unless the server refused the stream
+      if (source.readyState === EventSource.CLOSED && onClosed) {
+        onClosed();
+      }
+    };
+    
+    return () => source.close();
+  }
+  
   async refinePrompt(projectTitle: string, prompt: string): Promise<string> {
     const response = await this.api.post<{ refined_prompt: string }>(
       '/ai/refine-prompt',
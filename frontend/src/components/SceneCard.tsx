@@ -102,11 +102,19 @@ const SceneCard = ({ scene, onEdit, onDelete }: SceneCardProps) => {
         
         {scene.status === SceneStatus.COMPLETED && scene.video_url && (
           <div className="mt-3">
-            <video 
+            <video
+              key={scene.video_url} 
               className="w-full h-auto rounded-md" 
               controls 
-              src={`http://localhost:8000${scene.video_url}`}
-            />
+              preload={scene.thumbnail_url ? 'none' : 'metadata'}
+              poster={scene.thumbnail_url ? `http://localhost:8000${scene.thumbnail_url}` : undefined}
+            >
+              {/* Browsers without native HLS fall through to the MP4 */}
+              {scene.playlist_url && (
+                <source src={`http://localhost:8000${scene.playlist_url}`} type="application/vnd.apple.mpegurl" />
+              )}
+              <source src={`http://localhost:8000${scene.video_url}`} type="video/mp4" />
+            </video>
           </div>
         )}
         
@@ -116,7 +124,9 @@ const SceneCard = ({ scene, onEdit, onDelete }: SceneCardProps) => {
               <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4"></circle>
               <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
             </svg>
-            <span className="ml-2 text-sm text-gray-600">Generating animation...</span>
+            <span className="ml-2 text-sm text-gray-600">
+              Generating animation...{scene.progress ? ` ${scene.progress}%` : ''}
+            </span>
           </div>
         )}
         
@@ -11,6 +11,7 @@ const ProjectDetail = () => {
     createScene, 
     updateScene, 
     deleteScene, 
+    applySceneEvent, 
     isLoading, 
     error 
   } = useProjectStore();
@@ -28,22 +29,32 @@ const ProjectDetail = () => {
     }
   }, [projectId, fetchProject]);
 
-  // Poll for updates to scenes that are processing
+  const hasActiveScenes = !!currentProject?.scenes.some(
+    scene => scene.status === SceneStatus.PENDING || scene.status === SceneStatus.PROCESSING
+  );
+  const [pushUnavailable, setPushUnavailable] = useState(false);
+
+  // Receive scene status updates pushed by the server while anything is rendering
   useEffect(() => {
-    if (!currentProject) return;
+    if (!projectId || !hasActiveScenes || pushUnavailable) return;
     
-    const hasProcessingScenes = currentProject.scenes.some(
-      scene => scene.status === SceneStatus.PROCESSING
+    return apiService.subscribeToProjectEvents(
+      projectId,
+      applySceneEvent,
+      () => setPushUnavailable(true)
     );
+  }, [projectId, hasActiveScenes, pushUnavailable, applySceneEvent]);
+
+  // Fall back to polling if the event stream is unavailable
+  useEffect(() => {
+    if (!projectId || !hasActiveScenes || !pushUnavailable) return;
     
-    if (hasProcessingScenes) {
-      const intervalId = setInterval(() => {
-        fetchProject(projectId);
-      }, 5000); // Poll every 5 seconds
-      
-      return () => clearInterval(intervalId);
-    }
-  }, [currentProject, projectId, fetchProject]);
+    const intervalId = setInterval(() => {
+      fetchProject(projectId);
+    }, 5000); // Poll every 5 seconds
+    
+    return () => clearInterval(intervalId);
+  }, [projectId, hasActiveScenes, pushUnavailable, fetchProject]);
 
   const handleCreateScene = async (e: React.FormEvent) => {
     e.preventDefault();
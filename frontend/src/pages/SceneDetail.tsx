@@ -1,9 +1,10 @@
 import { useEffect, useState } from 'react';
 import { useProjectStore } from '../store/projectStore';
-import { SceneStatus } from '../types';
+import { RenderProfile, SceneStatus } from '../types';
+import { apiService } from '../api/api';
 
 const SceneDetail = () => {
-  const { currentScene, fetchScene, updateScene, isLoading, error } = useProjectStore();
+  const { currentScene, fetchScene, updateScene, applySceneEvent, isLoading, error } = useProjectStore();
   const [editMode, setEditMode] = useState(false);
   const [prompt, setPrompt] = useState('');
   
@@ -36,16 +37,38 @@ const SceneDetail = () => {
     }
   }, [currentScene]);
 
-  // Poll for updates if the scene is processing
+  const isActive = currentScene?.status === SceneStatus.PENDING ||
+    currentScene?.status === SceneStatus.PROCESSING;
+  const [pushUnavailable, setPushUnavailable] = useState(false);
+
+  // Receive status updates for this scene pushed by the server
+  useEffect(() => {
+    if (!projectId || !sceneId || !isActive || pushUnavailable) return;
+    
+    return apiService.subscribeToProjectEvents(
+      projectId,
+      (event) => {
+        if (event.scene_id !== sceneId) return;
+        applySceneEvent(event);
+        // Reload once the render finishes to pick up the generated code
+        if (event.status === SceneStatus.COMPLETED || event.status === SceneStatus.FAILED) {
+          fetchScene(projectId, sceneId);
+        }
+      },
+      () => setPushUnavailable(true)
+    );
+  }, [projectId, sceneId, isActive, pushUnavailable, applySceneEvent, fetchScene]);
+
+  // Fall back to polling if the event stream is unavailable
   useEffect(() => {
-    if (!currentScene || currentScene.status !== SceneStatus.PROCESSING) return;
+    if (!isActive || !pushUnavailable) return;
     
     const intervalId = setInterval(() => {
       fetchScene(projectId, sceneId);
     }, 5000); // Poll every 5 seconds
     
     return () => clearInterval(intervalId);
-  }, [currentScene, projectId, sceneId, fetchScene]);
+  }, [isActive, pushUnavailable, projectId, sceneId, fetchScene]);
 
   const handleEdit = () => {
     setEditMode(true);
@@ -189,7 +212,7 @@ const SceneDetail = () => {
                             <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4"></circle>
                             <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
                           </svg>
-                          Processing
+                          Processing{currentScene.progress ? ` ${currentScene.progress}%` : ''}
                         </span>
                       )}
                       {currentScene.status === SceneStatus.COMPLETED && (
@@ -217,11 +240,18 @@ const SceneDetail = () => {
           {currentScene.status === SceneStatus.COMPLETED && currentScene.video_url && (
             <div className="bg-white shadow-md rounded-lg p-6">
               <h2 className="text-xl font-semibold mb-4">Animation Preview</h2>
-              <video 
+              <video
+                key={currentScene.video_url} 
                 className="w-full h-auto rounded-md" 
                 controls 
-                src={`http://localhost:8000${currentScene.video_url}`}
-              />
+                poster={currentScene.poster_url ? `http://localhost:8000${currentScene.poster_url}` : undefined}
+              >
+                {/* Browsers without native HLS fall through to the MP4 */}
+                {currentScene.playlist_url && (
+                  <source src={`http://localhost:8000${currentScene.playlist_url}`} type="application/vnd.apple.mpegurl" />
+                )}
+                <source src={`http://localhost:8000${currentScene.video_url}`} type="video/mp4" />
+              </video>
               <div className="mt-4">
                 <a 
                   href={`http://localhost:8000${currentScene.video_url}`}
@@ -232,6 +262,42 @@ const SceneDetail = () => {
                 >
                   Download Video
                 </a>
+                {currentScene.renditions && (
+                  <div className="mt-2 flex justify-center gap-4 text-sm">
+                    {Object.entries(currentScene.renditions).map(([label, url]) => (
+                      <a
+                        key={label}
+                        href={`http://localhost:8000${url}`}
+                        download
+                        className="text-blue-600 hover:underline"
+                        target="_blank"
+                        rel="noopener noreferrer"
+                      >
+                        {label}
+                      </a>
+                    ))}
+                  </div>
+                )}
+                {currentScene.profile_url && (
+                  <div className="mt-2 text-center text-sm">
+                    <a
+                      href={`http://localhost:8000${currentScene.profile_url}`}
+                      className="text-blue-600 hover:underline"
+                      target="_blank"
+                      rel="noopener noreferrer"
+                    >
+                      Render profile
+                    </a>
+                  </div>
+                )}
+                {currentScene.render_profile !== RenderProfile.EXPORT && (
+                  <button
+                    onClick={() => updateScene(projectId, sceneId, { render_profile: RenderProfile.EXPORT })}
+                    className="btn btn-secondary w-full mt-2"
+                  >
+                    Render for Export (1080p)
+                  </button>
+                )}
               </div>
             </div>
           )}
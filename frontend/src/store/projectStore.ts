@@ -1,7 +1,7 @@
 import { create } from 'zustand';
 import { apiService } from '../api/api';
 import { handleApiError } from '../utils/errorHandler';
-import type { Project, ProjectWithScenes, Scene, SceneDetail } from '../types';
+import type { Project, ProjectWithScenes, Scene, SceneDetail, SceneEvent } from '../types';
 
 interface ProjectState {
   projects: Project[];
@@ -21,6 +21,7 @@ interface ProjectActions {
   createScene: (projectId: string, prompt: string, order?: number) => Promise<Scene>;
   updateScene: (projectId: string, sceneId: string, data: Partial<Scene>) => Promise<Scene>;
   deleteScene: (projectId: string, sceneId: string) => Promise<void>;
+  applySceneEvent: (event: SceneEvent) => void;
   clearError: () => void;
 }
 
@@ -238,5 +239,31 @@ export const useProjectStore = create<ProjectStore>((set, get) => ({
     }
   },
   
+  applySceneEvent: (event: SceneEvent) => {
+    const changes = {
+      status: event.status,
+      progress: event.progress,
+      video_url: event.video_url ?? undefined,
+      playlist_url: event.playlist_url ?? undefined,
+      poster_url: event.poster_url ?? undefined,
+      thumbnail_url: event.thumbnail_url ?? undefined,
+      sprite_url: event.sprite_url ?? undefined,
+      renditions: event.renditions ?? undefined,
+    };
+    set(state => ({
+      currentProject: state.currentProject?.id === event.project_id
+        ? {
+            ...state.currentProject,
+            scenes: state.currentProject.scenes.map(s =>
+              s.id === event.scene_id ? { ...s, ...changes } : s
+            )
+          }
+        : state.currentProject,
+      currentScene: state.currentScene?.id === event.scene_id
+        ? { ...state.currentScene, ...changes }
+        : state.currentScene,
+    }));
+  },
+  
   clearError: () => set({ error: null }),
 }));
@@ -5,6 +5,12 @@ export enum SceneStatus {
   FAILED = "failed",
 }
 
+export enum RenderProfile {
+  PREVIEW = "preview",
+  STANDARD = "standard",
+  EXPORT = "export",
+}
+
 export interface User {
   id: string;
   username: string;
@@ -26,9 +32,18 @@ export interface Scene {
   id: string;
   project_id: string;
   prompt: string;
+  narration?: string;
   order: number;
   status: SceneStatus;
+  progress?: number;
   video_url?: string;
+  playlist_url?: string;
+  poster_url?: string;
+  thumbnail_url?: string;
+  sprite_url?: string;
+  renditions?: Record<string, string>;
+  render_profile?: RenderProfile;
+  profile_url?: string;
   created_at: string;
 }
 
@@ -36,6 +51,19 @@ export interface SceneDetail extends Scene {
   code?: string;
 }
 
+export interface SceneEvent {
+  scene_id: string;
+  project_id: string;
+  status: SceneStatus;
+  video_url?: string | null;
+  playlist_url?: string | null;
+  poster_url?: string | null;
+  thumbnail_url?: string | null;
+  sprite_url?: string | null;
+  renditions?: Record<string, string> | null;
+  progress?: number;
+}
+
 export interface LoginRequest {
   username: string;
   password: string;